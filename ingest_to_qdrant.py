@@ -4,13 +4,30 @@ Quick RAG Data Ingestion Script
 Loads text documents into Qdrant
 """
 
+import asyncio
 import os
+import random
 import sys
+import time
+import uuid
 from pathlib import Path
+import numpy as np
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
+from qdrant_client.models import (
+    CollectionStatus,
+    Distance,
+    HnswConfigDiff,
+    OptimizersConfigDiff,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    VectorParams,
+)
+from langchain.embeddings import CacheBackedEmbeddings
+from langchain.storage import LocalFileStore
 from langchain_openai import OpenAIEmbeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+from tqdm import tqdm
 from dotenv import load_dotenv
 import logging
 
@@ -25,10 +42,101 @@ COLLECTION_NAME = "churnguard_knowledge"
 # Use qdrant service name in Docker, or localhost for host machine
 QDRANT_URL = os.getenv("QDRANT_URL", "http://qdrant:6333")
 DATA_DIR = Path("data/churn_analysis_docs")
-CHUNK_SIZE = 500
+# Query code must embed with the same model and dimensions
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIMENSIONS = 512
+CHUNK_SIZE = 1000
 CHUNK_OVERLAP = 50
+# Chunks shorter than this are merged into a neighbour from the same file
+MIN_CHUNK_SIZE = 100
+# Files handed to the splitter per create_documents call
+SPLIT_GROUP_SIZE = 32
+QDRANT_GRPC_PORT = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+# On-disk embedding cache so re-runs only embed new or changed chunks
+EMBED_CACHE_DIR = Path(os.getenv("EMBED_CACHE_DIR", ".embed_cache"))
+# Keep the existing collection and upsert into it (resumes an interrupted run)
+APPEND_MODE = os.getenv("INGEST_APPEND", "false").lower() == "true"
+# Namespace for deterministic point ids
+POINT_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, COLLECTION_NAME)
+# Max embedding requests in flight at once
+EMBED_CONCURRENCY = 5
+# Chunked batches held in memory (embedding or awaiting upload) before chunking pauses
+MAX_IN_FLIGHT_BATCHES = EMBED_CONCURRENCY * 2
+# Points per Qdrant upsert request
+UPSERT_BATCH_SIZE = 1000
+# HNSW settings applied once the bulk load has finished
+HNSW_M = 16
+INDEXING_THRESHOLD = 20000
 
-def main():
+
+def wait_for_green(client, collection_name, timeout=300, poll_interval=1.0):
+    """Block until the collection's optimizers have finished (status GREEN)"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if client.get_collection(collection_name).status == CollectionStatus.GREEN:
+            return True
+        time.sleep(poll_interval)
+    return False
+
+
+def point_id(doc):
+    """Deterministic id from the chunk's source, offset and text, so re-uploads overwrite"""
+    key = f"{doc.metadata['source']}|{doc.metadata['start_index']}|{doc.page_content}"
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, key))
+
+
+def merge_small_chunks(docs):
+    """Merge undersized chunks into the adjacent chunk of the same file, up to CHUNK_SIZE"""
+    merged = []
+    for doc in docs:
+        prev = merged[-1] if merged else None
+        if (
+            prev is not None
+            # start_index differs per chunk, so compare the file only; the merged
+            # chunk keeps the first chunk's start_index for point_id
+            and prev.metadata["source"] == doc.metadata["source"]
+            and min(len(prev.page_content), len(doc.page_content)) < MIN_CHUNK_SIZE
+            and len(prev.page_content) + len(doc.page_content) + 1 <= CHUNK_SIZE
+        ):
+            prev.page_content = f"{prev.page_content}\n{doc.page_content}"
+        else:
+            merged.append(doc)
+    return merged
+
+
+async def read_texts(paths):
+    """Read files concurrently on worker threads; failed reads come back as exceptions"""
+    return await asyncio.gather(
+        *(asyncio.to_thread(path.read_text, encoding='utf-8') for path in paths),
+        return_exceptions=True
+    )
+
+
+async def iter_batches(txt_files, text_splitter, batch_size):
+    """Chunk documents lazily, yielding lists of at most batch_size chunk Documents"""
+    batch = []
+    for start in range(0, len(txt_files), SPLIT_GROUP_SIZE):
+        group = txt_files[start:start + SPLIT_GROUP_SIZE]
+        texts, metadatas = [], []
+        for txt_file, content in zip(group, await read_texts(group)):
+            if isinstance(content, Exception):
+                print(f"⚠️  Error processing {txt_file.name}: {content}")
+                continue
+            texts.append(content)
+            metadatas.append({"source": txt_file.name, "doc_type": "churn_analysis"})
+        
+        # One splitter pass per group of files
+        docs = merge_small_chunks(text_splitter.create_documents(texts, metadatas=metadatas))
+        for doc in docs:
+            batch.append(doc)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+async def main():
     """Main ingestion function"""
     
     # Check API key
@@ -43,28 +151,50 @@ def main():
     
     # Initialize clients
     try:
-        embeddings = OpenAIEmbeddings(openai_api_key=api_key)
-        client = QdrantClient(url=QDRANT_URL)
+        underlying_embeddings = OpenAIEmbeddings(
+            model=EMBEDDING_MODEL,
+            dimensions=EMBEDDING_DIMENSIONS,
+            openai_api_key=api_key
+        )
+        embeddings = CacheBackedEmbeddings.from_bytes_store(
+            underlying_embeddings,
+            LocalFileStore(str(EMBED_CACHE_DIR)),
+            # Vectors differ per dimension count, so both go in the cache namespace
+            namespace=f"{EMBEDDING_MODEL}-{EMBEDDING_DIMENSIONS}",
+            key_encoder="sha256"
+        )
+        client = QdrantClient(url=QDRANT_URL, prefer_grpc=True, grpc_port=QDRANT_GRPC_PORT)
         print("✅ Connected to Qdrant")
     except Exception as e:
         print(f"❌ Failed to connect: {e}")
         return 1
     
     # Check if collection exists
-    collections = client.get_collections().collections
-    collection_names = [c.name for c in collections]
-    
-    if COLLECTION_NAME in collection_names:
-        print(f"⚠️  Collection '{COLLECTION_NAME}' already exists. Deleting...")
-        client.delete_collection(COLLECTION_NAME)
-    
-    # Create collection
-    print("📦 Creating collection...")
-    client.create_collection(
-        collection_name=COLLECTION_NAME,
-        vectors_config=VectorParams(size=1536, distance=Distance.COSINE)
-    )
-    print("✅ Collection created")
+    collection_exists = client.collection_exists(COLLECTION_NAME)
+    if collection_exists and APPEND_MODE:
+        print(f"♻️  Appending to existing collection '{COLLECTION_NAME}'")
+        client.update_collection(
+            collection_name=COLLECTION_NAME,
+            optimizers_config=OptimizersConfigDiff(indexing_threshold=0)
+        )
+    else:
+        if collection_exists:
+            print(f"⚠️  Collection '{COLLECTION_NAME}' already exists. Deleting...")
+            client.delete_collection(COLLECTION_NAME)
+        
+        # Create collection with indexing disabled; the HNSW graph is built once after upload
+        print("📦 Creating collection...")
+        client.create_collection(
+            collection_name=COLLECTION_NAME,
+            vectors_config=VectorParams(size=EMBEDDING_DIMENSIONS, distance=Distance.COSINE, on_disk=False),
+            # int8 copies stay in RAM for search; originals are used for rescoring
+            quantization_config=ScalarQuantization(
+                scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+            ),
+            hnsw_config=HnswConfigDiff(m=0),
+            optimizers_config=OptimizersConfigDiff(indexing_threshold=0)
+        )
+        print("✅ Collection created")
     
     # Load and process documents
     if not DATA_DIR.exists():
@@ -82,64 +212,112 @@ def main():
     text_splitter = RecursiveCharacterTextSplitter(
         chunk_size=CHUNK_SIZE,
         chunk_overlap=CHUNK_OVERLAP,
-        length_function=len
+        length_function=len,
+        add_start_index=True
     )
     
-    # Process documents
-    all_chunks = []
-    for txt_file in txt_files:
-        try:
-            with open(txt_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            chunks = text_splitter.split_text(content)
-            for chunk in chunks:
-                all_chunks.append({
-                    "text": chunk,
-                    "source": txt_file.name,
-                    "doc_type": "churn_analysis"
-                })
-        except Exception as e:
-            print(f"⚠️  Error processing {txt_file.name}: {e}")
-    
-    print(f"📊 Created {len(all_chunks)} chunks from documents")
-    
-    # Generate embeddings and upload
-    print("🔄 Generating embeddings (this may take a minute)...")
+    # Generate embeddings and upload while documents are still being chunked
+    print("🔄 Chunking and embedding documents (this may take a minute)...")
     
     batch_size = 50
-    for i in range(0, len(all_chunks), batch_size):
-        batch = all_chunks[i:i+batch_size]
-        texts = [chunk["text"] for chunk in batch]
-        
+    semaphore = asyncio.Semaphore(EMBED_CONCURRENCY)
+
+    async def embed_batch(batch_idx, batch):
+        async with semaphore:
+            # Small jitter so concurrent requests don't hit the rate limiter together
+            await asyncio.sleep(random.uniform(0, 0.1))
+            try:
+                vectors = await embeddings.aembed_documents([doc.page_content for doc in batch])
+                # Hold buffered vectors as float16 until upload to halve their footprint
+                vectors = np.asarray(vectors, dtype=np.float16)
+            except Exception as e:
+                tqdm.write(f"   ⚠️  Error embedding batch {batch_idx + 1}: {e}")
+                vectors = None
+            return batch_idx, batch, vectors
+
+    # Embedded batches waiting to be uploaded, as (batch_idx, batch, vectors)
+    pending = []
+    pending_points = 0
+    uploaded = 0
+    total_chunks = 0
+    batch_count = 0
+
+    async def flush():
+        nonlocal pending_points, uploaded
+        if not pending:
+            return
+        ids = (point_id(doc) for _, batch, _ in pending for doc in batch)
+        payloads = (
+            {"text": doc.page_content, **doc.metadata}
+            for _, batch, _ in pending
+            for doc in batch
+        )
+        # Upload to Qdrant in large batches over gRPC; completion is awaited once at the end.
+        # One in-process worker (parallel>1 would start a new process pool per flush), run on a
+        # thread so embedding requests keep progressing during the upload
         try:
-            # Generate embeddings
-            vectors = embeddings.embed_documents(texts)
-            
-            # Create points
-            points = []
-            for j, (chunk, vector) in enumerate(zip(batch, vectors)):
-                point = PointStruct(
-                    id=i + j,
-                    vector=vector,
-                    payload={
-                        "text": chunk["text"],
-                        "source": chunk["source"],
-                        "doc_type": chunk["doc_type"]
-                    }
-                )
-                points.append(point)
-            
-            # Upload to Qdrant
-            client.upsert(
+            await asyncio.to_thread(
+                client.upload_collection,
                 collection_name=COLLECTION_NAME,
-                points=points
+                vectors=np.concatenate([vecs for _, _, vecs in pending]).astype(np.float32),
+                payload=payloads,
+                ids=ids,
+                batch_size=UPSERT_BATCH_SIZE,
+                parallel=1,
+                wait=False
             )
-            
-            print(f"   ✅ Uploaded batch {i//batch_size + 1}/{(len(all_chunks)-1)//batch_size + 1}")
-        
+            uploaded += pending_points
         except Exception as e:
-            print(f"   ⚠️  Error in batch {i//batch_size + 1}: {e}")
+            tqdm.write(f"   ⚠️  Error uploading points: {e}")
+        pending.clear()
+        pending_points = 0
+
+    async def collect(done, progress):
+        """Queue finished embedding batches for upload, flushing once enough have piled up"""
+        nonlocal pending_points
+        for task in done:
+            batch_idx, batch, batch_vecs = task.result()
+            progress.update(len(batch))
+            if batch_vecs is None:
+                continue
+            pending.append((batch_idx, batch, batch_vecs))
+            pending_points += len(batch)
+            if pending_points >= UPSERT_BATCH_SIZE:
+                await flush()
+                progress.set_postfix(points=uploaded)
+
+    # Single progress bar instead of per-batch prints; chunking, embedding and upload
+    # overlap, and at most MAX_IN_FLIGHT_BATCHES batches are held in memory at once
+    in_flight = set()
+    with tqdm(desc="Upserting", unit="chunk") as progress:
+        async for batch in iter_batches(txt_files, text_splitter, batch_size):
+            in_flight.add(asyncio.create_task(embed_batch(batch_count, batch)))
+            batch_count += 1
+            total_chunks += len(batch)
+            if len(in_flight) >= MAX_IN_FLIGHT_BATCHES:
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                await collect(done, progress)
+            else:
+                # Let in-flight embedding requests progress while the next batch is chunked
+                await asyncio.sleep(0)
+        if in_flight:
+            done, _ = await asyncio.wait(in_flight)
+            await collect(done, progress)
+        await flush()
+        progress.set_postfix(points=uploaded)
+    
+    print(f"📊 Created {total_chunks} chunks from documents")
+    print(f"   ✅ Uploaded {uploaded} points")
+    
+    # Re-enable indexing and build the HNSW graph in one pass
+    print("🔧 Building HNSW index...")
+    client.update_collection(
+        collection_name=COLLECTION_NAME,
+        hnsw_config=HnswConfigDiff(m=HNSW_M),
+        optimizers_config=OptimizersConfigDiff(indexing_threshold=INDEXING_THRESHOLD)
+    )
+    if not wait_for_green(client, COLLECTION_NAME):
+        print("⚠️  Index build still in progress; collection will be searchable once optimized")
     
     # Verify
     collection_info = client.get_collection(COLLECTION_NAME)
@@ -151,5 +329,5 @@ def main():
     return 0
 
 if __name__ == "__main__":
-    sys.exit(main())
+    sys.exit(asyncio.run(main()))
 
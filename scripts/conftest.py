@@ -0,0 +1,17 @@
+"""
+Pytest fixtures for the retrieval test script
+"""
+
+import pytest
+
+from test_rag_retrieval import build_vectorstore
+
+
+@pytest.fixture(scope="module")
+def vectorstore():
+    """Shared vectorstore; the tests are skipped when it can't be opened"""
+    store = build_vectorstore()
+    if store is None:
+        pytest.skip("OPENAI_API_KEY or the local Qdrant collection is not available")
+    yield store
+    store.client.close()
@@ -5,14 +5,19 @@ Creates multiple datasets: customer interactions, support tickets, success stori
 
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
 import json
-import random
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 
-# Set seed for reproducibility
-np.random.seed(42)
-random.seed(42)
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# Base seed for reproducibility; each generator offsets it so parallel workers draw distinct streams
+SEED = 42
 
 # Define data directory
 DATA_DIR = Path("data")
@@ -73,320 +78,413 @@ RETENTION_STRATEGIES = {
     ]
 }
 
-def generate_customer_interactions(num_customers=100):
-    """Generate detailed customer interaction history"""
-    interactions = []
+# Support ticket issues by category
+TICKET_CATEGORIES = {
+    "Technical": ["API error", "Integration issue", "Performance slow", "Data sync problem", "Authentication failure"],
+    "Feature": ["Missing functionality", "Feature request", "Workflow improvement", "UI/UX feedback"],
+    "Billing": ["Invoice question", "Pricing clarification", "Payment issue", "Plan change request"],
+    "Training": ["How-to question", "Best practices", "Setup help", "Documentation request"]
+}
 
-    for _ in range(num_customers):
-        company = random.choice(COMPANY_NAMES) + f" {random.choice(['Systems', 'Solutions', 'Technologies', 'Corp'])}"
-        segment = random.choice(SEGMENTS)
-        tenure_months = random.randint(1, 48)
+# Lookup sequences built once at import so generators don't rebuild them per call
+_COMPANIES_A = np.array(COMPANY_NAMES)
+_SEGMENTS_A = np.array(SEGMENTS)
+_CHURN_CATS_A = np.array(list(CHURN_REASONS))
+_TICKET_CATS_A = np.array(list(TICKET_CATEGORIES))
+_CHURN_REASONS_T = {k: tuple(v) for k, v in CHURN_REASONS.items()}
+_RETENTION_T = {k: tuple(v) for k, v in RETENTION_STRATEGIES.items()}
+_TICKET_ISSUES_T = {k: tuple(v) for k, v in TICKET_CATEGORIES.items()}
 
-        # Generate 5-20 interactions per customer
-        num_interactions = random.randint(5, 20)
+# Churn analysis document body, filled once per row with str.format
+CHURN_ANALYSIS_TEMPLATE = """# Churn Risk Analysis: {company}
 
-        for i in range(num_interactions):
-            days_ago = random.randint(1, tenure_months * 30)
-            interaction_date = datetime.now() - timedelta(days=days_ago)
+## Executive Summary
+{company} is a {segment} customer with ${arr:,} ARR and {tenure_months} months of tenure. Current risk score: {risk_score}%.
 
-            interaction_types = ["Email", "Call", "Meeting", "Support Ticket", "Product Feedback"]
-            interaction_type = random.choice(interaction_types)
+## Risk Factors
+1. **Primary Concern:** {specific_reason}
+2. **Feature Adoption:** {feature_adoption}% (Below {segment} average of 70%)
+3. **Support Activity:** {support_tickets_30d} tickets in last 30 days
+4. **Engagement:** Last interaction {last_engagement_days} days ago
 
-            # Generate realistic interaction content
-            if interaction_type == "Support Ticket":
-                topics = ["Bug report", "Feature request", "Integration help", "Performance issue", "Training request"]
-                topic = random.choice(topics)
-                sentiment = random.choice(["Frustrated", "Neutral", "Satisfied"])
-                resolution_time = random.randint(1, 72)  # hours
+## Detailed Analysis
 
-                content = f"{company} reported {topic.lower()}. Sentiment: {sentiment}. Resolved in {resolution_time}h."
+### Churn Category: {churn_category}
+This customer is exhibiting classic signs of {churn_category_lower}. Specifically, they have expressed concerns about: {specific_reason_lower}.
 
-            elif interaction_type == "Meeting":
-                meeting_types = ["Quarterly business review", "Training session", "Feature demo", "Renewal discussion"]
-                meeting_type = random.choice(meeting_types)
-                attendees = random.randint(2, 8)
+### Behavioral Patterns
+- Feature adoption has plateaued at {feature_adoption}%
+- Support ticket volume {ticket_trend}
+- Engagement frequency {engagement_trend}
 
-                content = f"{meeting_type} with {company}. {attendees} attendees. Discussed roadmap and usage patterns."
+### Segment-Specific Insights
+For {segment} customers, {churn_category_lower} typically requires {segment_need}.
 
-            elif interaction_type == "Call":
-                call_reasons = ["Check-in", "Issue escalation", "Feature question", "Expansion discussion"]
-                call_reason = random.choice(call_reasons)
-                duration = random.randint(15, 60)
+## Recommended Actions
 
-                content = f"{call_reason} call with {company}. Duration: {duration} minutes. {random.choice(['Positive', 'Neutral', 'Needs follow-up'])} outcome."
+### Immediate (Next 7 Days)
+1. Schedule {meeting}
+2. {owner_action}
+3. Review and address {specific_reason_lower}
 
-            else:  # Email or Feedback
-                content = f"Communication with {company} regarding {random.choice(['product updates', 'usage tips', 'billing', 'feedback request'])}."
+### Short-term (30 Days)
+1. Increase feature adoption from {feature_adoption}% to {target_adoption}%
+2. Reduce support tickets by {ticket_action}
+3. Establish regular {cadence} check-in cadence
 
-            interactions.append({
-                "company_name": company,
-                "segment": segment,
-                "interaction_date": interaction_date.strftime("%Y-%m-%d"),
-                "interaction_type": interaction_type,
-                "content": content,
-                "customer_tenure_months": tenure_months
-            })
+### Long-term (90 Days)
+1. Position {company} as reference customer
+2. Explore expansion opportunities
+3. Build executive relationships
+
+## Success Probability
+Based on similar {segment} customers with {churn_category_lower}, intervention at this stage has a {success_rate}% success rate.
+
+## Historical Context
+Previous {segment} customers with similar risk profiles who received {historical_strategy} showed {improvement} in retention metrics.
 
-    df = pd.DataFrame(interactions)
+---
+*Analysis Date: {analysis_date}*
+*Risk Score: {risk_score}%*
+*Segment: {segment}*"""
+
+def save_dataset(df, name):
+    """Write a dataset as CSV, plus a zstd-compressed Parquet copy when pyarrow is installed"""
+    df.to_csv(DATA_DIR / f"{name}.csv", index=False, chunksize=10_000)
+    if PARQUET_AVAILABLE:
+        df.to_parquet(DATA_DIR / f"{name}.parquet", compression="zstd", index=False)
+
+def _pick_from_groups(rng, groups, keys):
+    """Pick one random item from groups[key] for every key in keys"""
+    sizes = np.array([len(groups[k]) for k in keys])
+    idx = (rng.random(len(keys)) * sizes).astype(int)
+    return [groups[k][i] for k, i in zip(keys, idx)]
+
+def _integers_by_key(rng, ranges, keys):
+    """Draw one integer per key from the inclusive (low, high) range mapped to that key"""
+    low = np.array([ranges[k][0] for k in keys])
+    high = np.array([ranges[k][1] for k in keys])
+    return rng.integers(low, high + 1)
+
+def generate_customer_interactions(num_customers=100, seed=SEED):
+    """Generate detailed customer interaction history"""
+    rng = np.random.default_rng(seed)
+    companies = [
+        f"{name} {suffix}"
+        for name, suffix in zip(
+            rng.choice(_COMPANIES_A, num_customers),
+            rng.choice(['Systems', 'Solutions', 'Technologies', 'Corp'], num_customers)
+        )
+    ]
+    segments = rng.choice(_SEGMENTS_A, num_customers)
+    tenures = rng.integers(1, 49, num_customers)
+
+    # Generate 5-20 interactions per customer, then expand per-customer columns
+    counts = rng.integers(5, 21, num_customers)
+    total = int(counts.sum())
+    company = np.repeat(np.array(companies, dtype=object), counts)
+    segment = np.repeat(segments, counts)
+    tenure_months = np.repeat(tenures, counts)
+
+    days_ago = rng.integers(1, tenure_months * 30 + 1)
+    interaction_dates = (pd.Timestamp.now() - pd.to_timedelta(days_ago, unit="D")).strftime("%Y-%m-%d")
+
+    interaction_types = rng.choice(["Email", "Call", "Meeting", "Support Ticket", "Product Feedback"], total)
+
+    # Draw every random field up front; each row only uses the ones for its type
+    topics = rng.choice(["Bug report", "Feature request", "Integration help", "Performance issue", "Training request"], total)
+    sentiments = rng.choice(["Frustrated", "Neutral", "Satisfied"], total)
+    resolution_times = rng.integers(1, 73, total)  # hours
+    meeting_types = rng.choice(["Quarterly business review", "Training session", "Feature demo", "Renewal discussion"], total)
+    attendees = rng.integers(2, 9, total)
+    call_reasons = rng.choice(["Check-in", "Issue escalation", "Feature question", "Expansion discussion"], total)
+    durations = rng.integers(15, 61, total)
+    outcomes = rng.choice(['Positive', 'Neutral', 'Needs follow-up'], total)
+    email_topics = rng.choice(['product updates', 'usage tips', 'billing', 'feedback request'], total)
+
+    # Generate realistic interaction content
+    contents = []
+    for i in range(total):
+        interaction_type = interaction_types[i]
+        if interaction_type == "Support Ticket":
+            content = f"{company[i]} reported {topics[i].lower()}. Sentiment: {sentiments[i]}. Resolved in {resolution_times[i]}h."
+        elif interaction_type == "Meeting":
+            content = f"{meeting_types[i]} with {company[i]}. {attendees[i]} attendees. Discussed roadmap and usage patterns."
+        elif interaction_type == "Call":
+            content = f"{call_reasons[i]} call with {company[i]}. Duration: {durations[i]} minutes. {outcomes[i]} outcome."
+        else:  # Email or Feedback
+            content = f"Communication with {company[i]} regarding {email_topics[i]}."
+        contents.append(content)
+
+    columns = {
+        "company_name": company,
+        "segment": segment,
+        "interaction_date": interaction_dates,
+        "interaction_type": interaction_types,
+        "content": contents,
+        "customer_tenure_months": tenure_months
+    }
+    df = pd.DataFrame(columns, copy=False)
     df = df.sort_values("interaction_date", ascending=False)
-    df.to_csv(DATA_DIR / "customer_interactions.csv", index=False)
+    save_dataset(df, "customer_interactions")
     print(f"✅ Generated {len(df)} customer interactions")
     return df
 
-def generate_support_tickets(num_tickets=200):
+def generate_support_tickets(num_tickets=200, seed=SEED + 1):
     """Generate detailed support ticket data"""
-    tickets = []
+    rng = np.random.default_rng(seed)
+    # Resolution time range (hours) varies by severity
+    resolution_ranges = {"Critical": (1, 12), "High": (4, 48), "Medium": (12, 96), "Low": (24, 168)}
+
+    companies = [
+        f"{name} {suffix}"
+        for name, suffix in zip(
+            rng.choice(_COMPANIES_A, num_tickets),
+            rng.choice(['Inc', 'LLC', 'Corp'], num_tickets)
+        )
+    ]
+    segments = rng.choice(_SEGMENTS_A, num_tickets)
+    categories = rng.choice(_TICKET_CATS_A, num_tickets)
+    issues = _pick_from_groups(rng, _TICKET_ISSUES_T, categories)
+    severities = rng.choice(["Low", "Medium", "High", "Critical"], num_tickets)
+    resolution_hours = _integers_by_key(rng, resolution_ranges, severities)
+    csat_scores = rng.integers(1, 6, num_tickets)
+    fixes = rng.choice(['workaround', 'fix', 'documentation', 'configuration change', 'feature update'], num_tickets)
+
+    # Create dates
+    days_ago = rng.integers(1, 366, num_tickets)
+    created = pd.Timestamp.now() - pd.to_timedelta(days_ago, unit="D")
+    resolved = created + pd.to_timedelta(resolution_hours, unit="h")
+
+    # Generate ticket descriptions and resolution notes
+    descriptions = [
+        f"{company} ({segment}) reported: {issue}. Severity: {severity}. "
+        + ("Impacting business operations. " if severity in ("High", "Critical") else "")
+        for company, segment, issue, severity in zip(companies, segments, issues, severities)
+    ]
+    resolution_notes = [
+        f"Resolved by providing {fix}. Customer satisfaction: {csat}/5."
+        for fix, csat in zip(fixes, csat_scores)
+    ]
 
-    ticket_categories = {
-        "Technical": ["API error", "Integration issue", "Performance slow", "Data sync problem", "Authentication failure"],
-        "Feature": ["Missing functionality", "Feature request", "Workflow improvement", "UI/UX feedback"],
-        "Billing": ["Invoice question", "Pricing clarification", "Payment issue", "Plan change request"],
-        "Training": ["How-to question", "Best practices", "Setup help", "Documentation request"]
+    columns = {
+        "ticket_id": [f"TICKET-{ticket_id:05d}" for ticket_id in range(1, num_tickets + 1)],
+        "company_name": companies,
+        "segment": segments,
+        "category": categories,
+        "issue_type": issues,
+        "severity": severities,
+        "created_date": created.strftime("%Y-%m-%d %H:%M"),
+        "resolved_date": resolved.strftime("%Y-%m-%d %H:%M"),
+        "resolution_hours": resolution_hours,
+        "description": descriptions,
+        "resolution_notes": resolution_notes,
+        "csat_score": csat_scores
     }
-
-    for ticket_id in range(1, num_tickets + 1):
-        company = random.choice(COMPANY_NAMES) + f" {random.choice(['Inc', 'LLC', 'Corp'])}"
-        segment = random.choice(SEGMENTS)
-        category = random.choice(list(ticket_categories.keys()))
-        issue = random.choice(ticket_categories[category])
-
-        # Create date
-        days_ago = random.randint(1, 365)
-        created_date = datetime.now() - timedelta(days=days_ago)
-
-        # Resolution time varies by severity
-        severity = random.choice(["Low", "Medium", "High", "Critical"])
-        if severity == "Critical":
-            resolution_hours = random.randint(1, 12)
-        elif severity == "High":
-            resolution_hours = random.randint(4, 48)
-        elif severity == "Medium":
-            resolution_hours = random.randint(12, 96)
-        else:
-            resolution_hours = random.randint(24, 168)
-
-        resolved_date = created_date + timedelta(hours=resolution_hours)
-
-        # Customer satisfaction
-        csat_score = random.randint(1, 5)
-
-        # Generate ticket description
-        description = f"{company} ({segment}) reported: {issue}. Severity: {severity}. "
-
-        if severity in ["High", "Critical"]:
-            description += "Impacting business operations. "
-
-        # Resolution notes
-        resolution_notes = f"Resolved by providing {random.choice(['workaround', 'fix', 'documentation', 'configuration change', 'feature update'])}. "
-        resolution_notes += f"Customer satisfaction: {csat_score}/5."
-
-        tickets.append({
-            "ticket_id": f"TICKET-{ticket_id:05d}",
-            "company_name": company,
-            "segment": segment,
-            "category": category,
-            "issue_type": issue,
-            "severity": severity,
-            "created_date": created_date.strftime("%Y-%m-%d %H:%M"),
-            "resolved_date": resolved_date.strftime("%Y-%m-%d %H:%M"),
-            "resolution_hours": resolution_hours,
-            "description": description,
-            "resolution_notes": resolution_notes,
-            "csat_score": csat_score
-        })
-
-    df = pd.DataFrame(tickets)
-    df.to_csv(DATA_DIR / "support_tickets.csv", index=False)
+    df = pd.DataFrame(columns, copy=False)
+    save_dataset(df, "support_tickets")
     print(f"✅ Generated {len(df)} support tickets")
     return df
 
-def generate_success_stories(num_stories=50):
+def generate_success_stories(num_stories=50, seed=SEED + 2):
     """Generate customer success stories and case studies"""
-    stories = []
-
-    for story_id in range(1, num_stories + 1):
-        company = random.choice(COMPANY_NAMES) + " " + random.choice(["Systems", "Solutions", "Technologies"])
-        segment = random.choice(SEGMENTS)
-
-        # Pick a challenge and solution
-        challenge_category = random.choice(list(CHURN_REASONS.keys()))
-        specific_challenge = random.choice(CHURN_REASONS[challenge_category])
-        solution = random.choice(RETENTION_STRATEGIES[challenge_category])
-
-        # Generate metrics
-        if segment == "Enterprise":
-            arr = random.randint(100000, 500000)
-            team_size = random.randint(50, 500)
-        elif segment == "Commercial":
-            arr = random.randint(50000, 150000)
-            team_size = random.randint(20, 100)
-        else:  # SMB
-            arr = random.randint(10000, 60000)
-            team_size = random.randint(5, 30)
-
-        # Success metrics
-        adoption_before = random.randint(20, 50)
-        adoption_after = random.randint(70, 95)
-        engagement_increase = random.randint(30, 150)
-        support_tickets_reduction = random.randint(40, 80)
+    rng = np.random.default_rng(seed)
+    arr_ranges = {"Enterprise": (100000, 500000), "Commercial": (50000, 150000), "SMB": (10000, 60000)}
+    team_size_ranges = {"Enterprise": (50, 500), "Commercial": (20, 100), "SMB": (5, 30)}
+
+    companies = [
+        f"{name} {suffix}"
+        for name, suffix in zip(
+            rng.choice(_COMPANIES_A, num_stories),
+            rng.choice(["Systems", "Solutions", "Technologies"], num_stories)
+        )
+    ]
+    segments = rng.choice(_SEGMENTS_A, num_stories)
+
+    # Pick a challenge and solution
+    challenge_categories = rng.choice(_CHURN_CATS_A, num_stories)
+    specific_challenges = _pick_from_groups(rng, _CHURN_REASONS_T, challenge_categories)
+    solutions = _pick_from_groups(rng, _RETENTION_T, challenge_categories)
+
+    # Generate metrics
+    arrs = _integers_by_key(rng, arr_ranges, segments)
+    team_sizes = _integers_by_key(rng, team_size_ranges, segments)
+
+    # Success metrics
+    adoption_before = rng.integers(20, 51, num_stories)
+    adoption_after = rng.integers(70, 96, num_stories)
+    engagement_increase = rng.integers(30, 151, num_stories)
+    support_tickets_reduction = rng.integers(40, 81, num_stories)
+
+    titles = []
+    story_contents = []
+    for i in range(num_stories):
+        company = companies[i]
+        segment = segments[i]
+        challenge_category = challenge_categories[i]
 
         # Create story
-        story_title = f"How {company} Overcame {challenge_category} and Increased Adoption by {adoption_after - adoption_before}%"
+        titles.append(
+            f"How {company} Overcame {challenge_category} and Increased Adoption by {adoption_after[i] - adoption_before[i]}%"
+        )
 
-        story_content = f"""
+        story_contents.append(f"""
 **Company:** {company}
 **Segment:** {segment}
-**Team Size:** {team_size} employees
-**ARR:** ${arr:,}
+**Team Size:** {team_sizes[i]} employees
+**ARR:** ${arrs[i]:,}
 
 **Challenge:**
-{company} was facing {specific_challenge.lower()}. Their feature adoption was only {adoption_before}% and they were considering alternatives.
+{company} was facing {specific_challenges[i].lower()}. Their feature adoption was only {adoption_before[i]}% and they were considering alternatives.
 
 **Solution Implemented:**
-{solution}. Our Customer Success team worked closely with their leadership to create a customized plan.
+{solutions[i]}. Our Customer Success team worked closely with their leadership to create a customized plan.
 
 **Results:**
-- Feature adoption increased from {adoption_before}% to {adoption_after}%
-- User engagement improved by {engagement_increase}%
-- Support tickets reduced by {support_tickets_reduction}%
+- Feature adoption increased from {adoption_before[i]}% to {adoption_after[i]}%
+- User engagement improved by {engagement_increase[i]}%
+- Support tickets reduced by {support_tickets_reduction[i]}%
 - Successfully renewed and expanded contract
 - Became a reference customer and advocate
 
 **Key Learnings:**
 Early intervention and personalized support plans are critical for {segment} customers facing {challenge_category.lower()}.
-        """.strip()
-
-        stories.append({
-            "story_id": f"SUCCESS-{story_id:03d}",
-            "company_name": company,
-            "segment": segment,
-            "title": story_title,
-            "challenge_category": challenge_category,
-            "specific_challenge": specific_challenge,
-            "solution": solution,
-            "arr": arr,
-            "team_size": team_size,
-            "adoption_before": adoption_before,
-            "adoption_after": adoption_after,
-            "engagement_increase": engagement_increase,
-            "support_reduction": support_tickets_reduction,
-            "full_story": story_content
-        })
-
-    df = pd.DataFrame(stories)
-    df.to_csv(DATA_DIR / "success_stories.csv", index=False)
+        """.strip())
+
+    columns = {
+        "story_id": [f"SUCCESS-{story_id:03d}" for story_id in range(1, num_stories + 1)],
+        "company_name": companies,
+        "segment": segments,
+        "title": titles,
+        "challenge_category": challenge_categories,
+        "specific_challenge": specific_challenges,
+        "solution": solutions,
+        "arr": arrs,
+        "team_size": team_sizes,
+        "adoption_before": adoption_before,
+        "adoption_after": adoption_after,
+        "engagement_increase": engagement_increase,
+        "support_reduction": support_tickets_reduction,
+        "full_story": story_contents
+    }
+    df = pd.DataFrame(columns, copy=False)
+    save_dataset(df, "success_stories")
     print(f"✅ Generated {len(df)} success stories")
     return df
 
-def generate_churn_analysis_documents(num_docs=75):
+def generate_churn_analysis_documents(num_docs=75, seed=SEED + 3):
     """Generate detailed churn analysis documents for RAG"""
-    analyses = []
-
-    for doc_id in range(1, num_docs + 1):
-        company = random.choice(COMPANY_NAMES) + " " + random.choice(["Corp", "Inc", "LLC"])
-        segment = random.choice(SEGMENTS)
-
-        # Pick churn reason
-        churn_category = random.choice(list(CHURN_REASONS.keys()))
-        specific_reason = random.choice(CHURN_REASONS[churn_category])
-
-        # Generate customer profile
-        tenure_months = random.randint(3, 36)
-        if segment == "Enterprise":
-            arr = random.randint(100000, 500000)
-            risk_score = random.randint(60, 95)
-        elif segment == "Commercial":
-            arr = random.randint(50000, 150000)
-            risk_score = random.randint(55, 90)
-        else:
-            arr = random.randint(10000, 60000)
-            risk_score = random.randint(50, 85)
-
-        feature_adoption = random.randint(20, 60)
-        support_tickets_30d = random.randint(3, 15)
-        last_engagement_days = random.randint(7, 60)
-
-        # Generate analysis document
-        document = f"""
-# Churn Risk Analysis: {company}
-
-## Executive Summary
-{company} is a {segment} customer with ${arr:,} ARR and {tenure_months} months of tenure. Current risk score: {risk_score}%.
-
-## Risk Factors
-1. **Primary Concern:** {specific_reason}
-2. **Feature Adoption:** {feature_adoption}% (Below {segment} average of 70%)
-3. **Support Activity:** {support_tickets_30d} tickets in last 30 days
-4. **Engagement:** Last interaction {last_engagement_days} days ago
-
-## Detailed Analysis
-
-### Churn Category: {churn_category}
-This customer is exhibiting classic signs of {churn_category.lower()}. Specifically, they have expressed concerns about: {specific_reason.lower()}.
-
-### Behavioral Patterns
-- Feature adoption has plateaued at {feature_adoption}%
-- Support ticket volume {"increasing" if support_tickets_30d > 8 else "stable" if support_tickets_30d > 5 else "decreasing"}
-- Engagement frequency {"declining" if last_engagement_days > 30 else "stable"}
-
-### Segment-Specific Insights
-For {segment} customers, {churn_category.lower()} typically requires {"immediate executive intervention" if segment == "Enterprise" else "focused customer success efforts" if segment == "Commercial" else "product education and training"}.
-
-## Recommended Actions
-
-### Immediate (Next 7 Days)
-1. Schedule {"executive business review" if segment == "Enterprise" else "customer success call"}
-2. {"Assign dedicated technical account manager" if segment == "Enterprise" else "Prioritize support tickets"}
-3. Review and address {specific_reason.lower()}
-
-### Short-term (30 Days)
-1. Increase feature adoption from {feature_adoption}% to {min(feature_adoption + 25, 85)}%
-2. Reduce support tickets by {"implementing proactive monitoring" if support_tickets_30d > 8 else "improving documentation"}
-3. Establish regular {"weekly" if risk_score > 75 else "bi-weekly"} check-in cadence
-
-### Long-term (90 Days)
-1. Position {company} as reference customer
-2. Explore expansion opportunities
-3. Build executive relationships
-
-## Success Probability
-Based on similar {segment} customers with {churn_category.lower()}, intervention at this stage has a {random.randint(65, 85)}% success rate.
+    rng = np.random.default_rng(seed)
+    arr_ranges = {"Enterprise": (100000, 500000), "Commercial": (50000, 150000), "SMB": (10000, 60000)}
+    risk_score_ranges = {"Enterprise": (60, 95), "Commercial": (55, 90), "SMB": (50, 85)}
+
+    companies = [
+        f"{name} {suffix}"
+        for name, suffix in zip(
+            rng.choice(_COMPANIES_A, num_docs),
+            rng.choice(["Corp", "Inc", "LLC"], num_docs)
+        )
+    ]
+    segments = rng.choice(_SEGMENTS_A, num_docs)
+
+    # Pick churn reason
+    churn_categories = rng.choice(_CHURN_CATS_A, num_docs)
+    specific_reasons = _pick_from_groups(rng, _CHURN_REASONS_T, churn_categories)
+
+    # Generate customer profile
+    tenure_months = rng.integers(3, 37, num_docs)
+    arrs = _integers_by_key(rng, arr_ranges, segments)
+    risk_scores = _integers_by_key(rng, risk_score_ranges, segments)
+
+    feature_adoption = rng.integers(20, 61, num_docs)
+    support_tickets_30d = rng.integers(3, 16, num_docs)
+    last_engagement_days = rng.integers(7, 61, num_docs)
+
+    success_rates = rng.integers(65, 86, num_docs)
+    historical_strategies = _pick_from_groups(rng, _RETENTION_T, churn_categories)
+    significant_improvement = rng.random(num_docs) > 0.5
+    analysis_date = datetime.now().strftime("%Y-%m-%d")
+
+    # Derive the conditional phrases for every row up front
+    is_enterprise = segments == "Enterprise"
+    is_commercial = segments == "Commercial"
+    ticket_trends = np.select(
+        [support_tickets_30d > 8, support_tickets_30d > 5], ["increasing", "stable"], "decreasing"
+    )
+    engagement_trends = np.where(last_engagement_days > 30, "declining", "stable")
+    segment_needs = np.select(
+        [is_enterprise, is_commercial],
+        ["immediate executive intervention", "focused customer success efforts"],
+        "product education and training"
+    )
+    meetings = np.where(is_enterprise, "executive business review", "customer success call")
+    owners = np.where(is_enterprise, "Assign dedicated technical account manager", "Prioritize support tickets")
+    target_adoption = np.minimum(feature_adoption + 25, 85)
+    ticket_actions = np.where(
+        support_tickets_30d > 8, "implementing proactive monitoring", "improving documentation"
+    )
+    cadences = np.where(risk_scores > 75, "weekly", "bi-weekly")
+    improvements = np.where(significant_improvement, "significant improvement", "moderate improvement")
+
+    # Generate analysis documents
+    documents = [
+        CHURN_ANALYSIS_TEMPLATE.format(
+            company=companies[i],
+            segment=segments[i],
+            arr=arrs[i],
+            tenure_months=tenure_months[i],
+            risk_score=risk_scores[i],
+            specific_reason=specific_reasons[i],
+            specific_reason_lower=specific_reasons[i].lower(),
+            feature_adoption=feature_adoption[i],
+            support_tickets_30d=support_tickets_30d[i],
+            last_engagement_days=last_engagement_days[i],
+            churn_category=churn_categories[i],
+            churn_category_lower=churn_categories[i].lower(),
+            ticket_trend=ticket_trends[i],
+            engagement_trend=engagement_trends[i],
+            segment_need=segment_needs[i],
+            meeting=meetings[i],
+            owner_action=owners[i],
+            target_adoption=target_adoption[i],
+            ticket_action=ticket_actions[i],
+            cadence=cadences[i],
+            success_rate=success_rates[i],
+            historical_strategy=historical_strategies[i].lower(),
+            improvement=improvements[i],
+            analysis_date=analysis_date
+        )
+        for i in range(num_docs)
+    ]
 
-## Historical Context
-Previous {segment} customers with similar risk profiles who received {random.choice(RETENTION_STRATEGIES[churn_category]).lower()} showed {"significant improvement" if random.random() > 0.5 else "moderate improvement"} in retention metrics.
+    analyses = {
+        "doc_id": [f"ANALYSIS-{doc_id:04d}" for doc_id in range(1, num_docs + 1)],
+        "company_name": companies,
+        "segment": segments,
+        "churn_category": churn_categories,
+        "specific_reason": specific_reasons,
+        "arr": arrs,
+        "tenure_months": tenure_months,
+        "risk_score": risk_scores,
+        "feature_adoption": feature_adoption,
+        "support_tickets_30d": support_tickets_30d,
+        "last_engagement_days": last_engagement_days,
+        "document": documents
+    }
 
----
-*Analysis Date: {datetime.now().strftime("%Y-%m-%d")}*
-*Risk Score: {risk_score}%*
-*Segment: {segment}*
-        """.strip()
-
-        analyses.append({
-            "doc_id": f"ANALYSIS-{doc_id:04d}",
-            "company_name": company,
-            "segment": segment,
-            "churn_category": churn_category,
-            "specific_reason": specific_reason,
-            "arr": arr,
-            "tenure_months": tenure_months,
-            "risk_score": risk_score,
-            "feature_adoption": feature_adoption,
-            "support_tickets_30d": support_tickets_30d,
-            "last_engagement_days": last_engagement_days,
-            "document": document
-        })
-
-    df = pd.DataFrame(analyses)
-    df.to_csv(DATA_DIR / "churn_analyses.csv", index=False)
+    df = pd.DataFrame(analyses, copy=False)
+    save_dataset(df, "churn_analyses")
 
     # Also save as individual text files for easier RAG ingestion
     docs_dir = DATA_DIR / "churn_analysis_docs"
     docs_dir.mkdir(exist_ok=True)
 
-    for _, row in df.iterrows():
-        doc_path = docs_dir / f"{row['doc_id']}.txt"
-        with open(doc_path, 'w') as f:
-            f.write(row['document'])
+    def write_document(doc_id, document):
+        (docs_dir / f"{doc_id}.txt").write_bytes(document.encode("utf-8"))
+
+    # File writes are IO-bound, so overlap them across threads
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        list(executor.map(write_document, df["doc_id"].to_numpy(), df["document"].to_numpy()))
 
     print(f"✅ Generated {len(df)} churn analysis documents")
     print(f"✅ Saved individual documents to {docs_dir}")
@@ -423,16 +521,29 @@ def generate_rag_metadata():
 
     print(f"✅ Generated RAG metadata file")
 
+def _generate_and_count(fn, count, seed):
+    """Run a generator in a worker process; only the record count is sent back"""
+    return len(fn(count, seed))
+
 def main():
     """Generate all synthetic data"""
     print("🚀 Starting synthetic data generation for RAG system...")
     print("=" * 60)
 
-    # Generate all datasets
-    interactions_df = generate_customer_interactions(num_customers=100)
-    support_df = generate_support_tickets(num_tickets=200)
-    success_df = generate_success_stories(num_stories=50)
-    analyses_df = generate_churn_analysis_documents(num_docs=75)
+    # Generate all datasets; the generators are independent so run them in parallel
+    generators = {
+        "interactions": (generate_customer_interactions, 100, SEED),
+        "support": (generate_support_tickets, 200, SEED + 1),
+        "success": (generate_success_stories, 50, SEED + 2),
+        "analyses": (generate_churn_analysis_documents, 75, SEED + 3),
+    }
+    with ProcessPoolExecutor(max_workers=len(generators)) as executor:
+        futures = {
+            executor.submit(_generate_and_count, fn, count, seed): name
+            for name, (fn, count, seed) in generators.items()
+        }
+        # Each worker saves its own files, so the DataFrames never need to be pickled back
+        counts = {futures[future]: future.result() for future in as_completed(futures)}
 
     # Generate metadata
     generate_rag_metadata()
@@ -440,10 +551,10 @@ def main():
     print("=" * 60)
     print("✨ Data generation complete!")
     print(f"\n📊 Summary:")
-    print(f"  - Customer Interactions: {len(interactions_df)} records")
-    print(f"  - Support Tickets: {len(support_df)} records")
-    print(f"  - Success Stories: {len(success_df)} records")
-    print(f"  - Churn Analyses: {len(analyses_df)} records")
+    print(f"  - Customer Interactions: {counts['interactions']} records")
+    print(f"  - Support Tickets: {counts['support']} records")
+    print(f"  - Success Stories: {counts['success']} records")
+    print(f"  - Churn Analyses: {counts['analyses']} records")
     print(f"\n📁 All files saved to: {DATA_DIR.absolute()}")
     print(f"\n🎯 Next steps:")
     print(f"  1. Review generated data in {DATA_DIR}")
@@ -5,18 +5,35 @@ Loads synthetic data into vector database (Qdrant) with proper chunking and embe
 
 import pandas as pd
 from pathlib import Path
+import tiktoken
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import DirectoryLoader, TextLoader, CSVLoader
 from langchain.schema import Document
+from langchain.embeddings import CacheBackedEmbeddings
+from langchain.storage import LocalFileStore
 from langchain_openai import OpenAIEmbeddings
 from langchain_community.vectorstores import Qdrant
 from qdrant_client import QdrantClient
 from qdrant_client.http import models
+import asyncio
+import hashlib
+import json
+import mmap
 import os
-from typing import List
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List
 import logging
+import numpy as np
 from dotenv import load_dotenv
 
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -27,8 +44,104 @@ logger = logging.getLogger(__name__)
 DATA_DIR = Path("data")
 CHURN_DOCS_DIR = DATA_DIR / "churn_analysis_docs"
 COLLECTION_NAME = "churnguard_knowledge"
-CHUNK_SIZE = 500
-CHUNK_OVERLAP = 50
+# Query code (test_rag_retrieval.py) must embed with the same model and dimensions
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIMENSIONS = 512
+# Chunk sizes are in tokens (cl100k_base, the OpenAI embedding models' encoding)
+TOKEN_ENCODING = "cl100k_base"
+CHUNK_SIZE = 128
+CHUNK_OVERLAP = 16
+# Inputs per OpenAI embeddings request (API cap is 2048); 128-token chunks keep
+# each request far below the per-request token limit
+EMBED_BATCH_SIZE = 512
+# Max embedding requests in flight at once
+EMBED_CONCURRENCY = 16
+# On-disk embedding cache so re-runs only embed new or changed chunks
+EMBED_CACHE_DIR = Path(os.getenv("EMBED_CACHE_DIR", ".embed_cache"))
+# (hash, content, metadata, vector) rows from the last run, reused for bulk reloads
+EMBEDDINGS_SIDECAR = Path(f"embeddings_{EMBEDDING_MODEL}_{EMBEDDING_DIMENSIONS}.parquet")
+# Max source batches waiting between pipeline stages
+PIPELINE_QUEUE_SIZE = 2
+# End-of-stream marker passed between pipeline stages
+PIPELINE_DONE = object()
+QDRANT_GRPC_PORT = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+# Points per Qdrant upsert request
+UPSERT_BATCH_SIZE = 128
+# HNSW settings applied once the bulk load has finished
+HNSW_M = 16
+INDEXING_THRESHOLD = 20000
+# The collection stores int8-quantized vectors; oversample and rescore with the originals
+QUANTIZED_SEARCH_PARAMS = models.SearchParams(
+    quantization=models.QuantizationSearchParams(rescore=True, oversampling=2.0)
+)
+
+# Columns read from each CSV, with explicit dtypes to skip inference
+SUCCESS_STORY_COLUMNS = {
+    "story_id": "string",
+    "company_name": "string",
+    "segment": "category",
+    "challenge_category": "category",
+    "solution": "category",
+    "arr": "float64",
+    "adoption_before": "float32",
+    "adoption_after": "float32",
+    "full_story": "string"
+}
+SUPPORT_TICKET_COLUMNS = {
+    "ticket_id": "string",
+    "company_name": "string",
+    "segment": "category",
+    "category": "category",
+    "issue_type": "category",
+    "severity": "category",
+    "description": "string",
+    "resolution_notes": "string",
+    "resolution_hours": "int32",
+    "csat_score": "int8"
+}
+INTERACTION_COLUMNS = {
+    "company_name": "category",
+    "segment": "category",
+    "interaction_date": "string",
+    "interaction_type": "string",
+    "content": "string",
+    "customer_tenure_months": "int32"
+}
+
+# Support ticket document body (description plus resolution notes), filled per row
+SUPPORT_TICKET_TEMPLATE = """Support Ticket: {ticket_id}
+Company: {company_name} ({segment})
+Category: {category} - {issue_type}
+Severity: {severity}
+
+Description:
+{description}
+
+Resolution:
+{resolution_notes}
+
+Resolution Time: {resolution_hours} hours
+CSAT Score: {csat_score}/5"""
+
+def wait_for_green(client, collection_name, timeout=300, poll_interval=1.0):
+    """Block until the collection's optimizers have finished (status GREEN)"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if client.get_collection(collection_name).status == models.CollectionStatus.GREEN:
+            return True
+        time.sleep(poll_interval)
+    return False
+
+def load_churn_analysis_file(path: Path) -> Document:
+    """Read one churn analysis file through a read-only mmap and tag its metadata"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            text = ""
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                text = mm[:].decode("utf-8")
+    metadata = {"source": str(path), "source_type": "churn_analysis", "collection": "churn_analyses"}
+    return Document(page_content=text, metadata=metadata)
 
 class RAGDataIngestion:
     """Handles ingestion of all synthetic data into RAG system"""
@@ -45,24 +158,40 @@ class RAGDataIngestion:
                 "Please set your actual OpenAI API key in .env file or as environment variable."
             )
 
-        self.embeddings = OpenAIEmbeddings(openai_api_key=api_key)
+        underlying_embeddings = OpenAIEmbeddings(
+            model=EMBEDDING_MODEL,
+            dimensions=EMBEDDING_DIMENSIONS,
+            openai_api_key=api_key,
+            chunk_size=EMBED_BATCH_SIZE,
+            max_retries=6
+        )
+        # Cache keyed by sha256 of the chunk text; identical chunks are embedded once
+        self.embeddings = CacheBackedEmbeddings.from_bytes_store(
+            underlying_embeddings,
+            LocalFileStore(str(EMBED_CACHE_DIR)),
+            namespace=f"{EMBEDDING_MODEL}-{EMBEDDING_DIMENSIONS}",
+            key_encoder="sha256"
+        )
 
         # Store path/url for later use
         if use_local_qdrant:
             self.qdrant_path = "./qdrant_storage"
             self.qdrant_url = None
+            self.qdrant_api_key = None
             logger.info("Using local Qdrant storage")
         else:
             # For cloud Qdrant
             self.qdrant_url = os.getenv("QDRANT_URL")
-            qdrant_api_key = os.getenv("QDRANT_API_KEY")
-            if not self.qdrant_url or not qdrant_api_key:
+            self.qdrant_api_key = os.getenv("QDRANT_API_KEY")
+            if not self.qdrant_url or not self.qdrant_api_key:
                 raise ValueError("QDRANT_URL and QDRANT_API_KEY required for cloud mode")
             self.qdrant_path = None
             logger.info(f"Using cloud Qdrant at {self.qdrant_url}")
 
         # Text splitter for chunking
-        self.text_splitter = RecursiveCharacterTextSplitter(
+        self.encoding = tiktoken.get_encoding(TOKEN_ENCODING)
+        self.text_splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+            encoding_name=TOKEN_ENCODING,
             chunk_size=CHUNK_SIZE,
             chunk_overlap=CHUNK_OVERLAP,
             separators=["\n\n", "\n", ". ", " ", ""]
@@ -72,42 +201,37 @@ class RAGDataIngestion:
         """Load individual churn analysis documents"""
         logger.info(f"Loading churn analysis documents from {CHURN_DOCS_DIR}")
 
-        loader = DirectoryLoader(
-            str(CHURN_DOCS_DIR),
-            glob="*.txt",
-            loader_cls=TextLoader,
-            show_progress=True
-        )
+        # Overlap the per-file reads on a thread pool
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            documents = list(executor.map(load_churn_analysis_file, sorted(CHURN_DOCS_DIR.glob("*.txt"))))
 
-        documents = loader.load()
         logger.info(f"Loaded {len(documents)} churn analysis documents")
-
-        # Add metadata
-        for doc in documents:
-            doc.metadata["source_type"] = "churn_analysis"
-            doc.metadata["collection"] = "churn_analyses"
-
         return documents
 
     def load_success_stories(self) -> List[Document]:
         """Load success stories from CSV"""
         logger.info("Loading success stories")
 
-        df = pd.read_csv(DATA_DIR / "success_stories.csv")
+        df = pd.read_csv(
+            DATA_DIR / "success_stories.csv",
+            usecols=list(SUCCESS_STORY_COLUMNS),
+            dtype=SUCCESS_STORY_COLUMNS
+        )
         documents = []
 
-        for _, row in df.iterrows():
+        # Plain dicts per row; iterrows would box every row into a Series
+        for row in df.to_dict("records"):
             content = row['full_story']
 
             metadata = {
                 "source_type": "success_story",
-                "story_id": str(row['story_id']),
-                "company_name": str(row['company_name']),
-                "segment": str(row['segment']),
-                "challenge_category": str(row['challenge_category']),
-                "solution": str(row['solution']),
-                "arr": float(row['arr']),
-                "adoption_improvement": float(row['adoption_after'] - row['adoption_before'])
+                "story_id": row['story_id'],
+                "company_name": row['company_name'],
+                "segment": row['segment'],
+                "challenge_category": row['challenge_category'],
+                "solution": row['solution'],
+                "arr": row['arr'],
+                "adoption_improvement": row['adoption_after'] - row['adoption_before']
             }
 
             doc = Document(page_content=content, metadata=metadata)
@@ -120,34 +244,24 @@ class RAGDataIngestion:
         """Load support ticket data"""
         logger.info("Loading support tickets")
 
-        df = pd.read_csv(DATA_DIR / "support_tickets.csv")
+        df = pd.read_csv(
+            DATA_DIR / "support_tickets.csv",
+            usecols=list(SUPPORT_TICKET_COLUMNS),
+            dtype=SUPPORT_TICKET_COLUMNS
+        )
         documents = []
 
-        for _, row in df.iterrows():
-            # Combine description and resolution notes
-            content = f"""
-Support Ticket: {row['ticket_id']}
-Company: {row['company_name']} ({row['segment']})
-Category: {row['category']} - {row['issue_type']}
-Severity: {row['severity']}
-
-Description:
-{row['description']}
-
-Resolution:
-{row['resolution_notes']}
-
-Resolution Time: {row['resolution_hours']} hours
-CSAT Score: {row['csat_score']}/5
-            """.strip()
+        for row in df.to_dict("records"):
+            content = SUPPORT_TICKET_TEMPLATE.format_map(row)
 
             metadata = {
                 "source_type": "support_ticket",
-                "ticket_id": str(row['ticket_id']),
-                "company_name": str(row['company_name']),
-                "segment": str(row['segment']),
-                "category": str(row['category']),
-                "severity": str(row['severity']),
+                "ticket_id": row['ticket_id'],
+                "company_name": row['company_name'],
+                "segment": row['segment'],
+                "category": row['category'],
+                "severity": row['severity'],
+                # Stored as floats in the payload; the integer columns keep the text unchanged
                 "resolution_hours": float(row['resolution_hours']),
                 "csat_score": float(row['csat_score'])
             }
@@ -162,35 +276,42 @@ CSAT Score: {row['csat_score']}/5
         """Load customer interaction history"""
         logger.info("Loading customer interactions")
 
-        df = pd.read_csv(DATA_DIR / "customer_interactions.csv")
+        df = pd.read_csv(
+            DATA_DIR / "customer_interactions.csv",
+            usecols=list(INTERACTION_COLUMNS),
+            dtype=INTERACTION_COLUMNS
+        )
+
+        # Newest first, so each company's first rows are its most recent interactions
+        df = df.sort_values('interaction_date', ascending=False, kind='stable')
+        df['line'] = "[" + df['interaction_date'] + "] " + df['interaction_type'] + ": " + df['content']
 
         # Group interactions by company for better context
-        grouped = df.groupby('company_name')
+        summaries = df.groupby('company_name', observed=True).agg(
+            lines=('line', lambda lines: "\n".join(lines.head(10))),
+            segment=('segment', 'first'),
+            tenure_months=('customer_tenure_months', 'first'),
+            total_interactions=('line', 'size')
+        )
         documents = []
 
-        for company, interactions in grouped:
-            # Create summary document for each company
-            interaction_list = []
-            for _, row in interactions.iterrows():
-                interaction_list.append(
-                    f"[{row['interaction_date']}] {row['interaction_type']}: {row['content']}"
-                )
-
+        for company, lines, segment, tenure_months, total_interactions in summaries.itertuples():
+            # Create summary document for each company (up to 10 most recent interactions)
             content = f"""
 Customer Interaction History: {company}
-Segment: {interactions.iloc[0]['segment']}
-Tenure: {interactions.iloc[0]['customer_tenure_months']} months
+Segment: {segment}
+Tenure: {tenure_months} months
 
-Recent Interactions ({len(interaction_list)} total):
-{chr(10).join(interaction_list[:10])}  # Show up to 10 most recent
+Recent Interactions ({total_interactions} total):
+{lines}
             """.strip()
 
             metadata = {
                 "source_type": "interaction_history",
-                "company_name": str(company),
-                "segment": str(interactions.iloc[0]['segment']),
-                "total_interactions": int(len(interactions)),
-                "tenure_months": int(interactions.iloc[0]['customer_tenure_months'])
+                "company_name": company,
+                "segment": segment,
+                "total_interactions": int(total_interactions),  # size() yields numpy int64
+                "tenure_months": tenure_months
             }
 
             doc = Document(page_content=content, metadata=metadata)
@@ -203,68 +324,208 @@ Recent Interactions ({len(interaction_list)} total):
         """Split documents into chunks"""
         logger.info(f"Chunking {len(documents)} documents...")
 
-        chunked_docs = self.text_splitter.split_documents(documents)
+        # Documents that already fit in one chunk are kept as-is; only longer ones go
+        # through the splitter. Token counts are computed in one native batch call
+        token_counts = map(len, self.encoding.encode_ordinary_batch([doc.page_content for doc in documents]))
+        chunked_docs, long_docs = [], []
+        for doc, token_count in zip(documents, token_counts):
+            (chunked_docs if token_count <= CHUNK_SIZE else long_docs).append(doc)
+        chunked_docs.extend(self.text_splitter.split_documents(long_docs))
 
         logger.info(f"Created {len(chunked_docs)} chunks from {len(documents)} documents")
         return chunked_docs
 
-    def create_vectorstore(self, documents: List[Document]):
-        """Create or update Qdrant vectorstore with documents"""
-        logger.info(f"Creating vectorstore with {len(documents)} documents...")
-
-        # Create vectorstore - this will handle collection creation
-        vectorstore = Qdrant.from_documents(
-            documents=documents,
-            embedding=self.embeddings,
+    async def _embed_all(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts in EMBED_BATCH_SIZE batches with bounded concurrency, preserving order"""
+        semaphore = asyncio.Semaphore(EMBED_CONCURRENCY)
+
+        async def embed_batch(batch):
+            async with semaphore:
+                return await self.embeddings.aembed_documents(batch)
+
+        batches = await asyncio.gather(*(
+            embed_batch(texts[start:start + EMBED_BATCH_SIZE])
+            for start in range(0, len(texts), EMBED_BATCH_SIZE)
+        ))
+        return [vector for batch in batches for vector in batch]
+
+    def _load_sidecar(self) -> Dict[str, List[float]]:
+        """Vectors from the previous run's Parquet sidecar, keyed by content hash"""
+        if not PARQUET_AVAILABLE or not EMBEDDINGS_SIDECAR.exists():
+            return {}
+        df = pd.read_parquet(EMBEDDINGS_SIDECAR, columns=["hash", "vector"])
+        return {h: v.tolist() for h, v in zip(df["hash"], df["vector"])}
+
+    def _save_sidecar(self, hashes, texts, metadatas, vectors):
+        """Write this run's chunks and vectors to the zstd-compressed Parquet sidecar"""
+        if not PARQUET_AVAILABLE:
+            return
+        pd.DataFrame({
+            "hash": hashes,
+            "content": texts,
+            "metadata": [json.dumps(metadata) for metadata in metadatas],
+            "vector": [np.asarray(vector, dtype=np.float32) for vector in vectors]
+        }).to_parquet(EMBEDDINGS_SIDECAR, compression="zstd", index=False)
+
+    def create_vectorstore(self, chunk_batches: Iterable[List[Document]]):
+        """Create the Qdrant collection and fill it from batches of chunked documents"""
+        logger.info("Creating vectorstore...")
+
+        client = QdrantClient(
             path=self.qdrant_path if self.use_local_qdrant else None,
             url=self.qdrant_url if not self.use_local_qdrant else None,
+            api_key=self.qdrant_api_key,
+            # Server mode talks protobuf over gRPC; ignored for local storage
+            prefer_grpc=True,
+            grpc_port=QDRANT_GRPC_PORT
+        )
+
+        # Delete and recreate the collection. Indexing is disabled during the
+        # bulk load so the HNSW graph is built once afterwards
+        if client.collection_exists(COLLECTION_NAME):
+            client.delete_collection(COLLECTION_NAME)
+        client.create_collection(
+            collection_name=COLLECTION_NAME,
+            vectors_config=models.VectorParams(
+                size=EMBEDDING_DIMENSIONS,
+                distance=models.Distance.COSINE,
+                on_disk=True
+            ),
+            # int8 copies stay in RAM for search; on-disk originals are used for rescoring
+            quantization_config=models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=0.99,
+                    always_ram=True
+                )
+            ),
+            hnsw_config=models.HnswConfigDiff(m=0),
+            optimizers_config=models.OptimizersConfigDiff(indexing_threshold=0)
+        )
+        vectorstore = Qdrant(client=client, collection_name=COLLECTION_NAME, embeddings=self.embeddings)
+
+        known = self._load_sidecar()
+        if known:
+            logger.info(f"Loaded {len(known)} vectors from {EMBEDDINGS_SIDECAR}")
+        hashes, texts, metadatas = [], [], []
+
+        for documents in chunk_batches:
+            batch_texts = [doc.page_content for doc in documents]
+            batch_metadatas = [doc.metadata for doc in documents]
+
+            # Reuse known vectors; embed each distinct chunk not seen yet once, with
+            # concurrent batched requests. Duplicate chunks share a vector
+            batch_hashes = [hashlib.sha256(text.encode("utf-8")).hexdigest() for text in batch_texts]
+            missing = {h: text for h, text in zip(batch_hashes, batch_texts) if h not in known}
+            logger.info(f"Embedding {len(missing)} new distinct chunks of {len(batch_texts)}")
+            new_vectors = asyncio.run(self._embed_all(list(missing.values())))
+            known.update(zip(missing, new_vectors))
+
+            # Upload the (text, vector) pairs; payloads are generated lazily
+            # and ids are assigned client-side. One in-process worker, since
+            # parallel>1 would start a new process pool for every batch
+            client.upload_collection(
+                collection_name=COLLECTION_NAME,
+                vectors=[known[h] for h in batch_hashes],
+                payload=(
+                    {
+                        vectorstore.content_payload_key: text,
+                        vectorstore.metadata_payload_key: metadata
+                    }
+                    for text, metadata in zip(batch_texts, batch_metadatas)
+                ),
+                batch_size=UPSERT_BATCH_SIZE,
+                parallel=1
+            )
+            hashes.extend(batch_hashes)
+            texts.extend(batch_texts)
+            metadatas.extend(batch_metadatas)
+
+        self._save_sidecar(hashes, texts, metadatas, [known[h] for h in hashes])
+
+        # Re-enable indexing and build the HNSW graph in one pass
+        logger.info("Building HNSW index...")
+        client.update_collection(
             collection_name=COLLECTION_NAME,
-            force_recreate=True  # This will delete and recreate the collection
+            hnsw_config=models.HnswConfigDiff(m=HNSW_M),
+            optimizers_config=models.OptimizersConfigDiff(indexing_threshold=INDEXING_THRESHOLD)
         )
+        if not wait_for_green(client, COLLECTION_NAME):
+            logger.warning("Index build still in progress; collection will be searchable once optimized")
 
-        logger.info(f"✅ Vectorstore created successfully with collection '{COLLECTION_NAME}'")
+        logger.info(f"✅ Vectorstore created successfully with collection '{COLLECTION_NAME}' ({len(texts)} chunks)")
         return vectorstore
 
+    def _load_stage(self, loaders, load_q: queue.Queue, counts: Dict[str, int], errors: List[Exception]):
+        """Producer: run each loader and queue its documents"""
+        try:
+            for name, loader in loaders:
+                documents = loader()
+                counts[name] = len(documents)
+                load_q.put(documents)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            load_q.put(PIPELINE_DONE)
+
+    def _chunk_stage(self, load_q: queue.Queue, chunk_q: queue.Queue, errors: List[Exception]):
+        """Chunker: split each queued source's documents and queue the chunks"""
+        try:
+            while (documents := load_q.get()) is not PIPELINE_DONE:
+                chunk_q.put(self.chunk_documents(documents))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            chunk_q.put(PIPELINE_DONE)
+
     def ingest_all(self):
         """Main ingestion pipeline"""
         logger.info("=" * 60)
         logger.info("Starting RAG data ingestion pipeline")
         logger.info("=" * 60)
 
-        all_documents = []
+        loaders = [
+            ("Churn analyses", self.load_churn_analysis_documents),
+            ("Success stories", self.load_success_stories),
+            ("Support tickets", self.load_support_tickets),
+            ("Interaction histories", self.load_customer_interactions)
+        ]
 
-        # Load all data sources
+        # Loading, chunking and embedding run as a pipeline: one source can be embedded
+        # while the next is still being parsed and chunked. Bounded queues give backpressure
         logger.info("\n📥 Loading documents from all sources...")
-        churn_docs = self.load_churn_analysis_documents()
-        success_stories = self.load_success_stories()
-        support_tickets = self.load_support_tickets()
-        interactions = self.load_customer_interactions()
-
-        all_documents.extend(churn_docs)
-        all_documents.extend(success_stories)
-        all_documents.extend(support_tickets)
-        all_documents.extend(interactions)
-
-        logger.info(f"\n📊 Total documents loaded: {len(all_documents)}")
-        logger.info(f"  - Churn analyses: {len(churn_docs)}")
-        logger.info(f"  - Success stories: {len(success_stories)}")
-        logger.info(f"  - Support tickets: {len(support_tickets)}")
-        logger.info(f"  - Interaction histories: {len(interactions)}")
-
-        # Chunk documents
-        logger.info(f"\n✂️  Chunking documents (size={CHUNK_SIZE}, overlap={CHUNK_OVERLAP})...")
-        chunked_docs = self.chunk_documents(all_documents)
-
-        # Create vectorstore
-        logger.info("\n🔮 Creating embeddings and loading into Qdrant...")
-        vectorstore = self.create_vectorstore(chunked_docs)
+        logger.info(f"✂️  Chunking documents (size={CHUNK_SIZE} tokens, overlap={CHUNK_OVERLAP})...")
+        logger.info("🔮 Creating embeddings and loading into Qdrant...")
+        load_q = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        chunk_q = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        counts, errors = {}, []
+        stages = [
+            threading.Thread(target=self._load_stage, args=(loaders, load_q, counts, errors), daemon=True),
+            threading.Thread(target=self._chunk_stage, args=(load_q, chunk_q, errors), daemon=True)
+        ]
+        for stage in stages:
+            stage.start()
+
+        def chunk_batches():
+            while (chunks := chunk_q.get()) is not PIPELINE_DONE:
+                yield chunks
+
+        vectorstore = self.create_vectorstore(chunk_batches())
+        for stage in stages:
+            stage.join()
+        if errors:
+            raise errors[0]
+
+        logger.info(f"\n📊 Total documents loaded: {sum(counts.values())}")
+        for name, count in counts.items():
+            logger.info(f"  - {name}: {count}")
 
         logger.info("\n" + "=" * 60)
         logger.info("✨ RAG data ingestion complete!")
         logger.info("=" * 60)
         logger.info(f"\n📁 Vector database location: ./qdrant_storage")
         logger.info(f"🏷️  Collection name: {COLLECTION_NAME}")
-        logger.info(f"📄 Total chunks: {len(chunked_docs)}")
+        logger.info(f"📄 Total chunks: {vectorstore.client.count(COLLECTION_NAME).count}")
         logger.info(f"\n🎯 Next steps:")
         logger.info(f"  1. Test retrieval with sample queries")
         logger.info(f"  2. Integrate with multi-agent system")
@@ -280,7 +541,7 @@ def main():
     # Test retrieval
     logger.info("\n🧪 Testing retrieval...")
     test_query = "How to handle Enterprise customers with pricing concerns?"
-    results = vectorstore.similarity_search(test_query, k=3)
+    results = vectorstore.similarity_search(test_query, k=3, search_params=QUANTIZED_SEARCH_PARAMS)
 
     logger.info(f"\nTest Query: '{test_query}'")
     logger.info(f"Retrieved {len(results)} documents:")
@@ -29,6 +29,9 @@ COLLECTION_NAME = "churnguard_knowledge"
 CHUNK_SIZE = 500
 CHUNK_OVERLAP = 50
 QDRANT_URL = "http://localhost:6333"
+# Must match the query side (src/core/rag_helper.py)
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIMENSIONS = 512
 
 class RAGDataIngestion:
     """Handles ingestion of all synthetic data into RAG system"""
@@ -44,7 +47,11 @@ class RAGDataIngestion:
                 "Please set your actual OpenAI API key in .env file or as environment variable."
             )
 
-        self.embeddings = OpenAIEmbeddings(openai_api_key=api_key)
+        self.embeddings = OpenAIEmbeddings(
+            model=EMBEDDING_MODEL,
+            dimensions=EMBEDDING_DIMENSIONS,
+            openai_api_key=api_key
+        )
         self.qdrant_url = QDRANT_URL
         logger.info(f"Using Qdrant server at {self.qdrant_url}")
 
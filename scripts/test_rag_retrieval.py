@@ -7,7 +7,9 @@ import os
 from dotenv import load_dotenv
 from langchain_openai import OpenAIEmbeddings
 from langchain_community.vectorstores import Qdrant
+from langchain_core.documents import Document
 from qdrant_client import QdrantClient
+from qdrant_client.models import QuantizationSearchParams, QueryRequest, SearchParams
 
 # Load environment variables
 load_dotenv()
@@ -15,8 +17,15 @@ load_dotenv()
 # Configuration
 COLLECTION_NAME = "churnguard_knowledge"
 QDRANT_PATH = "./qdrant_storage"
-
-def test_rag_queries():
+# Must match the model and dimensions used by ingest_rag_data.py
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIMENSIONS = 512
+# The collection stores int8-quantized vectors; oversample and rescore with the originals
+QUANTIZED_SEARCH_PARAMS = SearchParams(
+    quantization=QuantizationSearchParams(rescore=True, oversampling=2.0)
+)
+
+def test_rag_queries(vectorstore):
     """Test various queries against the RAG system"""
 
     print("=" * 70)
@@ -24,23 +33,8 @@ def test_rag_queries():
     print("=" * 70)
     print()
 
-    # Initialize embeddings
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key or api_key == "your_key_here":
-        print("❌ Error: OPENAI_API_KEY not configured")
-        return
-
-    embeddings = OpenAIEmbeddings(openai_api_key=api_key)
-
-    # Initialize Qdrant client
-    client = QdrantClient(path=QDRANT_PATH)
-
-    # Create vectorstore
-    vectorstore = Qdrant(
-        client=client,
-        collection_name=COLLECTION_NAME,
-        embeddings=embeddings
-    )
+    client = vectorstore.client
+    embeddings = vectorstore.embeddings
 
     print(f"✅ Connected to Qdrant")
     print(f"📁 Collection: {COLLECTION_NAME}")
@@ -76,15 +70,30 @@ def test_rag_queries():
         }
     ]
 
-    for i, test in enumerate(test_queries, 1):
+    # Embed all queries in one request and run every search in one Qdrant call
+    query_vectors = embeddings.embed_documents([test['query'] for test in test_queries])
+    batch_results = client.query_batch_points(
+        collection_name=COLLECTION_NAME,
+        requests=[
+            QueryRequest(query=vector, limit=test['k'], with_payload=True, params=QUANTIZED_SEARCH_PARAMS)
+            for vector, test in zip(query_vectors, test_queries)
+        ]
+    )
+
+    for i, (test, response) in enumerate(zip(test_queries, batch_results), 1):
         print(f"\n{'='*70}")
         print(f"Test Query #{i}: {test['scenario']}")
         print(f"{'='*70}")
         print(f"Query: \"{test['query']}\"")
         print()
 
-        # Perform similarity search
-        results = vectorstore.similarity_search(test['query'], k=test['k'])
+        results = [
+            Document(
+                page_content=point.payload.get(vectorstore.content_payload_key, ''),
+                metadata=point.payload.get(vectorstore.metadata_payload_key) or {}
+            )
+            for point in response.points
+        ]
 
         print(f"📊 Retrieved {len(results)} documents:")
         print()
@@ -127,7 +136,7 @@ def test_rag_queries():
     print("  3. Build conversational interface with RAG")
     print()
 
-def test_with_score():
+def test_with_score(vectorstore):
     """Test retrieval with similarity scores"""
 
     print("\n" + "=" * 70)
@@ -135,22 +144,16 @@ def test_with_score():
     print("=" * 70)
     print()
 
-    api_key = os.getenv("OPENAI_API_KEY")
-    embeddings = OpenAIEmbeddings(openai_api_key=api_key)
-    client = QdrantClient(path=QDRANT_PATH)
-
-    vectorstore = Qdrant(
-        client=client,
-        collection_name=COLLECTION_NAME,
-        embeddings=embeddings
-    )
-
     query = "Commercial customer facing onboarding challenges"
     print(f"Query: \"{query}\"")
     print()
 
     # Search with scores
-    results = vectorstore.similarity_search_with_score(query, k=5)
+    results = vectorstore.similarity_search_with_score(
+        query,
+        k=5,
+        search_params=QUANTIZED_SEARCH_PARAMS
+    )
 
     print(f"📊 Top 5 Results with Similarity Scores:")
     print()
@@ -163,9 +166,42 @@ def test_with_score():
         print(f"     Preview: {doc.page_content[:150].replace(chr(10), ' ')}...")
         print()
 
+def build_vectorstore():
+    """
+    Vectorstore over the local collection, shared by both tests (local storage allows a
+    single open client). Returns None when the API key or the ingested collection is missing.
+    """
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key or api_key == "your_key_here":
+        print("❌ Error: OPENAI_API_KEY not configured")
+        return None
+    if not os.path.isdir(QDRANT_PATH):
+        print(f"❌ Error: no local Qdrant storage at {QDRANT_PATH} (run ingest_rag_data.py first)")
+        return None
+
+    embeddings = OpenAIEmbeddings(
+        model=EMBEDDING_MODEL,
+        dimensions=EMBEDDING_DIMENSIONS,
+        openai_api_key=api_key
+    )
+    client = QdrantClient(path=QDRANT_PATH)
+    if not client.collection_exists(COLLECTION_NAME):
+        print(f"❌ Error: collection '{COLLECTION_NAME}' not found (run ingest_rag_data.py first)")
+        client.close()
+        return None
+    return Qdrant(
+        client=client,
+        collection_name=COLLECTION_NAME,
+        embeddings=embeddings
+    )
+
 if __name__ == "__main__":
+    vectorstore = build_vectorstore()
+    if vectorstore is None:
+        raise SystemExit(1)
+
     # Run basic tests
-    test_rag_queries()
+    test_rag_queries(vectorstore)
 
     # Run test with scores
-    test_with_score()
+    test_with_score(vectorstore)
@@ -3,26 +3,275 @@ Customer Churn Analysis Agent
 LangGraph-based agent for intelligent churn prediction and analysis
 """
 
+import asyncio
+import json
 import os
+import re
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import TypedDict, Annotated, List, Dict, Optional, Literal
+from typing import TypedDict, Annotated, List, Dict, Optional, Tuple
 import operator
 import logging
 
+import httpx
+import tiktoken
 from langgraph.graph import StateGraph, END
 from langchain_openai import ChatOpenAI
 from langchain_core.documents import Document
 from langchain_core.tools import tool
 from langchain_community.tools.tavily_search import TavilySearchResults
+from pydantic import BaseModel, Field
 
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
 from core.rag_retrievers import ChurnRAGRetriever
 from core.knowledge_graph import ChurnKnowledgeGraph
+from core.caching import TTLCache, cache_key
+from utils.sync_runner import run_on_shared_loop, run_sync
 
 logger = logging.getLogger(__name__)
 
+# HTTP/2 needs the optional h2 package; without it the pool falls back to HTTP/1.1 keep-alive
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+LLM_MODEL = "gpt-4o-mini"
+LLM_TEMPERATURE = 0.7
+# Connection pool limits for the shared OpenAI HTTP clients
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+# Documents kept per query for the prompt and sources
+MAX_DOCUMENTS = 5
+# Token budget for retrieved context in the reasoning prompt
+CONTEXT_TOKEN_BUDGET = 3000
+# Max tokens for any single document or web result in that context
+CONTEXT_ITEM_TOKENS = 100
+# Characters of each web result's content kept as its snippet
+WEB_SNIPPET_CHARS = 200
+# Retrieval per query type as (retriever method, k, reported method). Risk assessment
+# used the metadata filter without filters, which is the same naive similarity search.
+RETRIEVAL_STRATEGIES = {
+    "risk_assessment": ("naive_retrieval", 5, "metadata_filtered"),
+    "pattern_analysis": ("multi_query_retrieval", 5, "multi_query"),
+    "retention_strategy": ("contextual_compression_retrieval", 5, "contextual_compression"),
+    "competitive_intel": ("naive_retrieval", 5, "competitor_filtered"),
+}
+DEFAULT_RETRIEVAL_STRATEGY = ("naive_retrieval", 5, "naive")
+# Strategies started before classification finishes. Only the plain vector search: the
+# multi-query and compression strategies make LLM calls of their own, which would be paid
+# for (and can't be cancelled once running) whenever the query type doesn't pick them
+SPECULATIVE_RETRIEVALS = {
+    "naive_retrieval": 5,
+}
+# Query classifications remembered so repeated queries skip the speculative fan-out
+CLASSIFICATION_CACHE_SIZE = 256
+# Keyword patterns that classify unambiguous queries without an LLM call
+QUERY_TYPE_PATTERNS = {
+    "competitive_intel": re.compile(
+        r"\bcompetit\w*|\bswitch(?:ed|ing)? to\b|\blost to\b|\bversus\b|\bvs\.?(?=\s)",
+        re.IGNORECASE
+    ),
+    "retention_strategy": re.compile(
+        r"\bretain\w*|\bretention\b|\bwin[- ]?back\b|\bprevent\w*\b|\breduce churn\b|\brecommend\w*",
+        re.IGNORECASE
+    ),
+    "risk_assessment": re.compile(
+        r"\bCUS-\d+\b|\bcustomer \S+ risk\b|\bat[- ]risk\b|\bchurn risk\b|\blikely to churn\b|\brisk (?:score|level)\b",
+        re.IGNORECASE
+    ),
+    "pattern_analysis": re.compile(
+        r"\bpatterns?\b|\btrends?\b|\bsegments?\b|\b(?:top|main|common|primary) (?:churn )?reasons?\b",
+        re.IGNORECASE
+    ),
+}
+CUSTOMER_ID_PATTERN = re.compile(r"\b(CUS-\d+)\b", re.IGNORECASE)
+# Query words that call for external (web) context
+WEB_SEARCH_TRIGGER = re.compile(r"industry|benchmark|trend", re.IGNORECASE)
+# Final responses and web search results kept for repeated queries
+RESPONSE_CACHE_SIZE = 256
+WEB_CACHE_SIZE = 256
+# Max queries abatch() runs at once
+BATCH_CONCURRENCY = 10
+# Worker threads shared by all queries for classification, speculative retrieval,
+# the KG lookup and web search (up to four tasks per query)
+CONTEXT_WORKERS = BATCH_CONCURRENCY * 4
+
+
+# Prompt templates, filled with str.format
+CLASSIFICATION_PROMPT = """Analyze this customer churn question and classify it:
+
+Question: {query}
+
+Classify into ONE category:
+1. risk_assessment - Predicting churn risk for specific customers
+2. pattern_analysis - Analyzing churn patterns, trends, or segments
+3. retention_strategy - Generating retention strategies or recommendations
+4. competitive_intel - Competitor analysis or competitive losses
+
+Also extract:
+- Customer ID if mentioned (or null)
+- Key entities mentioned (segments, competitors, products, reasons)
+
+Return ONLY a JSON object:
+{{
+    "query_type": "category",
+    "customer_id": "id or null",
+    "entities": ["entity1", "entity2"],
+    "reasoning": "brief explanation"
+}}"""
+
+REASONING_PROMPT = """You are a customer success analyst. Analyze the churn patterns and risks based on this data:
+
+QUESTION: {query}
+
+QUERY TYPE: {query_type}
+
+CUSTOMER DATA:
+{documents}
+
+KNOWLEDGE GRAPH INSIGHTS:
+{knowledge_graph}
+
+{web_section}
+
+Provide a comprehensive analysis:
+1. Key patterns identified
+2. Risk factors or insights
+3. Data-driven observations
+4. Comparative analysis (if applicable)
+
+Be specific, cite examples, and quantify where possible.
+
+Then generate 3-5 actionable retention recommendations based on your analysis:
+- Target the root causes identified
+- Provide concrete next steps
+- Prioritize by impact
+- Be specific to the segment/situation"""
+
+
+def extract_json(text: str):
+    """
+    Parse the first JSON object or array in an LLM response
+    
+    Strips markdown code fences, then scans once for the first '{' or '[' and its
+    matching closing bracket (ignoring brackets inside strings).
+    """
+    text = text.replace("```json", "").replace("```", "")
+    starts = [index for index in (text.find("{"), text.find("[")) if index != -1]
+    if not starts:
+        raise ValueError("No JSON found in response")
+    start = min(starts)
+    
+    depth = 0
+    in_string = False
+    escaped = False
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            depth += 1
+        elif char in "}]":
+            depth -= 1
+            if depth == 0:
+                return json.loads(text[start:index + 1])
+    
+    raise ValueError("Unterminated JSON in response")
+
+
+@lru_cache(maxsize=1)
+def _token_encoding():
+    """Tokenizer for the agent's chat model"""
+    return tiktoken.encoding_for_model(LLM_MODEL)
+
+
+def _truncate_tokens(text: str, max_tokens: int) -> Tuple[str, int]:
+    """Cut text to at most max_tokens tokens, returning it with its token count"""
+    encoding = _token_encoding()
+    tokens = encoding.encode_ordinary(text)
+    if len(tokens) <= max_tokens:
+        return text, len(tokens)
+    return encoding.decode(tokens[:max_tokens]) + "...", max_tokens
+
+
+def _format_kg_value(value) -> str:
+    """Render a KG value without Python repr quoting"""
+    if isinstance(value, dict):
+        return ", ".join(f"{key} {_format_kg_value(item)}" for key, item in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return ", ".join(_format_kg_value(item) for item in value)
+    if isinstance(value, float):
+        return f"{value:,.2f}"
+    return str(value)
+
+
+def _format_kg_results(kg_results: Dict) -> List[str]:
+    """One compact line per KG result group, e.g. 'Commercial: customer_count: 42 | ...'"""
+    lines = []
+    for group, value in kg_results.items():
+        if isinstance(value, dict) and any(isinstance(item, (dict, list)) for item in value.values()):
+            fields = " | ".join(f"{key}: {_format_kg_value(item)}" for key, item in value.items())
+        else:
+            fields = _format_kg_value(value)
+        lines.append(f"{group}: {fields}")
+    return lines
+
+
+def build_context(
+    documents: List[Document],
+    kg_results: Dict,
+    web_results: List[Dict],
+    max_tokens: int = CONTEXT_TOKEN_BUDGET
+) -> Dict[str, str]:
+    """
+    Render documents, KG insights and web results for the prompt within max_tokens
+    
+    Entries are added in priority order (documents by relevance, then KG lines,
+    then web results) until the budget is used up.
+    """
+    entries = [
+        ("documents", (
+            f"Customer: {doc.metadata.get('account_name', 'Unknown')}\n"
+            f"Segment: {doc.metadata.get('segment', 'N/A')}\n"
+            f"Churn Reason: {doc.metadata.get('churn_reason', 'N/A')}\n"
+            f"Details: {doc.page_content}"
+        ), CONTEXT_ITEM_TOKENS)
+        for doc in documents
+    ]
+    entries += [("knowledge_graph", line, max_tokens) for line in _format_kg_results(kg_results)]
+    entries += [
+        ("web", f"{result.get('title', '')} ({result.get('url', '')})\n{result.get('content', '')}",
+         CONTEXT_ITEM_TOKENS)
+        for result in web_results
+    ]
+    
+    sections = {"documents": [], "knowledge_graph": [], "web": []}
+    remaining = max_tokens
+    for section, text, limit in entries:
+        if remaining <= 0:
+            break
+        text, used = _truncate_tokens(text, min(limit, remaining))
+        sections[section].append(text)
+        remaining -= used
+    
+    return {
+        "documents": "\n\n".join(sections["documents"]),
+        "knowledge_graph": "\n".join(sections["knowledge_graph"]),
+        "web": "\n\n".join(sections["web"])
+    }
+
 
 class ChurnAgentState(TypedDict):
     """State for the churn analysis agent"""
@@ -40,19 +289,43 @@ class ChurnAgentState(TypedDict):
     errors: Annotated[List[str], operator.add]
 
 
+class AgentOutput(BaseModel):
+    """Structured analysis and recommendations returned by the LLM"""
+    analysis: str = Field(description="Comprehensive churn analysis answering the question")
+    recommendations: List[str] = Field(description="3-5 actionable retention recommendations")
+
+
 class CustomerChurnAgent:
     """
     LangGraph Agent for Customer Churn Analysis
     
     Agent flow:
-    1. Query understanding - Classify query type and extract intent
-    2. Retrieve documents - Use best retrieval method
-    3. Query knowledge graph - Get entity relationships
-    4. Analyze churn - Pattern analysis from context
-    5. Generate recommendations - Actionable strategies
-    6. Synthesize response - Final answer with sources
+    1. Gather context - Classify query type while speculatively retrieving documents,
+       then keep the best retrieval method's results and concurrently query the
+       knowledge graph and search the web (if needed)
+    2. Reason - Pattern analysis and actionable strategies in one structured LLM call
+    3. Synthesize response - Final answer with sources
     """
     
+    # Chat models shared across agent instances, keyed on (model, temperature)
+    _shared_llms: Dict[Tuple[str, float], ChatOpenAI] = {}
+    _shared_llms_lock = threading.Lock()
+    
+    @classmethod
+    def _get_llm(cls, model: str = LLM_MODEL, temperature: float = LLM_TEMPERATURE) -> ChatOpenAI:
+        """Return the shared chat model, creating it with pooled HTTP clients on first use"""
+        with cls._shared_llms_lock:
+            key = (model, temperature)
+            if key not in cls._shared_llms:
+                cls._shared_llms[key] = ChatOpenAI(
+                    model=model,
+                    temperature=temperature,
+                    openai_api_key=os.getenv("OPENAI_API_KEY"),
+                    http_client=httpx.Client(http2=HTTP2_AVAILABLE, limits=HTTP_LIMITS),
+                    http_async_client=httpx.AsyncClient(http2=HTTP2_AVAILABLE, limits=HTTP_LIMITS)
+                )
+            return cls._shared_llms[key]
+    
     def __init__(
         self,
         rag_retriever: Optional[ChurnRAGRetriever] = None,
@@ -69,16 +342,23 @@ class CustomerChurnAgent:
         """
         logger.info("Initializing Customer Churn Agent...")
         
-        # Initialize LLM
-        self.llm = ChatOpenAI(
-            model="gpt-4o-mini",
-            temperature=0.7,
-            openai_api_key=os.getenv("OPENAI_API_KEY")
-        )
+        # Initialize LLM (shared with other agent instances)
+        self.llm = self._get_llm()
+        self.structured_llm = self.llm.with_structured_output(AgentOutput)
         
         # Store components
         self.rag_retriever = rag_retriever
         self.knowledge_graph = knowledge_graph
+        self._classification_cache = TTLCache(CLASSIFICATION_CACHE_SIZE)
+        self._web_cache = TTLCache(WEB_CACHE_SIZE)
+        self._response_cache = TTLCache(RESPONSE_CACHE_SIZE)
+        # One pool for context gathering, reused by every query
+        self._executor = ThreadPoolExecutor(max_workers=CONTEXT_WORKERS, thread_name_prefix="churn-context")
+        
+        # Knowledge graph aggregates, recomputed when the graph version changes
+        self._kg_cache_version = None
+        self._kg_summary_cache = {}
+        self._segment_patterns_cache = {}
         
         # Initialize Tavily if enabled
         self.tavily_search = None
@@ -111,40 +391,22 @@ class CustomerChurnAgent:
         workflow = StateGraph(ChurnAgentState)
         
         # Add nodes
-        workflow.add_node("understand_query", self._understand_query)
-        workflow.add_node("retrieve_documents", self._retrieve_documents)
-        workflow.add_node("query_knowledge_graph", self._query_knowledge_graph)
-        workflow.add_node("search_web", self._search_web)
-        workflow.add_node("analyze_churn", self._analyze_churn_risk)
-        workflow.add_node("generate_recommendations", self._generate_recommendations)
+        workflow.add_node("gather_context", self._gather_context)
+        workflow.add_node("reason", self._reason)
         workflow.add_node("synthesize_response", self._synthesize_response)
         
         # Set entry point
-        workflow.set_entry_point("understand_query")
+        workflow.set_entry_point("gather_context")
         
         # Add edges
-        workflow.add_edge("understand_query", "retrieve_documents")
-        workflow.add_edge("retrieve_documents", "query_knowledge_graph")
-        
-        # Conditional edge: search web if needed
-        workflow.add_conditional_edges(
-            "query_knowledge_graph",
-            self._should_search_web,
-            {
-                "search_web": "search_web",
-                "analyze": "analyze_churn"
-            }
-        )
-        
-        workflow.add_edge("search_web", "analyze_churn")
-        workflow.add_edge("analyze_churn", "generate_recommendations")
-        workflow.add_edge("generate_recommendations", "synthesize_response")
+        workflow.add_edge("gather_context", "reason")
+        workflow.add_edge("reason", "synthesize_response")
         workflow.add_edge("synthesize_response", END)
         
-        logger.info("✓ StateGraph built with 7 nodes")
+        logger.info("✓ StateGraph built with 3 nodes")
         return workflow
     
-    def _understand_query(self, state: ChurnAgentState) -> ChurnAgentState:
+    def _understand_query(self, state: ChurnAgentState) -> Dict:
         """
         Understand and categorize the user query
         
@@ -156,58 +418,104 @@ class CustomerChurnAgent:
         """
         logger.info(f"Understanding query: {state['query'][:100]}...")
         
-        classification_prompt = f"""Analyze this customer churn question and classify it:
-
-Question: {state['query']}
-
-Classify into ONE category:
-1. risk_assessment - Predicting churn risk for specific customers
-2. pattern_analysis - Analyzing churn patterns, trends, or segments
-3. retention_strategy - Generating retention strategies or recommendations
-4. competitive_intel - Competitor analysis or competitive losses
-
-Also extract:
-- Customer ID if mentioned (or null)
-- Key entities mentioned (segments, competitors, products, reasons)
-
-Return ONLY a JSON object:
-{{
-    "query_type": "category",
-    "customer_id": "id or null",
-    "entities": ["entity1", "entity2"],
-    "reasoning": "brief explanation"
-}}"""
+        classification_prompt = CLASSIFICATION_PROMPT.format(query=state["query"])
         
         try:
             response = self.llm.invoke(classification_prompt)
-            content = response.content.strip()
-            
-            # Try to extract JSON from markdown code blocks if present
-            import json
-            import re
-            
-            # Remove markdown code blocks if present
-            json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', content, re.DOTALL)
-            if json_match:
-                content = json_match.group(1)
+            result = extract_json(response.content)
             
-            # Parse JSON
-            result = json.loads(content)
-            
-            state["query_type"] = result.get("query_type", "pattern_analysis")
+            classification = {"query_type": result.get("query_type", "pattern_analysis")}
             if result.get("customer_id"):
-                state["customer_id"] = result["customer_id"]
+                classification["customer_id"] = result["customer_id"]
             
-            logger.info(f"✓ Query classified as: {state['query_type']}")
+            logger.info(f"✓ Query classified as: {classification['query_type']}")
+            return classification
             
         except Exception as e:
             logger.error(f"Query classification failed: {e}")
-            state["query_type"] = "pattern_analysis"  # Default
-            state["errors"] = [f"Query classification error: {str(e)}"]
+            return {
+                "query_type": "pattern_analysis",  # Default
+                "errors": [f"Query classification error: {str(e)}"]
+            }
+    
+    def _fast_classify(self, query: str) -> Optional[Dict]:
+        """
+        Classify the query with keyword patterns, skipping the LLM when exactly one type matches
+        
+        Returns None when no pattern or more than one pattern matches.
+        """
+        matches = [
+            query_type for query_type, pattern in QUERY_TYPE_PATTERNS.items()
+            if pattern.search(query)
+        ]
+        if len(matches) != 1:
+            return None
+        
+        classification = {"query_type": matches[0]}
+        customer_match = CUSTOMER_ID_PATTERN.search(query)
+        if customer_match:
+            classification["customer_id"] = customer_match.group(1)
+        
+        logger.info(f"✓ Query pre-classified as: {matches[0]}")
+        return classification
+    
+    def _gather_context(self, state: ChurnAgentState) -> Dict:
+        """
+        Classify the query and fetch documents, knowledge graph insights and web results
+        
+        The LLM-free naive retrieval is started speculatively alongside the classification
+        LLM call and kept if the query type picks it; LLM-backed strategies only run once
+        they are picked. The KG lookup and web search run concurrently while retrieval finishes.
+        """
+        logger.info("Classifying query and gathering context...")
+        query = state["query"]
+        executor = self._executor
         
-        return state
+        speculative = {}
+        classification = (
+            self._classification_cache.get(cache_key(query)) or self._fast_classify(query)
+        )
+        if classification is None:
+            classify = executor.submit(self._understand_query, state)
+            if self.rag_retriever:
+                speculative = {
+                    strategy: executor.submit(getattr(self.rag_retriever, strategy), query, k=k)
+                    for strategy, k in SPECULATIVE_RETRIEVALS.items()
+                }
+            classification = classify.result()
+            if not classification.get("errors"):
+                self._classification_cache.set(cache_key(query), classification)
+        
+        updates = [classification]
+        classified = {**state, **classification}
+        
+        fetchers = [self._query_knowledge_graph]
+        if self._should_search_web(classified):
+            fetchers.append(self._search_web)
+        pending = [executor.submit(fetch, classified) for fetch in fetchers]
+        
+        retrieval = self._retrieve_documents(classified, speculative)
+        updates.append(retrieval)
+        updates.extend(future.result() for future in pending)
+        # Drop speculative retrievals that weren't picked if they haven't started yet
+        for future in speculative.values():
+            future.cancel()
+        
+        # Web search also backs up retrieval when too few documents came back
+        if (
+            self._search_web not in fetchers and self.tavily_search
+            and len(retrieval.get("documents", [])) < 2
+        ):
+            logger.info("→ Few documents retrieved, searching web for additional context")
+            updates.append(self._search_web(classified))
+        
+        context = {"errors": []}
+        for update in updates:
+            context["errors"].extend(update.get("errors", []))
+            context.update({key: value for key, value in update.items() if key != "errors"})
+        return context
     
-    def _retrieve_documents(self, state: ChurnAgentState) -> ChurnAgentState:
+    def _retrieve_documents(self, state: ChurnAgentState, speculative: Optional[Dict] = None) -> Dict:
         """
         Retrieve relevant documents using best retrieval method
         
@@ -216,64 +524,39 @@ Return ONLY a JSON object:
         - pattern_analysis: multi-query retrieval (diverse perspectives)
         - retention_strategy: contextual compression (focused insights)
         - competitive_intel: metadata filtering by competitor
+        
+        Results of a matching speculative retrieval future are used when given.
         """
         logger.info(f"Retrieving documents for {state['query_type']}...")
         
         if not self.rag_retriever:
             logger.warning("RAG retriever not initialized, skipping document retrieval")
-            state["documents"] = []
-            state["retrieval_method"] = "none"
-            return state
+            return {"documents": [], "retrieval_method": "none"}
         
         try:
             query = state["query"]
             query_type = state.get("query_type", "pattern_analysis")
+            strategy, k, method = RETRIEVAL_STRATEGIES.get(query_type, DEFAULT_RETRIEVAL_STRATEGY)
             
-            # Select retrieval method based on query type
-            if query_type == "risk_assessment":
-                # Use metadata filtering for targeted retrieval
-                if state.get("customer_id"):
-                    docs = self.rag_retriever.retrieve_with_metadata_filter(
-                        query=query,
-                        k=5
-                    )
-                else:
-                    docs = self.rag_retriever.naive_retrieval(query, k=5)
-                method = "metadata_filtered"
-            
-            elif query_type == "pattern_analysis":
-                # Use multi-query for diverse perspectives
-                docs = self.rag_retriever.multi_query_retrieval(query, k=5)
-                method = "multi_query"
-            
-            elif query_type == "retention_strategy":
-                # Use contextual compression for focused insights
-                docs = self.rag_retriever.contextual_compression_retrieval(query, k=5)
-                method = "contextual_compression"
-            
-            elif query_type == "competitive_intel":
-                # Use metadata filtering by competitor
-                docs = self.rag_retriever.naive_retrieval(query, k=7)
-                method = "competitor_filtered"
-            
+            if speculative and strategy in speculative:
+                docs = speculative[strategy].result()
             else:
-                # Default to naive retrieval
-                docs = self.rag_retriever.naive_retrieval(query, k=5)
-                method = "naive"
+                docs = getattr(self.rag_retriever, strategy)(query, k=k)
+            # Multi-query returns the union of its sub-queries; only the top documents are used
+            docs = docs[:MAX_DOCUMENTS]
             
-            state["documents"] = docs
-            state["retrieval_method"] = method
             logger.info(f"✓ Retrieved {len(docs)} documents using {method}")
+            return {"documents": docs, "retrieval_method": method}
             
         except Exception as e:
             logger.error(f"Document retrieval failed: {e}")
-            state["documents"] = []
-            state["retrieval_method"] = "failed"
-            state["errors"] = [f"Retrieval error: {str(e)}"]
-        
-        return state
+            return {
+                "documents": [],
+                "retrieval_method": "failed",
+                "errors": [f"Retrieval error: {str(e)}"]
+            }
     
-    def _query_knowledge_graph(self, state: ChurnAgentState) -> ChurnAgentState:
+    def _query_knowledge_graph(self, state: ChurnAgentState) -> Dict:
         """
         Query knowledge graph for entity relationships
         
@@ -287,33 +570,26 @@ Return ONLY a JSON object:
         
         if not self.knowledge_graph:
             logger.warning("Knowledge graph not initialized, skipping")
-            state["kg_results"] = {}
-            return state
+            return {"kg_results": {}}
         
         try:
             query_type = state.get("query_type", "pattern_analysis")
             kg_results = {}
             
+            self._refresh_kg_caches()
+            
             # Extract insights based on query type
             if query_type == "pattern_analysis":
                 # Get segment patterns
-                for segment in ["Commercial", "SMB", "Mid-Market", "Strategic", "Enterprise"]:
-                    patterns = self.knowledge_graph.get_churn_patterns(segment)
-                    if patterns and patterns.get("customer_count", 0) > 0:
-                        kg_results[segment] = patterns
+                kg_results.update(self._segment_patterns_cache)
             
             elif query_type == "competitive_intel":
-                # Get competitor insights
-                competitors = self.knowledge_graph.get_entity_by_type("Competitor")
-                kg_results["competitors"] = competitors[:10]
-                
                 # Get top competitors by customer count
-                competitor_counts = {}
-                for comp in competitors[:10]:
-                    customers = self.knowledge_graph.query_customers_by_competitor(comp)
-                    if customers:
-                        competitor_counts[comp] = len(customers)
-                kg_results["competitor_counts"] = competitor_counts
+                top_competitors = list(self.knowledge_graph.competitor_counts.items())[:10]
+                kg_results["competitors"] = [comp for comp, _ in top_competitors]
+                kg_results["competitor_counts"] = {
+                    comp: count for comp, count in top_competitors if count
+                }
             
             elif query_type == "retention_strategy":
                 # Get churn reasons
@@ -321,189 +597,134 @@ Return ONLY a JSON object:
                 kg_results["churn_reasons"] = reasons[:15]
             
             # Always include summary stats
-            kg_results["summary"] = {
-                "total_customers": len(self.knowledge_graph.get_entity_by_type("Customer")),
-                "segments": len(self.knowledge_graph.get_entity_by_type("Segment")),
-                "churn_reasons": len(self.knowledge_graph.get_entity_by_type("ChurnReason")),
-                "competitors": len(self.knowledge_graph.get_entity_by_type("Competitor"))
-            }
+            kg_results["summary"] = dict(self._kg_summary_cache)
             
-            state["kg_results"] = kg_results
             logger.info(f"✓ Knowledge graph query complete: {len(kg_results)} result groups")
+            return {"kg_results": kg_results}
             
         except Exception as e:
             logger.error(f"Knowledge graph query failed: {e}")
-            state["kg_results"] = {}
-            state["errors"] = [f"KG query error: {str(e)}"]
-        
-        return state
+            return {"kg_results": {}, "errors": [f"KG query error: {str(e)}"]}
     
-    def _should_search_web(self, state: ChurnAgentState) -> Literal["search_web", "analyze"]:
+    def _refresh_kg_caches(self) -> None:
+        """Recompute KG summary stats and segment patterns if the graph has changed"""
+        version = self.knowledge_graph.version
+        if version == self._kg_cache_version:
+            return
+        
+        entity_counts = self.knowledge_graph.get_entity_type_counts()
+        self._kg_summary_cache = {
+            "total_customers": entity_counts.get("Customer", 0),
+            "segments": entity_counts.get("Segment", 0),
+            "churn_reasons": entity_counts.get("ChurnReason", 0),
+            "competitors": entity_counts.get("Competitor", 0)
+        }
+        
+        all_patterns = self.knowledge_graph.get_churn_patterns_bulk(
+            ["Commercial", "SMB", "Mid-Market", "Strategic", "Enterprise"]
+        )
+        self._segment_patterns_cache = {
+            segment: patterns for segment, patterns in all_patterns.items()
+            if patterns and patterns.get("customer_count", 0) > 0
+        }
+        self._kg_cache_version = version
+    
+    def _should_search_web(self, state: ChurnAgentState) -> bool:
         """
-        Decide whether to search web for external context
+        Decide up front whether to search web for external context
         
         Search web if:
         - Query mentions industry trends or benchmarks
         - Competitive intelligence needed
-        - No sufficient documents retrieved
+        
+        (Too few retrieved documents also triggers a search, see _gather_context)
         """
-        query = state["query"].lower()
-        query_type = state.get("query_type")
-        doc_count = len(state.get("documents", []))
-        
-        # Search if competitive intel or low document count
-        should_search = (
-            query_type == "competitive_intel" or
-            doc_count < 2 or
-            "industry" in query or
-            "benchmark" in query or
-            "trend" in query
+        # Only if Tavily is available
+        should_search = bool(self.tavily_search) and (
+            state.get("query_type") == "competitive_intel"
+            or WEB_SEARCH_TRIGGER.search(state["query"]) is not None
         )
-        
-        # But only if Tavily is available
-        if should_search and self.tavily_search:
+        if should_search:
             logger.info("→ Will search web for additional context")
-            return "search_web"
-        else:
-            logger.info("→ Proceeding to analysis without web search")
-            return "analyze"
+        return should_search
     
-    def _search_web(self, state: ChurnAgentState) -> ChurnAgentState:
+    def _search_web(self, state: ChurnAgentState) -> Dict:
         """Search web for industry benchmarks and trends"""
         logger.info("Searching web for external context...")
         
         if not self.tavily_search:
-            state["web_results"] = []
-            return state
+            return {"web_results": []}
         
         try:
             # Create search query
             query = state["query"]
             search_query = f"customer churn SaaS {query}"
             
-            results = self.tavily_search.invoke(search_query)
-            state["web_results"] = results[:3]  # Top 3 results
+            key = cache_key(search_query)
+            web_results = self._web_cache.get(key)
+            if web_results is None:
+                results = self.tavily_search.invoke(search_query)
+                logger.info(f"✓ Found {len(results)} web results")
+                # Top 3 results, keeping only the fields the prompt and sources use
+                web_results = [
+                    {
+                        "title": result.get("title", ""),
+                        "url": result.get("url", ""),
+                        "content": result.get("content", "")[:WEB_SNIPPET_CHARS]
+                    }
+                    for result in results[:3]
+                ]
+                self._web_cache.set(key, web_results)
+            else:
+                logger.info("✓ Using cached web results")
             
-            logger.info(f"✓ Found {len(results)} web results")
+            return {"web_results": web_results}
             
         except Exception as e:
             logger.error(f"Web search failed: {e}")
-            state["web_results"] = []
-            state["errors"] = [f"Web search error: {str(e)}"]
-        
-        return state
+            return {"web_results": [], "errors": [f"Web search error: {str(e)}"]}
     
-    def _analyze_churn_risk(self, state: ChurnAgentState) -> ChurnAgentState:
+    async def _reason(self, state: ChurnAgentState) -> Dict:
         """
-        Analyze churn risk based on retrieved context
+        Analyze churn risk and generate recommendations in one LLM call
         
         Synthesizes:
         - Document context
         - Knowledge graph patterns
         - Web research (if available)
+        into an analysis plus actionable retention recommendations
         """
-        logger.info("Analyzing churn patterns and risks...")
-        
-        # Prepare context
-        doc_context = "\n\n".join([
-            f"Customer: {doc.metadata.get('account_name', 'Unknown')}\n"
-            f"Segment: {doc.metadata.get('segment', 'N/A')}\n"
-            f"Churn Reason: {doc.metadata.get('churn_reason', 'N/A')}\n"
-            f"Details: {doc.page_content[:300]}..."
-            for doc in state.get("documents", [])[:5]
-        ])
+        logger.info("Analyzing churn patterns and generating recommendations...")
         
-        kg_context = str(state.get("kg_results", {}))
-        web_context = str(state.get("web_results", []))
+        # Prepare context within the prompt's token budget
+        context = build_context(
+            state.get("documents", []),
+            state.get("kg_results") or {},
+            state.get("web_results") or []
+        )
         
-        analysis_prompt = f"""You are a customer success analyst. Analyze the churn patterns and risks based on this data:
-
-QUESTION: {state['query']}
-
-QUERY TYPE: {state.get('query_type')}
-
-CUSTOMER DATA:
-{doc_context}
-
-KNOWLEDGE GRAPH INSIGHTS:
-{kg_context}
-
-{'WEB RESEARCH:\n' + web_context if state.get('web_results') else ''}
-
-Provide a comprehensive analysis:
-1. Key patterns identified
-2. Risk factors or insights
-3. Data-driven observations
-4. Comparative analysis (if applicable)
-
-Be specific, cite examples, and quantify where possible."""
+        reasoning_prompt = REASONING_PROMPT.format(
+            query=state["query"],
+            query_type=state.get("query_type"),
+            documents=context["documents"],
+            knowledge_graph=context["knowledge_graph"],
+            web_section=f"WEB RESEARCH:\n{context['web']}" if context["web"] else ""
+        )
         
         try:
-            response = self.llm.invoke(analysis_prompt)
-            state["analysis"] = response.content
-            logger.info("✓ Analysis complete")
+            result = await self.structured_llm.ainvoke(reasoning_prompt)
+            logger.info(f"✓ Analysis complete with {len(result.recommendations)} recommendations")
+            return {"analysis": result.analysis, "recommendations": result.recommendations}
             
         except Exception as e:
             logger.error(f"Analysis failed: {e}")
-            state["analysis"] = f"Analysis error: {str(e)}"
-            state["errors"] = [f"Analysis error: {str(e)}"]
-        
-        return state
-    
-    def _generate_recommendations(self, state: ChurnAgentState) -> ChurnAgentState:
-        """
-        Generate actionable retention recommendations
-        
-        Based on:
-        - Identified patterns
-        - Successful retention examples (if available)
-        - Industry best practices
-        """
-        logger.info("Generating recommendations...")
-        
-        recommendations_prompt = f"""Based on this churn analysis, generate 3-5 actionable retention recommendations:
-
-ANALYSIS:
-{state.get('analysis', 'No analysis available')}
-
-Generate specific, actionable recommendations:
-- Target the root causes identified
-- Provide concrete next steps
-- Prioritize by impact
-- Be specific to the segment/situation
-
-Return as a JSON array:
-["Recommendation 1", "Recommendation 2", "Recommendation 3"]"""
-        
-        try:
-            import json
-            import re
-            
-            response = self.llm.invoke(recommendations_prompt)
-            content = response.content.strip()
-            
-            # Try to extract JSON array from markdown code blocks if present
-            json_match = re.search(r'```(?:json)?\s*(\[.*?\])\s*```', content, re.DOTALL)
-            if json_match:
-                content = json_match.group(1)
-            
-            # Parse JSON array
-            recommendations = json.loads(content)
-            
-            if isinstance(recommendations, list):
-                state["recommendations"] = recommendations
-                logger.info(f"✓ Generated {len(recommendations)} recommendations")
-            else:
-                state["recommendations"] = [str(recommendations)]
-            
-        except Exception as e:
-            logger.error(f"Recommendation generation failed: {e}")
-            state["recommendations"] = ["Unable to generate recommendations due to error"]
-            state["errors"] = [f"Recommendation error: {str(e)}"]
-        
-        return state
+            return {
+                "analysis": f"Analysis error: {str(e)}",
+                "recommendations": ["Unable to generate recommendations due to error"],
+                "errors": [f"Analysis error: {str(e)}"]
+            }
     
-    def _synthesize_response(self, state: ChurnAgentState) -> ChurnAgentState:
+    async def _synthesize_response(self, state: ChurnAgentState) -> Dict:
         """
         Synthesize final response with sources and confidence
         
@@ -522,15 +743,14 @@ Return as a JSON array:
             error_count = len(state.get("errors") or [])
             
             confidence = min(1.0, (doc_count * 0.15 + kg_data * 0.1 - error_count * 0.2))
-            confidence = max(0.0, confidence)
-            state["confidence_score"] = round(confidence, 2)
+            confidence = round(max(0.0, confidence), 2)
             
             # Build sources list
             sources = []
             
             # Add document sources
             documents = state.get("documents") or []
-            for doc in documents[:5]:
+            for doc in documents:
                 sources.append({
                     "type": "customer_data",
                     "customer": doc.metadata.get("account_name"),
@@ -557,32 +777,20 @@ Return as a JSON array:
                     "relevance": "medium"
                 })
             
-            state["sources"] = sources
-            logger.info(f"✓ Response synthesized (confidence: {state['confidence_score']})")
+            logger.info(f"✓ Response synthesized (confidence: {confidence})")
+            return {"confidence_score": confidence, "sources": sources}
             
         except Exception as e:
             logger.error(f"Response synthesis failed: {e}")
-            state["confidence_score"] = 0.0
-            state["sources"] = []
-            state["errors"] = [f"Synthesis error: {str(e)}"]
-        
-        return state
+            return {
+                "confidence_score": 0.0,
+                "sources": [],
+                "errors": [f"Synthesis error: {str(e)}"]
+            }
     
-    def run(self, query: str, customer_id: str = None) -> Dict:
-        """
-        Run the agent on a query
-        
-        Args:
-            query: User question or request
-            customer_id: Optional customer ID for specific analysis
-        
-        Returns:
-            Agent response with analysis, recommendations, sources, and metadata
-        """
-        logger.info(f"Running agent on query: {query[:100]}...")
-        
-        # Initialize state
-        initial_state = ChurnAgentState(
+    def _initial_state(self, query: str, customer_id: Optional[str]) -> ChurnAgentState:
+        """Empty agent state for a new query"""
+        return ChurnAgentState(
             query=query,
             customer_id=customer_id,
             query_type=None,
@@ -596,38 +804,101 @@ Return as a JSON array:
             retrieval_method=None,
             errors=[]
         )
+    
+    def _format_response(self, query: str, final_state: ChurnAgentState, response_key: str) -> Dict:
+        """Build the response dict from the final state and cache it if error-free"""
+        response = {
+            "query": query,
+            "query_type": final_state.get("query_type"),
+            "analysis": final_state.get("analysis"),
+            "recommendations": final_state.get("recommendations", []),
+            "confidence_score": final_state.get("confidence_score", 0.0),
+            "sources": final_state.get("sources", []),
+            "retrieval_method": final_state.get("retrieval_method"),
+            "documents_retrieved": len(final_state.get("documents", [])),
+            "kg_insights": len(final_state.get("kg_results", {})),
+            "errors": final_state.get("errors", [])
+        }
+        
+        logger.info(f"✅ Agent execution complete (confidence: {response['confidence_score']})")
+        if not response["errors"]:
+            self._response_cache.set(response_key, json.dumps(response))
+        return response
+    
+    @staticmethod
+    def _failure_response(query: str, error: Exception) -> Dict:
+        """Response returned when the graph itself fails"""
+        logger.error(f"Agent execution failed: {error}")
+        return {
+            "query": query,
+            "error": str(error),
+            "analysis": f"Agent execution failed: {str(error)}",
+            "recommendations": [],
+            "confidence_score": 0.0,
+            "sources": []
+        }
+    
+    def run(self, query: str, customer_id: str = None) -> Dict:
+        """
+        Run the agent on a query
+        
+        Args:
+            query: User question or request
+            customer_id: Optional customer ID for specific analysis
+        
+        Returns:
+            Agent response with analysis, recommendations, sources, and metadata
+        """
+        # The reasoning and synthesis nodes are async, so the graph always runs on an
+        # event loop; the shared one keeps the pooled async client's connections valid
+        return run_sync(self._arun(query, customer_id))
+    
+    async def arun(self, query: str, customer_id: str = None) -> Dict:
+        """
+        Run the agent on a query without blocking the event loop
+        
+        Same as run(). The LLM nodes await the model directly; context gathering (thread
+        pool fan-out over synchronous clients) runs on a LangGraph worker thread.
+        """
+        # The chat model (and its pooled async client) is shared process-wide and also
+        # used by run(), so every run executes on the same loop whichever loop awaits it
+        return await run_on_shared_loop(self._arun(query, customer_id))
+    
+    async def _arun(self, query: str, customer_id: Optional[str]) -> Dict:
+        """Run the agent graph on the current event loop"""
+        logger.info(f"Running agent on query: {query[:100]}...")
+        
+        response_key = cache_key(query, customer_id, self.llm.model_name)
+        cached = self._response_cache.get(response_key)
+        if cached is not None:
+            logger.info("✅ Returning cached response")
+            return json.loads(cached)
         
         try:
-            # Run the graph
-            final_state = self.app.invoke(initial_state)
-            
-            # Format response
-            response = {
-                "query": query,
-                "query_type": final_state.get("query_type"),
-                "analysis": final_state.get("analysis"),
-                "recommendations": final_state.get("recommendations", []),
-                "confidence_score": final_state.get("confidence_score", 0.0),
-                "sources": final_state.get("sources", []),
-                "retrieval_method": final_state.get("retrieval_method"),
-                "documents_retrieved": len(final_state.get("documents", [])),
-                "kg_insights": len(final_state.get("kg_results", {})),
-                "errors": final_state.get("errors", [])
-            }
-            
-            logger.info(f"✅ Agent execution complete (confidence: {response['confidence_score']})")
-            return response
+            final_state = await self.app.ainvoke(self._initial_state(query, customer_id))
+            return self._format_response(query, final_state, response_key)
             
         except Exception as e:
-            logger.error(f"Agent execution failed: {e}")
-            return {
-                "query": query,
-                "error": str(e),
-                "analysis": f"Agent execution failed: {str(e)}",
-                "recommendations": [],
-                "confidence_score": 0.0,
-                "sources": []
-            }
+            return self._failure_response(query, e)
+    
+    async def abatch(self, queries: List[str], max_concurrency: int = BATCH_CONCURRENCY) -> List[Dict]:
+        """
+        Run the agent on several queries concurrently
+        
+        At most max_concurrency queries are in flight at once to respect OpenAI rate limits.
+        Results are returned in query order.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def run_one(query: str) -> Dict:
+            async with semaphore:
+                return await self.arun(query)
+        
+        results = await asyncio.gather(*(run_one(query) for query in queries), return_exceptions=True)
+        return [
+            self._failure_response(query, result) if isinstance(result, Exception) else result
+            for query, result in zip(queries, results)
+        ]
 
 
 def create_churn_agent(
@@ -655,7 +926,6 @@ def create_churn_agent(
 
 if __name__ == "__main__":
     # Test the agent
-    import logging
     logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
     
     print("\n" + "="*80)
@@ -666,7 +936,7 @@ if __name__ == "__main__":
     agent = create_churn_agent(rag_retriever=None, knowledge_graph=None, use_tavily=False)
     
     print(f"\n✅ Agent created successfully")
-    print(f"   - StateGraph nodes: 7")
+    print(f"   - StateGraph nodes: 3")
     print(f"   - Tools available: RAG, KG, Tavily (if configured)")
     print(f"   - Query types: risk_assessment, pattern_analysis, retention_strategy, competitive_intel")
     
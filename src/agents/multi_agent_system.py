@@ -3,42 +3,302 @@ Multi-Agent System Coordinator
 Orchestrates Research Team and Document Writing Team for comprehensive churn analysis
 """
 
+import asyncio
+import json
 import os
 import logging
-from typing import TypedDict, Dict, Optional, List, Annotated
+import random
+import time
+from functools import lru_cache
+from typing import (
+    TYPE_CHECKING, TypedDict, Dict, Optional, List, Annotated, Literal, NamedTuple, Tuple, AsyncIterator
+)
 import operator
 
-from langgraph.graph import StateGraph, END
-from langchain_openai import ChatOpenAI
+import httpx
+from langchain_core.documents import Document
+from pydantic import BaseModel, Field
 
-from agents.research_team import ResearchTeam, create_research_team
-from agents.writing_team import WritingTeam, create_writing_team
-from core.rag_retrievers import ChurnRAGRetriever
-from core.knowledge_graph import ChurnKnowledgeGraph
+from core.caching import TTLCache, cache_key, normalize_query
+from utils.sync_runner import run_sync
+
+# LangGraph, the OpenAI clients and the team modules take seconds to import, so they are
+# imported where first used; importing this module (e.g. for the factory) stays cheap
+if TYPE_CHECKING:
+    from langgraph.graph import StateGraph
+    from core.rag_retrievers import ChurnRAGRetriever
+    from core.knowledge_graph import ChurnKnowledgeGraph
 
 logger = logging.getLogger(__name__)
 
+# HTTP/2 needs the optional h2 package; without it the pool falls back to HTTP/1.1 keep-alive
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Connection pool shared by the coordinator's and both teams' OpenAI clients
+HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+HTTP_TIMEOUT_SECONDS = 60
+# Retries for transient OpenAI errors (rate limits, connection errors, 5xx),
+# with exponential backoff and jitter
+LLM_RETRY_ATTEMPTS = 3
+LLM_RETRY_BASE_DELAY_SECONDS = 0.5
+# Proactive pacing of OpenAI requests across the coordinator and both teams
+# (token bucket refilled at this rate, holding up to one second's worth); 0 disables
+OPENAI_REQUESTS_PER_SECOND = float(os.getenv("OPENAI_REQUESTS_PER_SECOND", "0"))
+# Consecutive failed calls that stop LLM-backed stages, and for how long
+CIRCUIT_FAIL_MAX = 5
+CIRCUIT_RESET_SECONDS = 30
+# Exact-match caches keyed on the normalized query text
+CLASSIFICATION_CACHE_SIZE = 1024
+RESPONSE_CACHE_SIZE = 256
+# Confidence signals (background, insights, response length, citations, style notes):
+# weight of each and the count at which it saturates
+CONFIDENCE_WEIGHTS = (0.2, 0.15, 0.3, 0.2, 0.15)
+CONFIDENCE_CAPS = (1, 5, 1, 5, 4)
+# Branch each signal comes from (None: always produced); routes that skip a branch drop
+# its signals and spread their weight over the rest, so every route can reach 1.0
+CONFIDENCE_SIGNAL_BRANCHES = ("research_phase", "research_phase", None, "use_case_retrieval", None)
+# Responses longer than this get full length credit, shorter ones half
+LONG_RESPONSE_CHARS = 500
+# Branches run before the Writing Team composes, per query type ("full" otherwise):
+# strategy and general questions draw on use cases rather than background research,
+# competitor questions on research rather than individual use cases (they are written
+# without any, instead of the Writing Team fetching them after research)
+QUERY_ROUTES = {
+    "retention_strategy": "write_only",
+    "general_inquiry": "write_only",
+    "competitive_intel": "research_only",
+}
+ROUTE_BRANCHES = {
+    "full": ["research_phase", "use_case_retrieval"],
+    "research_only": ["research_phase"],
+    "write_only": ["use_case_retrieval"],
+}
+# Separator framing the stage banners in the logs
+_BAR = "=" * 80
+# Shared default for missing sequence fields, so lookups don't allocate empty lists
+_EMPTY = ()
+# Max analyses analyze_batch() runs at once
+BATCH_CONCURRENCY = 5
+# OpenAI Batch API settings for analyze_batch(mode="offline")
+OFFLINE_BATCH_WINDOW = "24h"
+OFFLINE_POLL_SECONDS = 30
+
+# One call classifies the query and extracts the research team's retrieval hints
+CLASSIFICATION_PROMPT = """Classify this customer churn query and extract search hints:
+
+Question: {query}
+
+Classify into ONE category:
+1. risk_assessment - Predicting churn risk for specific customers
+2. pattern_analysis - Analyzing churn patterns, trends, or segments
+3. retention_strategy - Generating retention strategies
+4. competitive_intel - Competitor analysis
+5. general_inquiry - General questions
+
+Also list 2-3 short search phrases for the internal knowledge base, and any
+customer segments, competitors or churn reasons named in the question."""
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling OpenAI while the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Opens after fail_max consecutive failures; after reset_timeout the next call is let through"""
+    
+    def __init__(self, fail_max: int = CIRCUIT_FAIL_MAX, reset_timeout: float = CIRCUIT_RESET_SECONDS):
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+    
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None and time.monotonic() - self._opened_at < self.reset_timeout
+    
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+    
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._failures >= self.fail_max:
+            # A failed trial call after the timeout re-opens the circuit
+            self._opened_at = time.monotonic()
+
+
+# Shared by all coordinator instances, since they talk to the same API
+OPENAI_CIRCUIT = CircuitBreaker()
+
+
+async def call_with_retry(func, *args, breaker: CircuitBreaker = OPENAI_CIRCUIT, **kwargs):
+    """Await func(*args, **kwargs), retrying transient OpenAI errors unless the circuit is open"""
+    from openai import APIConnectionError, InternalServerError, RateLimitError
+    
+    if breaker.is_open:
+        raise CircuitOpenError("OpenAI circuit breaker is open")
+    
+    for attempt in range(LLM_RETRY_ATTEMPTS):
+        try:
+            result = await func(*args, **kwargs)
+        except (RateLimitError, APIConnectionError, InternalServerError) as e:
+            if attempt == LLM_RETRY_ATTEMPTS - 1:
+                breaker.record_failure()
+                raise
+            delay = LLM_RETRY_BASE_DELAY_SECONDS * 2 ** attempt
+            logger.warning("Transient LLM error (%s), retrying in ~%.1fs", e, delay)
+            await asyncio.sleep(delay + random.uniform(0, delay))
+        else:
+            breaker.record_success()
+            return result
+
+
+@lru_cache(maxsize=None)
+def _banner(title: str) -> str:
+    """Log banner for a stage title, built once per title"""
+    return f"\n{_BAR}\n{title}\n{_BAR}"
+
+
+def build_confidence_scorer(weights=CONFIDENCE_WEIGHTS, caps=CONFIDENCE_CAPS, active=None):
+    """
+    Specialize the confidence formula for fixed weights and caps
+    
+    Returns score(has_context, insights, long_response, citations, style_notes) with the
+    zero-weight terms dropped. Signals whose flag in active is False are left out and the
+    remaining weights rescaled to sum to the same total; with none active it scores 0.0.
+    """
+    if active is not None:
+        total = sum(weights)
+        kept = sum(weight for weight, on in zip(weights, active) if on)
+        if not kept:
+            return lambda has_context, insights, long_response, citations, style_notes: 0.0
+        weights = tuple(weight * total / kept if on else 0 for weight, on in zip(weights, active))
+    # Background and response length are already within [0, 1], so they need no cap
+    factors = (
+        lambda value: 1 if value else 0,
+        None,
+        lambda value: 1 if value else 0.5,
+        None,
+        None
+    )
+    terms = tuple(
+        (index, weight, cap, factor)
+        for index, (weight, cap, factor) in enumerate(zip(weights, caps, factors))
+        if weight
+    )
+    
+    def score(has_context, insights, long_response, citations, style_notes):
+        signals = (has_context, insights, long_response, citations, style_notes)
+        total = 0
+        for index, weight, cap, factor in terms:
+            value = signals[index] if factor is None else factor(signals[index])
+            total += weight * (value if factor and cap == 1 else min(value / cap, 1))
+        return total
+    
+    return score
+
+
+class QueryClassification(BaseModel):
+    """Query category, constrained to the known types so no free-text parsing is needed"""
+    query_type: Literal[
+        "risk_assessment", "pattern_analysis", "retention_strategy",
+        "competitive_intel", "general_inquiry"
+    ] = Field(description="Category of the customer churn query")
+    retrieval_keywords: List[str] = Field(
+        description="2-3 short search phrases for retrieving relevant internal documents"
+    )
+    kg_seed_entities: List[str] = Field(
+        description="Customer segments, competitors or churn reasons named in the query"
+    )
+
+
+class SourceRecord(NamedTuple):
+    """Research source carried through the graph as a compact immutable record"""
+    type: str
+    title: str = ""
+    url: str = ""
+    customer: Optional[str] = None
+    segment: Optional[str] = None
+    
+    @classmethod
+    def from_dict(cls, source: Dict) -> "SourceRecord":
+        return cls(
+            type=source.get("type", ""),
+            title=source.get("title", ""),
+            url=source.get("url", ""),
+            customer=source.get("customer"),
+            segment=source.get("segment")
+        )
+    
+    def to_dict(self) -> Dict:
+        """Dict in the research team's format (internal data vs external research fields)"""
+        if self.type == "internal_data":
+            return {"type": self.type, "customer": self.customer, "segment": self.segment}
+        return {"type": self.type, "title": self.title, "url": self.url}
+
+
+class SourceRegistry:
+    """Per-analysis store that interns sources by URL so both phases refer to them by id"""
+    
+    def __init__(self):
+        self._records: List = []
+        self._ids: Dict = {}
+    
+    @staticmethod
+    def _key(record):
+        if isinstance(record, SourceRecord):
+            return record.url or tuple(record)
+        return record.get("url") or json.dumps(record, sort_keys=True, default=str)
+    
+    def intern(self, record) -> int:
+        """Id of the record, registering it on first sight (the first record for a key wins)"""
+        key = self._key(record)
+        source_id = self._ids.get(key)
+        if source_id is None:
+            source_id = len(self._records)
+            self._records.append(record)
+            self._ids[key] = source_id
+        return source_id
+    
+    def materialize(self, ids) -> List[Dict]:
+        """Dicts for the distinct ids, in first-seen order"""
+        return [
+            record.to_dict() if isinstance(record, SourceRecord) else record
+            for record in map(self._records.__getitem__, dict.fromkeys(ids))
+        ]
+    
+    def __len__(self) -> int:
+        return len(self._records)
+
 
 class MultiAgentState(TypedDict):
     """State for multi-agent system"""
     query: str
     query_type: Optional[str]
+    retrieval_keywords: List[str]
+    kg_seed_entities: List[str]
     
-    # Research Team outputs
+    # Research Team outputs (list fields use reducers so parallel branches merge)
     background_context: str
-    research_insights: List[str]
-    research_sources: List[Dict]
+    research_insights: Annotated[Tuple[str, ...], operator.add]
+    research_source_ids: Annotated[Tuple[int, ...], operator.add]
     
     # Writing Team outputs
+    use_cases: List[Document]
     final_response: str
     draft_response: str
-    citations: List[Dict]
+    citation_ids: Annotated[Tuple[int, ...], operator.add]
     style_notes: List[str]
     
     # Metadata
     confidence_score: float
-    processing_stages: List[str]
+    processing_stages: Annotated[List[str], operator.add]
     errors: Annotated[List[str], operator.add]
+    source_registry: SourceRegistry
 
 
 class MultiAgentChurnSystem:
@@ -66,9 +326,8 @@ class MultiAgentChurnSystem:
     │ • RAG Tool (Policies)          │ • RAG Tool (Use Cases)
     │ • Tavily Search               │ • Sub-Agents:
     │ • Knowledge Graph             │   - Document Writer
-    │                                │   - Copy Editor
+    │                                │   - Editor (copy + empathy)
     │                                │   - Note Taker
-    │                                │   - Empathy Editor
     │                                │   - Style Guide
     │                                │
     └────────────────────────────────┘
@@ -81,14 +340,15 @@ class MultiAgentChurnSystem:
     Flow:
     1. Query Understanding → Classify intent
     2. Research Team → Gather background context
-    3. Writing Team → Generate detailed response
+       (in parallel) Writing Team → Retrieve specific use cases
+    3. Writing Team → Generate detailed response from both
     4. Synthesis → Combine insights and validate
     """
     
     def __init__(
         self,
-        rag_retriever: Optional[ChurnRAGRetriever] = None,
-        knowledge_graph: Optional[ChurnKnowledgeGraph] = None,
+        rag_retriever: Optional["ChurnRAGRetriever"] = None,
+        knowledge_graph: Optional["ChurnKnowledgeGraph"] = None,
         use_tavily: bool = True
     ):
         """
@@ -99,15 +359,56 @@ class MultiAgentChurnSystem:
             knowledge_graph: Knowledge graph for research team
             use_tavily: Enable Tavily search for research team
         """
+        from langchain_openai import ChatOpenAI
+        from langchain_core.rate_limiters import InMemoryRateLimiter
+        from agents.research_team import create_research_team
+        from agents.writing_team import create_writing_team
+        
         logger.info("🤖 Initializing Multi-Agent Churn Analysis System...")
-        logger.info("="*80)
+        logger.info(_BAR)
+        
+        # Pooled HTTP clients reused by every LLM call, so connections and TLS sessions stay warm
+        self._http_client = httpx.Client(
+            http2=HTTP2_AVAILABLE, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT_SECONDS
+        )
+        self._http_async_client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT_SECONDS
+        )
+        # One token bucket for every LLM client, so concurrent analyses stay under the
+        # account's request limit instead of backing off after 429s
+        self._rate_limiter = InMemoryRateLimiter(
+            requests_per_second=OPENAI_REQUESTS_PER_SECOND,
+            max_bucket_size=max(1, OPENAI_REQUESTS_PER_SECOND)
+        ) if OPENAI_REQUESTS_PER_SECOND > 0 else None
+        # Confidence formula specialized for the configured weights, per route, over the
+        # signals that route's branches produce
+        self._scorers = {
+            route: build_confidence_scorer(active=tuple(
+                branch is None or branch in branches for branch in CONFIDENCE_SIGNAL_BRANCHES
+            ))
+            for route, branches in ROUTE_BRANCHES.items()
+        }
         
         # Initialize LLM for coordination
         self.llm = ChatOpenAI(
             model="gpt-4o-mini",
             temperature=0.5,
-            openai_api_key=os.getenv("OPENAI_API_KEY")
+            openai_api_key=os.getenv("OPENAI_API_KEY"),
+            http_client=self._http_client,
+            http_async_client=self._http_async_client,
+            rate_limiter=self._rate_limiter,
+            max_retries=0  # Retried by call_with_retry
         )
+        self.classifier = self.llm.with_structured_output(QueryClassification)
+        
+        # Exact-match caches so repeated questions skip the LLM calls. Near-duplicate
+        # questions are only reused inside the teams, whose caches are scoped by the
+        # entities and inputs a result depends on; a whole analysis is not, since
+        # "risk for CUS-123" and "risk for CUS-124" embed almost identically
+        self.rag_retriever = rag_retriever
+        self.knowledge_graph = knowledge_graph
+        self._classification_cache = TTLCache(CLASSIFICATION_CACHE_SIZE)
+        self._response_cache = TTLCache(RESPONSE_CACHE_SIZE)
         
         # Initialize Agent Teams
         logger.info("\n🔬 Team 1: Research Team with Policy Expertise")
@@ -115,27 +416,35 @@ class MultiAgentChurnSystem:
         self.research_team = create_research_team(
             rag_retriever=rag_retriever,
             knowledge_graph=knowledge_graph,
-            use_tavily=use_tavily
+            use_tavily=use_tavily,
+            http_client=self._http_client,
+            http_async_client=self._http_async_client,
+            rate_limiter=self._rate_limiter
         )
         
         logger.info("\n📝 Team 2: Document Writing Team with Case Study Expertise")
         logger.info("   Responsible for: Finding Use Cases & Generating Responses")
         self.writing_team = create_writing_team(
-            rag_retriever=rag_retriever
+            rag_retriever=rag_retriever,
+            http_client=self._http_client,
+            http_async_client=self._http_async_client,
+            rate_limiter=self._rate_limiter
         )
         
         # Build coordination workflow
         self.graph = self._build_graph()
         self.app = self.graph.compile()
         
-        logger.info("\n" + "="*80)
+        logger.info("\n%s", _BAR)
         logger.info("✅ Multi-Agent System Ready")
-        logger.info(f"   • Research Team: RAG + Tavily + Knowledge Graph")
-        logger.info(f"   • Writing Team: 5 Sub-Agents (Writer, Editor, Note Taker, Empathy, Style)")
-        logger.info("="*80 + "\n")
+        logger.info("   • Research Team: RAG + Tavily + Knowledge Graph")
+        logger.info("   • Writing Team: 4 Sub-Agents (Writer, Editor, Note Taker, Style)")
+        logger.info("%s\n", _BAR)
     
-    def _build_graph(self) -> StateGraph:
+    def _build_graph(self) -> "StateGraph":
         """Build multi-agent coordination workflow"""
+        from langgraph.graph import StateGraph, END
+        
         logger.info("Building multi-agent coordination workflow...")
         
         workflow = StateGraph(MultiAgentState)
@@ -143,22 +452,27 @@ class MultiAgentChurnSystem:
         # Add nodes
         workflow.add_node("classify_query", self._classify_query)
         workflow.add_node("research_phase", self._research_phase)
-        workflow.add_node("writing_phase", self._writing_phase)
+        workflow.add_node("use_case_retrieval", self._use_case_retrieval)
+        workflow.add_node("compose", self._compose)
         workflow.add_node("synthesize_final", self._synthesize_final)
         
         # Set entry point
         workflow.set_entry_point("classify_query")
         
-        # Add edges
-        workflow.add_edge("classify_query", "research_phase")
-        workflow.add_edge("research_phase", "writing_phase")
-        workflow.add_edge("writing_phase", "synthesize_final")
+        # Add edges: research and use case retrieval only need the query, so the
+        # branches the query type needs run in parallel, then the response is composed
+        workflow.add_conditional_edges(
+            "classify_query", self._route, ["research_phase", "use_case_retrieval"]
+        )
+        workflow.add_edge("research_phase", "compose")
+        workflow.add_edge("use_case_retrieval", "compose")
+        workflow.add_edge("compose", "synthesize_final")
         workflow.add_edge("synthesize_final", END)
         
         logger.info("✓ Multi-agent workflow built")
         return workflow
     
-    def _classify_query(self, state: MultiAgentState) -> MultiAgentState:
+    async def _classify_query(self, state: MultiAgentState) -> Dict:
         """
         Classify query type and intent
         
@@ -169,48 +483,39 @@ class MultiAgentChurnSystem:
         - competitive_intel: Competitor analysis
         - general_inquiry: General questions
         """
-        logger.info("\n" + "="*80)
-        logger.info("🎯 STAGE 1: Query Classification")
-        logger.info("="*80)
-        logger.info(f"Query: {state['query'][:100]}...")
+        query = state["query"]
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(_banner("🎯 STAGE 1: Query Classification"))
+            logger.info("Query: %s...", query[:100])
         
-        classification_prompt = f"""Classify this customer churn query:
-
-Question: {state['query']}
-
-Classify into ONE category:
-1. risk_assessment - Predicting churn risk for specific customers
-2. pattern_analysis - Analyzing churn patterns, trends, or segments
-3. retention_strategy - Generating retention strategies
-4. competitive_intel - Competitor analysis
-5. general_inquiry - General questions
-
-Return ONLY the category name."""
+        classification_key = cache_key(normalize_query(query))
+        classification = self._classification_cache.get(classification_key)
+        if classification is not None:
+            logger.info("✓ Query classified as: %s (cached)", classification["query_type"])
+            return {**classification, "processing_stages": ["classification_complete"]}
         
         try:
-            response = self.llm.invoke(classification_prompt)
-            query_type = response.content.strip().lower()
-            
-            # Validate and set query type
-            valid_types = ["risk_assessment", "pattern_analysis", "retention_strategy", 
-                          "competitive_intel", "general_inquiry"]
-            
-            if query_type in valid_types:
-                state["query_type"] = query_type
-            else:
-                state["query_type"] = "pattern_analysis"  # Default
+            result = await call_with_retry(
+                self.classifier.ainvoke, CLASSIFICATION_PROMPT.format(query=query)
+            )
+            classification = result.model_dump()
             
-            logger.info(f"✓ Query classified as: {state['query_type']}")
-            state["processing_stages"] = ["classification_complete"]
+            self._classification_cache.set(classification_key, classification)
+            logger.info("✓ Query classified as: %s", classification["query_type"])
+            logger.info("✓ Retrieval keywords: %s", classification["retrieval_keywords"])
+            return {**classification, "processing_stages": ["classification_complete"]}
             
         except Exception as e:
-            logger.error(f"Classification failed: {e}")
-            state["query_type"] = "pattern_analysis"
-            state["errors"] = [f"Classification error: {str(e)}"]
-        
-        return state
+            logger.error("Classification failed: %s", e)
+            return {"query_type": "pattern_analysis", "errors": [f"Classification error: {str(e)}"]}
     
-    def _research_phase(self, state: MultiAgentState) -> MultiAgentState:
+    def _route(self, state: MultiAgentState) -> List[str]:
+        """Pick the branches to run for the query type"""
+        route = QUERY_ROUTES.get(state.get("query_type"), "full")
+        logger.info("🔀 Route for %s: %s", state.get("query_type"), route)
+        return ROUTE_BRANCHES[route]
+    
+    async def _research_phase(self, state: MultiAgentState) -> Dict:
         """
         Execute Research Team phase
         
@@ -220,86 +525,107 @@ Return ONLY the category name."""
         - Company policies and regulations
         - Historical patterns from knowledge graph
         """
-        logger.info("\n" + "="*80)
-        logger.info("🔬 STAGE 2: Research Team - Gathering Background Context")
-        logger.info("="*80)
-        logger.info("Tools: RAG (Policies) + Tavily Search + Knowledge Graph")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(_banner("🔬 STAGE 2: Research Team - Gathering Background Context"))
+            logger.info("Tools: RAG (Policies) + Tavily Search + Knowledge Graph")
         
         try:
-            # Execute research team
-            research_results = self.research_team.research(state["query"])
+            # Skip straight to partial results while OpenAI is failing
+            if OPENAI_CIRCUIT.is_open:
+                raise CircuitOpenError("OpenAI circuit breaker is open")
             
-            # Store results in state
-            state["background_context"] = research_results.get("background_context", "")
-            state["research_insights"] = research_results.get("key_insights", [])
-            state["research_sources"] = research_results.get("sources", [])
+            # Execute research team (which reuses recent results for the same question)
+            research_results = await self.research_team.aresearch(
+                state["query"],
+                retrieval_keywords=state.get("retrieval_keywords"),
+                kg_seed_entities=state.get("kg_seed_entities")
+            )
+            
+            background_context = research_results.get("background_context", "")
+            research_insights = tuple(research_results.get("key_insights", []))
+            intern = state["source_registry"].intern
+            research_source_ids = tuple(
+                intern(SourceRecord.from_dict(source)) for source in research_results.get("sources", [])
+            )
             
             # Log results
-            logger.info(f"✓ Background context generated ({len(state['background_context'])} chars)")
-            logger.info(f"✓ Key insights: {len(state['research_insights'])}")
-            logger.info(f"✓ Sources gathered: {len(state['research_sources'])}")
+            logger.info("✓ Background context generated (%d chars)", len(background_context))
+            logger.info("✓ Key insights: %d", len(research_insights))
+            logger.info("✓ Sources gathered: %d", len(set(research_source_ids)))
             
-            # Add to processing stages
-            stages = state.get("processing_stages", [])
-            stages.append("research_complete")
-            state["processing_stages"] = stages
+            return {
+                "background_context": background_context,
+                "research_insights": research_insights,
+                "research_source_ids": research_source_ids,
+                "processing_stages": ["research_complete"]
+            }
             
         except Exception as e:
-            logger.error(f"Research phase failed: {e}")
-            state["background_context"] = ""
-            state["research_insights"] = []
-            state["research_sources"] = []
-            state["errors"] = [f"Research phase error: {str(e)}"]
+            logger.error("Research phase failed: %s", e)
+            return {"background_context": "", "errors": [f"Research phase error: {str(e)}"]}
+    
+    async def _use_case_retrieval(self, state: MultiAgentState) -> Dict:
+        """Retrieve the Writing Team's use cases (runs in parallel with research)"""
+        logger.info("🔍 Writing Team: Retrieving use cases alongside research...")
         
-        return state
+        try:
+            return {"use_cases": await self.writing_team.afind_use_cases(state["query"])}
+        except Exception as e:
+            logger.error("Use case retrieval failed: %s", e)
+            return {"use_cases": [], "errors": [f"Use case retrieval error: {str(e)}"]}
     
-    def _writing_phase(self, state: MultiAgentState) -> MultiAgentState:
+    async def _compose(self, state: MultiAgentState) -> Dict:
         """
         Execute Writing Team phase
         
         Writing Team generates:
         - Detailed response with specific use cases
-        - Draft → Edit → Citations → Empathy → Style check
-        - Using 5 specialized sub-agents
+        - Draft → Edit with empathy → Style check, with citations alongside
+        - Using 4 specialized sub-agents
         """
-        logger.info("\n" + "="*80)
-        logger.info("📝 STAGE 3: Writing Team - Generating Detailed Response")
-        logger.info("="*80)
-        logger.info("Sub-Agents: Writer → Editor → Note Taker → Empathy → Style Guide")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(_banner("📝 STAGE 3: Writing Team - Generating Detailed Response"))
+            logger.info("Sub-Agents: Writer → Editor (copy + empathy) → Style Guide, Note Taker alongside")
         
         try:
-            # Execute writing team
-            writing_results = self.writing_team.write(
+            if OPENAI_CIRCUIT.is_open:
+                raise CircuitOpenError("OpenAI circuit breaker is open")
+            
+            # Execute writing team on the use cases retrieved in parallel with research
+            # (the team reuses recent results for the same question and inputs). Competitor
+            # questions (research_only) are answered from the research by design: they are
+            # written with no use cases, and their confidence leaves citations out
+            writing_results = await self.writing_team.awrite(
                 query=state["query"],
-                background_context=state.get("background_context", "")
+                background_context=state.get("background_context", ""),
+                use_cases=state.get("use_cases") or _EMPTY,
+                entities=state.get("kg_seed_entities") or _EMPTY
             )
             
-            # Store results in state
-            state["final_response"] = writing_results.get("final_response", "")
-            state["draft_response"] = writing_results.get("draft_response", "")
-            state["citations"] = writing_results.get("citations", [])
-            state["style_notes"] = writing_results.get("style_notes", [])
+            final_response = writing_results.get("final_response", "")
+            intern = state["source_registry"].intern
+            citation_ids = tuple(intern(citation) for citation in writing_results.get("citations", []))
+            style_notes = writing_results.get("style_notes", [])
             
             # Log results
-            logger.info(f"✓ Final response generated ({len(state['final_response'])} chars)")
-            logger.info(f"✓ Citations added: {len(state['citations'])}")
-            logger.info(f"✓ Style notes: {len(state['style_notes'])}")
-            logger.info(f"✓ Use cases referenced: {writing_results.get('use_cases_found', 0)}")
+            logger.info("✓ Final response generated (%d chars)", len(final_response))
+            logger.info("✓ Citations added: %d", len(citation_ids))
+            logger.info("✓ Style notes: %d", len(style_notes))
+            logger.info("✓ Use cases referenced: %d", writing_results.get("use_cases_found", 0))
             
-            # Add to processing stages
-            stages = state.get("processing_stages", [])
-            stages.append("writing_complete")
-            state["processing_stages"] = stages
+            return {
+                "final_response": final_response,
+                "draft_response": writing_results.get("draft_response", ""),
+                "citation_ids": citation_ids,
+                "style_notes": style_notes,
+                "processing_stages": ["writing_complete"]
+            }
             
         except Exception as e:
-            logger.error(f"Writing phase failed: {e}")
-            state["final_response"] = ""
-            state["citations"] = []
-            state["errors"] = [f"Writing phase error: {str(e)}"]
-        
-        return state
+            logger.error("Writing phase failed: %s", e)
+            return {"final_response": "", "errors": [f"Writing phase error: {str(e)}"]}
     
-    def _synthesize_final(self, state: MultiAgentState) -> MultiAgentState:
+    async def _synthesize_final(self, state: MultiAgentState) -> Dict:
         """
         Synthesize final results and calculate confidence
         
@@ -309,47 +635,71 @@ Return ONLY the category name."""
         - Citations and sources
         - Quality metrics
         """
-        logger.info("\n" + "="*80)
-        logger.info("🎯 STAGE 4: Final Synthesis & Quality Check")
-        logger.info("="*80)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(_banner("🎯 STAGE 4: Final Synthesis & Quality Check"))
         
         try:
-            # Calculate confidence score
-            factors = {
-                "background_context": 0.2 if state.get("background_context") else 0,
-                "research_insights": 0.15 * min(len(state.get("research_insights", [])) / 5, 1),
-                "final_response": 0.3 if len(state.get("final_response", "")) > 500 else 0.15,
-                "citations": 0.2 * min(len(state.get("citations", [])) / 5, 1),
-                "style_compliance": 0.15 * min(len(state.get("style_notes", [])) / 4, 1)
-            }
+            get = state.get
+            num_citations = len(get("citation_ids", _EMPTY))
             
-            confidence = sum(factors.values())
-            state["confidence_score"] = round(confidence, 2)
+            # Calculate confidence score
+            score = self._scorers[QUERY_ROUTES.get(get("query_type"), "full")]
+            confidence = round(score(
+                bool(get("background_context")),
+                len(get("research_insights", _EMPTY)),
+                len(get("final_response", "")) > LONG_RESPONSE_CHARS,
+                num_citations,
+                len(get("style_notes", _EMPTY))
+            ), 2)
             
             # Log final synthesis
-            logger.info(f"✓ Confidence Score: {state['confidence_score']:.2%}")
-            logger.info(f"✓ Processing Stages Completed: {len(state.get('processing_stages', []))}")
-            logger.info(f"✓ Total Sources: {len(state.get('research_sources', []))} + {len(state.get('citations', []))}")
-            
-            # Add final stage
-            stages = state.get("processing_stages", [])
-            stages.append("synthesis_complete")
-            state["processing_stages"] = stages
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("✓ Confidence Score: %.2f%%", confidence * 100)
+                logger.info("✓ Processing Stages Completed: %d", len(get("processing_stages", _EMPTY)))
+                logger.info(
+                    "✓ Total Sources: %d",
+                    len(set(get("research_source_ids", _EMPTY)) | set(get("citation_ids", _EMPTY)))
+                )
+                
+                logger.info("%s\n", _banner("✅ MULTI-AGENT PROCESSING COMPLETE"))
             
-            logger.info("\n" + "="*80)
-            logger.info("✅ MULTI-AGENT PROCESSING COMPLETE")
-            logger.info("="*80 + "\n")
+            return {
+                "confidence_score": confidence,
+                "processing_stages": ["synthesis_complete"]
+            }
             
         except Exception as e:
-            logger.error(f"Synthesis failed: {e}")
-            state["confidence_score"] = 0.0
-            state["errors"] = [f"Synthesis error: {str(e)}"]
-        
-        return state
+            logger.error("Synthesis failed: %s", e)
+            return {"confidence_score": 0.0, "errors": [f"Synthesis error: {str(e)}"]}
+    
+    async def aclose(self) -> None:
+        """Close the pooled HTTP clients"""
+        self._http_client.close()
+        await self._http_async_client.aclose()
+    
+    async def __aenter__(self) -> "MultiAgentChurnSystem":
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
     
     def analyze(self, query: str) -> Dict:
         """
-        Run complete multi-agent analysis
+        Run complete multi-agent analysis (blocking wrapper around aanalyze for CLI use)
+        
+        Args:
+            query: User question
+        
+        Returns:
+            Comprehensive analysis with research, writing, and metadata
+        """
+        # The loop shared with the teams' blocking wrappers, since the pooled async
+        # client's connections are bound to it
+        return run_sync(self.aanalyze(query))
+    
+    async def aanalyze(self, query: str) -> Dict:
+        """
+        Run complete multi-agent analysis without blocking the event loop
         
         Args:
             query: User question
@@ -357,77 +707,266 @@ Return ONLY the category name."""
         Returns:
             Comprehensive analysis with research, writing, and metadata
         """
-        logger.info(f"\n{'='*80}")
-        logger.info(f"🚀 STARTING MULTI-AGENT ANALYSIS")
-        logger.info(f"{'='*80}")
-        logger.info(f"Query: {query}")
+        response = None
+        async for event in self.astream(query):
+            response = event.get("result")
+        return response
+    
+    async def astream(self, query: str, stream_tokens: bool = False) -> AsyncIterator[Dict]:
+        """
+        Run complete multi-agent analysis, yielding each stage's output as soon as it finishes
+        
+        Yields {"stage": <graph node name>, **<node output>} for every node (so callers can
+        render the background context while the Writing Team is still running), then
+        {"stage": "complete", "result": <the dict aanalyze returns>}.
+        
+        With stream_tokens, the teams' LLM output is also yielded as it is generated:
+        {"stage": "token", "node": <team node, e.g. "enhance_empathy">, "content": <text>}.
+        """
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(_banner("🚀 STARTING MULTI-AGENT ANALYSIS"))
+            logger.info("Query: %s", query)
+        
+        # Keyed on the index and graph versions too, so a re-ingest or graph rebuild
+        # stops earlier analyses from being reused
+        response_key = cache_key(
+            normalize_query(query),
+            self.llm.model_name,
+            getattr(self.rag_retriever, "index_version", 0),
+            getattr(self.knowledge_graph, "version", 0)
+        )
+        cached = self._response_cache.get(response_key)
+        if cached is not None:
+            logger.info("✅ Returning cached analysis")
+            yield {"stage": "complete", "result": {**json.loads(cached), "query": query}}
+            return
         
         # Initialize state
         initial_state = MultiAgentState(
             query=query,
             query_type=None,
+            retrieval_keywords=[],
+            kg_seed_entities=[],
             background_context="",
-            research_insights=[],
-            research_sources=[],
+            research_insights=(),
+            research_source_ids=(),
+            use_cases=[],
             final_response="",
             draft_response="",
-            citations=[],
+            citation_ids=(),
             style_notes=[],
             confidence_score=0.0,
             processing_stages=[],
-            errors=[]
+            errors=[],
+            source_registry=SourceRegistry()
         )
         
         try:
-            # Run multi-agent system
-            final_state = self.app.invoke(initial_state)
+            # Run multi-agent system, passing node outputs on as they arrive; token
+            # messages come from the teams' graphs, which run as subgraphs of the nodes
+            final_state = initial_state
+            stream_mode = ["updates", "values", "messages"] if stream_tokens else ["updates", "values"]
+            async for item in self.app.astream(initial_state, stream_mode=stream_mode, subgraphs=stream_tokens):
+                namespace, mode, chunk = item if stream_tokens else ((), *item)
+                if mode == "messages":
+                    # Only the teams' text; the coordinator's own calls are structured output
+                    message, metadata = chunk
+                    if namespace and message.content:
+                        yield {"stage": "token", "node": metadata.get("langgraph_node"), "content": message.content}
+                    continue
+                if namespace:
+                    continue
+                if mode == "values":
+                    final_state = chunk
+                    continue
+                for stage, update in chunk.items():
+                    yield {"stage": stage, **(update or {})}
+            
+            get = final_state.get
+            # Sources are materialized from the registry only for the output
+            registry = get("source_registry") or initial_state["source_registry"]
+            research_source_ids = get("research_source_ids", _EMPTY)
+            citation_ids = get("citation_ids", _EMPTY)
             
             # Format response
             response = {
                 "query": query,
-                "query_type": final_state.get("query_type"),
+                "query_type": get("query_type"),
                 
                 # Main outputs
-                "response": final_state.get("final_response", ""),
-                "background_context": final_state.get("background_context", ""),
+                "response": get("final_response", ""),
+                "background_context": get("background_context", ""),
                 
                 # Supporting information
-                "key_insights": final_state.get("research_insights", []),
-                "citations": final_state.get("citations", []),
-                "style_notes": final_state.get("style_notes", []),
+                "key_insights": list(get("research_insights", _EMPTY)),
+                "citations": registry.materialize(citation_ids),
+                "style_notes": get("style_notes") or [],
                 
                 # Metadata
-                "confidence_score": final_state.get("confidence_score", 0.0),
-                "processing_stages": final_state.get("processing_stages", []),
-                "total_sources": len(final_state.get("research_sources", [])) + len(final_state.get("citations", [])),
+                "confidence_score": get("confidence_score", 0.0),
+                "processing_stages": get("processing_stages") or [],
+                "total_sources": len(set(research_source_ids) | set(citation_ids)),
                 
                 # Research details
-                "research_sources": final_state.get("research_sources", []),
+                "research_sources": registry.materialize(research_source_ids),
                 
                 # Errors
-                "errors": final_state.get("errors", [])
+                "errors": get("errors") or []
             }
             
-            logger.info(f"\n{'='*80}")
-            logger.info(f"✅ Analysis complete (confidence: {response['confidence_score']:.2%})")
-            logger.info(f"{'='*80}\n")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("\n%s", _BAR)
+                logger.info("✅ Analysis complete (confidence: %.2f%%)", response["confidence_score"] * 100)
+                logger.info("%s\n", _BAR)
             
-            return response
+            if not response["errors"]:
+                self._response_cache.set(response_key, json.dumps(response, default=str))
             
         except Exception as e:
-            logger.error(f"Multi-agent analysis failed: {e}")
-            return {
-                "query": query,
-                "error": str(e),
-                "response": "",
-                "confidence_score": 0.0,
-                "errors": [str(e)]
+            response = self._failure_response(query, e)
+        
+        yield {"stage": "complete", "result": response}
+    
+    @staticmethod
+    def _failure_response(query: str, error: Exception) -> Dict:
+        """Response returned when the multi-agent graph itself fails"""
+        logger.error("Multi-agent analysis failed: %s", error)
+        return {
+            "query": query,
+            "error": str(error),
+            "response": "",
+            "confidence_score": 0.0,
+            "errors": [str(error)]
+        }
+    
+    def _uncached_classifications(self, queries: List[str]) -> Dict[str, str]:
+        """Classification cache key -> query for queries not classified yet"""
+        pending = {cache_key(normalize_query(query)): query for query in queries}
+        return {
+            key: query for key, query in pending.items()
+            if self._classification_cache.get(key) is None
+        }
+    
+    async def _classify_batch(self, queries: List[str], max_concurrency: int) -> None:
+        """Classify all uncached queries with one abatch call and seed the classification cache"""
+        pending = self._uncached_classifications(queries)
+        if not pending:
+            return
+        
+        results = await self.classifier.abatch(
+            [CLASSIFICATION_PROMPT.format(query=query) for query in pending.values()],
+            config={"max_concurrency": max_concurrency},
+            return_exceptions=True
+        )
+        for key, result in zip(pending, results):
+            # Failed classifications are retried per query inside the graph
+            if not isinstance(result, Exception):
+                self._classification_cache.set(key, result.model_dump())
+    
+    async def _classify_offline(self, queries: List[str]) -> None:
+        """
+        Classify all uncached queries through the OpenAI Batch API and seed the classification cache
+        
+        Waits for the batch to finish (up to OFFLINE_BATCH_WINDOW); queries whose
+        classification is missing from the output are classified online by the graph.
+        """
+        pending = self._uncached_classifications(queries)
+        if not pending:
+            return
+        
+        from openai import AsyncOpenAI
+        
+        client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        response_format = {
+            "type": "json_schema",
+            "json_schema": {
+                "name": QueryClassification.__name__,
+                "schema": QueryClassification.model_json_schema()
             }
+        }
+        batch_requests = [
+            json.dumps({
+                "custom_id": key,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.llm.model_name,
+                    "temperature": self.llm.temperature,
+                    "messages": [{"role": "user", "content": CLASSIFICATION_PROMPT.format(query=query)}],
+                    "response_format": response_format
+                }
+            })
+            for key, query in pending.items()
+        ]
+        
+        batch_file = await client.files.create(
+            file=("classifications.jsonl", "\n".join(batch_requests).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = await client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window=OFFLINE_BATCH_WINDOW
+        )
+        logger.info("📦 Submitted offline batch %s (%d classifications)", batch.id, len(batch_requests))
+        
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            await asyncio.sleep(OFFLINE_POLL_SECONDS)
+            batch = await client.batches.retrieve(batch.id)
+        
+        if batch.status != "completed" or not batch.output_file_id:
+            logger.warning("Offline batch %s ended as %s; classifying online", batch.id, batch.status)
+            return
+        
+        output = await client.files.content(batch.output_file_id)
+        for line in output.text.splitlines():
+            record = json.loads(line)
+            try:
+                content = record["response"]["body"]["choices"][0]["message"]["content"]
+                classification = QueryClassification.model_validate_json(content)
+                self._classification_cache.set(record["custom_id"], classification.model_dump())
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                logger.warning("Unusable offline classification for %s: %s", record.get("custom_id"), e)
+        logger.info("✓ Offline batch %s completed", batch.id)
+    
+    async def analyze_batch(
+        self,
+        queries: List[str],
+        max_concurrency: int = BATCH_CONCURRENCY,
+        mode: str = "online"
+    ) -> List[Dict]:
+        """
+        Run the multi-agent analysis on several queries concurrently
+        
+        Uncached queries are classified together up front; at most max_concurrency
+        analyses are then in flight at once to respect OpenAI rate limits.
+        With mode="offline" the classifications go through the OpenAI Batch API
+        (half price, but may take hours), for scheduled reports.
+        Results are returned in query order.
+        """
+        if mode == "offline":
+            await self._classify_offline(queries)
+        elif mode == "online":
+            await self._classify_batch(queries, max_concurrency)
+        else:
+            raise ValueError(f"Unknown analyze_batch mode: {mode}")
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def analyze_one(query: str) -> Dict:
+            async with semaphore:
+                return await self.aanalyze(query)
+        
+        results = await asyncio.gather(*(analyze_one(query) for query in queries), return_exceptions=True)
+        return [
+            self._failure_response(query, result) if isinstance(result, Exception) else result
+            for query, result in zip(queries, results)
+        ]
 
 
 def create_multi_agent_system(
-    rag_retriever: Optional[ChurnRAGRetriever] = None,
-    knowledge_graph: Optional[ChurnKnowledgeGraph] = None,
+    rag_retriever: Optional["ChurnRAGRetriever"] = None,
+    knowledge_graph: Optional["ChurnKnowledgeGraph"] = None,
     use_tavily: bool = True
 ) -> MultiAgentChurnSystem:
     """
@@ -470,11 +1009,10 @@ if __name__ == "__main__":
     print(f"\n✅ Multi-Agent System created successfully")
     print(f"   Architecture:")
     print(f"   ├── Team 1: Research Team (RAG + Tavily + Knowledge Graph)")
-    print(f"   └── Team 2: Writing Team (5 Sub-Agents)")
+    print(f"   └── Team 2: Writing Team (4 Sub-Agents)")
     print(f"       ├── Document Writer Agent")
-    print(f"       ├── Copy Editor Agent")
+    print(f"       ├── Editor Agent (copy editing + empathy)")
     print(f"       ├── Note Taker Agent")
-    print(f"       ├── Empathy Editor Agent")
     print(f"       └── Style Guide Agent")
     
     print("\n💡 To test with full functionality:")
@@ -3,25 +3,37 @@ Research Team Agent (Team 1)
 Responsible for High-Level Background Context using RAG and Tavily Search
 """
 
+import asyncio
 import os
 import logging
 from typing import TypedDict, List, Dict, Optional, Annotated
 import operator
 
-from langgraph.graph import StateGraph, END
+import httpx
+from concurrent.futures import ThreadPoolExecutor
+
+from langgraph.graph import StateGraph, START, END
 from langchain_openai import ChatOpenAI
+from langchain_core.rate_limiters import BaseRateLimiter
 from langchain_core.documents import Document
 from langchain_community.tools.tavily_search import TavilySearchResults
 
+from core.caching import ResultCache, RetrievalCache, cache_key, normalize_query
 from core.rag_retrievers import ChurnRAGRetriever
 from core.knowledge_graph import ChurnKnowledgeGraph
+from utils.sync_runner import run_sync
 
 logger = logging.getLogger(__name__)
 
+# Max research runs research_batch() has in flight at once
+RESEARCH_BATCH_CONCURRENCY = 8
+
 
 class ResearchTeamState(TypedDict):
     """State for Research Team"""
     query: str
+    retrieval_keywords: List[str]  # Search phrases extracted by the coordinator
+    kg_seed_entities: List[str]  # Segments/competitors/reasons named in the query
     background_context: str
     rag_documents: List[Document]
     web_research: List[Dict]
@@ -45,7 +57,10 @@ class ResearchTeam:
         self,
         rag_retriever: Optional[ChurnRAGRetriever] = None,
         knowledge_graph: Optional[ChurnKnowledgeGraph] = None,
-        use_tavily: bool = True
+        use_tavily: bool = True,
+        http_client: Optional[httpx.Client] = None,
+        http_async_client: Optional[httpx.AsyncClient] = None,
+        rate_limiter: Optional[BaseRateLimiter] = None
     ):
         """
         Initialize Research Team
@@ -54,6 +69,9 @@ class ResearchTeam:
             rag_retriever: RAG retriever for company knowledge base
             knowledge_graph: Knowledge graph for entity relationships
             use_tavily: Enable Tavily search for external research
+            http_client: Pooled HTTP client for OpenAI calls (optional)
+            http_async_client: Pooled async HTTP client for OpenAI calls (optional)
+            rate_limiter: Token bucket shared with the other LLM clients (optional)
         """
         logger.info("🔬 Initializing Research Team Agent...")
         
@@ -61,13 +79,21 @@ class ResearchTeam:
         self.llm = ChatOpenAI(
             model="gpt-4o-mini",
             temperature=0.3,  # Lower temperature for factual research
-            openai_api_key=os.getenv("OPENAI_API_KEY")
+            openai_api_key=os.getenv("OPENAI_API_KEY"),
+            http_client=http_client,
+            http_async_client=http_async_client,
+            rate_limiter=rate_limiter
         )
         
         # Store tools
         self.rag_retriever = rag_retriever
         self.knowledge_graph = knowledge_graph
         
+        # Recent results, reused for repeated and near-duplicate questions
+        self._cache = ResultCache(embeddings=rag_retriever.embeddings if rag_retriever else None)
+        # Retriever calls, reused when a question (or keyword phrase) comes up again
+        self._retrieval = RetrievalCache(rag_retriever)
+        
         # Initialize Tavily Search
         self.tavily_search = None
         if use_tavily and os.getenv("TAVILY_API_KEY"):
@@ -99,18 +125,17 @@ class ResearchTeam:
         workflow.add_node("search_external_sources", self._search_external_sources)
         workflow.add_node("synthesize_background", self._synthesize_background)
         
-        # Set entry point
-        workflow.set_entry_point("gather_internal_knowledge")
-        
-        # Add edges
-        workflow.add_edge("gather_internal_knowledge", "search_external_sources")
-        workflow.add_edge("search_external_sources", "synthesize_background")
+        # Internal (RAG) and external (Tavily) research are independent, so they run in
+        # parallel and synthesis waits for both
+        workflow.add_edge(START, "gather_internal_knowledge")
+        workflow.add_edge(START, "search_external_sources")
+        workflow.add_edge(["gather_internal_knowledge", "search_external_sources"], "synthesize_background")
         workflow.add_edge("synthesize_background", END)
         
         logger.info("✓ Research Team workflow built")
         return workflow
     
-    def _gather_internal_knowledge(self, state: ResearchTeamState) -> ResearchTeamState:
+    def _gather_internal_knowledge(self, state: ResearchTeamState) -> Dict:
         """
         Gather internal knowledge from RAG system
         
@@ -118,21 +143,29 @@ class ResearchTeam:
         - Historical churn patterns
         - Policy information
         - Internal regulations and guidelines
+        
+        Runs alongside the external search, so it returns only the fields it sets.
         """
         logger.info("📚 Gathering internal knowledge from RAG system...")
         
         if not self.rag_retriever:
             logger.warning("RAG retriever not initialized")
-            state["rag_documents"] = []
-            return state
+            return {"rag_documents": []}
         
+        update = {}
         try:
             query = state["query"]
+            keywords = state.get("retrieval_keywords") or []
             
-            # Use multi-query retrieval for comprehensive coverage
-            docs = self.rag_retriever.multi_query_retrieval(query, k=10)
+            if keywords:
+                # The coordinator already extracted search phrases; use them instead of
+                # asking the LLM for query variants again
+                docs = self._keyword_retrieval(query, keywords, k=10)
+            else:
+                # Use multi-query retrieval for comprehensive coverage
+                docs = self._retrieval.retrieve("multi_query_retrieval", query, k=10)
             
-            state["rag_documents"] = docs
+            update["rag_documents"] = docs
             logger.info(f"✓ Retrieved {len(docs)} internal documents")
             
             # Extract key insights from knowledge graph if available
@@ -141,25 +174,47 @@ class ResearchTeam:
                 segments = ["Commercial", "SMB", "Mid-Market", "Strategic", "Enterprise"]
                 insights = []
                 
-                for segment in segments:
-                    patterns = self.knowledge_graph.get_churn_patterns(segment)
+                # Focus on the segments named in the query, if any
+                seeds = {entity.lower() for entity in state.get("kg_seed_entities") or []}
+                focused = [segment for segment in segments if segment.lower() in seeds]
+                
+                all_patterns = self.knowledge_graph.get_churn_patterns_bulk(focused or segments)
+                for segment, patterns in all_patterns.items():
                     if patterns and patterns.get("customer_count", 0) > 0:
+                        # top_reasons maps reason -> count, most frequent first
+                        top_reason = next(iter(patterns.get("top_reasons") or {}), "N/A")
                         insights.append(
                             f"{segment}: {patterns['customer_count']} customers, "
-                            f"top reason: {patterns.get('top_reasons', ['N/A'])[0] if patterns.get('top_reasons') else 'N/A'}"
+                            f"top reason: {top_reason}"
                         )
                 
-                state["key_insights"] = insights
+                update["key_insights"] = insights
                 logger.info(f"✓ Extracted {len(insights)} key insights from knowledge graph")
             
         except Exception as e:
             logger.error(f"Internal knowledge gathering failed: {e}")
-            state["rag_documents"] = []
-            state["errors"] = [f"RAG retrieval error: {str(e)}"]
+            update["rag_documents"] = []
+            update["errors"] = [f"RAG retrieval error: {str(e)}"]
+        
+        return update
+    
+    def _keyword_retrieval(self, query: str, keywords: List[str], k: int) -> List[Document]:
+        """Retrieve for the query and each keyword phrase concurrently, deduplicated, up to k documents"""
+        search_queries = [query] + keywords[:3]
+        # One embeddings request for all phrases; the searches below then hit the shared cache
+        self.rag_retriever.embeddings.embed_queries(search_queries)
+        with ThreadPoolExecutor(max_workers=len(search_queries)) as executor:
+            results = executor.map(lambda q: self._retrieval.retrieve("naive_retrieval", q, k), search_queries)
         
-        return state
+        docs, seen = [], set()
+        for result in results:
+            for doc in result:
+                if doc.page_content not in seen:
+                    seen.add(doc.page_content)
+                    docs.append(doc)
+        return docs[:k]
     
-    def _search_external_sources(self, state: ResearchTeamState) -> ResearchTeamState:
+    async def _search_external_sources(self, state: ResearchTeamState) -> Dict:
         """
         Search external sources using Tavily
         
@@ -167,13 +222,14 @@ class ResearchTeam:
         - Industry benchmarks and trends
         - Best practices
         - Recent research and insights
+        
+        Runs alongside internal knowledge gathering, so it returns only the fields it sets.
         """
         logger.info("🌐 Searching external sources with Tavily...")
         
         if not self.tavily_search:
             logger.warning("Tavily search not available")
-            state["web_research"] = []
-            return state
+            return {"web_research": []}
         
         try:
             query = state["query"]
@@ -185,25 +241,27 @@ class ResearchTeam:
                 f"churn analysis industry trends {query}"
             ]
             
+            # Run the searches concurrently; a failed query doesn't cancel the others
+            results_list = await asyncio.gather(
+                *(self.tavily_search.ainvoke(search_query) for search_query in search_queries),
+                return_exceptions=True
+            )
+            
             all_results = []
-            for search_query in search_queries:
-                try:
-                    results = self.tavily_search.invoke(search_query)
+            for results in results_list:
+                if isinstance(results, Exception):
+                    logger.warning(f"Search query failed: {results}")
+                else:
                     all_results.extend(results[:2])  # Top 2 from each query
-                except Exception as e:
-                    logger.warning(f"Search query failed: {e}")
             
-            state["web_research"] = all_results
             logger.info(f"✓ Found {len(all_results)} external sources")
+            return {"web_research": all_results}
             
         except Exception as e:
             logger.error(f"External search failed: {e}")
-            state["web_research"] = []
-            state["errors"] = [f"Tavily search error: {str(e)}"]
-        
-        return state
+            return {"web_research": [], "errors": [f"Tavily search error: {str(e)}"]}
     
-    def _synthesize_background(self, state: ResearchTeamState) -> ResearchTeamState:
+    async def _synthesize_background(self, state: ResearchTeamState) -> Dict:
         """
         Synthesize background context from all sources
         
@@ -214,28 +272,32 @@ class ResearchTeam:
         """
         logger.info("🔄 Synthesizing background context...")
         
+        # Read each state field once
+        rag_documents = state.get("rag_documents") or []
+        web_research = state.get("web_research") or []
+        
         try:
             # Prepare context from internal documents
-            internal_context = "\n\n".join([
-                f"[{doc.metadata.get('account_name', 'Unknown')} - {doc.metadata.get('segment', 'N/A')}]\n"
-                f"Churn Reason: {doc.metadata.get('churn_reason', 'N/A')}\n"
-                f"Details: {doc.page_content[:400]}..."
-                for doc in state.get("rag_documents", [])[:8]
-            ])
+            internal_parts = []
+            for doc in rag_documents[:8]:
+                metadata = doc.metadata
+                internal_parts.append(
+                    f"[{metadata.get('account_name', 'Unknown')} - {metadata.get('segment', 'N/A')}]\n"
+                    f"Churn Reason: {metadata.get('churn_reason', 'N/A')}\n"
+                    f"Details: {doc.page_content[:400]}..."
+                )
+            internal_context = "\n\n".join(internal_parts)
             
             # Prepare insights
-            insights_context = "\n".join([
-                f"- {insight}"
-                for insight in state.get("key_insights", [])
-            ])
+            insights_context = "\n".join(f"- {insight}" for insight in state.get("key_insights") or [])
             
             # Prepare web research
-            web_context = "\n\n".join([
+            web_context = "\n\n".join(
                 f"Source: {result.get('title', 'Unknown')}\n"
                 f"URL: {result.get('url', '')}\n"
                 f"Content: {result.get('content', '')[:300]}..."
-                for result in state.get("web_research", [])
-            ])
+                for result in web_research
+            )
             
             # Synthesize background
             synthesis_prompt = f"""You are a research analyst synthesizing background context for customer churn analysis.
@@ -260,91 +322,187 @@ Synthesize a comprehensive background context that:
 
 Write 3-4 paragraphs of well-structured background context."""
             
-            response = self.llm.invoke(synthesis_prompt)
-            state["background_context"] = response.content
-            
-            # Compile sources
-            sources = []
+            # Streamed, so listeners see the background as it is written
+            parts = []
+            async for chunk in self.llm.astream(synthesis_prompt):
+                parts.append(chunk.content)
+            background_context = "".join(parts)
             
-            # Add document sources
-            for doc in state.get("rag_documents", [])[:5]:
-                sources.append({
+            # Compile sources: document sources, then web sources
+            sources = [
+                {
                     "type": "internal_data",
                     "customer": doc.metadata.get("account_name"),
                     "segment": doc.metadata.get("segment")
-                })
-            
-            # Add web sources
-            for result in state.get("web_research", []):
-                sources.append({
+                }
+                for doc in rag_documents[:5]
+            ]
+            sources.extend(
+                {
                     "type": "external_research",
                     "title": result.get("title", ""),
                     "url": result.get("url", "")
-                })
-            
-            state["sources"] = sources
+                }
+                for result in web_research
+            )
             
             logger.info("✓ Background context synthesized")
+            # Only the fields set here, so earlier errors aren't appended to the reducer again
+            return {"background_context": background_context, "sources": sources}
             
         except Exception as e:
             logger.error(f"Background synthesis failed: {e}")
-            state["background_context"] = "Unable to synthesize background context."
-            state["errors"] = [f"Synthesis error: {str(e)}"]
-        
-        return state
+            return {
+                "background_context": "Unable to synthesize background context.",
+                "errors": [f"Synthesis error: {str(e)}"]
+            }
+    
+    @staticmethod
+    def _initial_state(
+        query: str,
+        retrieval_keywords: Optional[List[str]] = None,
+        kg_seed_entities: Optional[List[str]] = None
+    ) -> ResearchTeamState:
+        """Empty research state for a query"""
+        return ResearchTeamState(
+            query=query,
+            retrieval_keywords=retrieval_keywords or [],
+            kg_seed_entities=kg_seed_entities or [],
+            background_context="",
+            rag_documents=[],
+            web_research=[],
+            key_insights=[],
+            sources=[],
+            errors=[]
+        )
+    
+    @staticmethod
+    def _format_result(query: str, final_state: ResearchTeamState) -> Dict:
+        """Research results returned to the caller"""
+        return {
+            "query": query,
+            "background_context": final_state.get("background_context", ""),
+            "key_insights": final_state.get("key_insights", []),
+            "sources": final_state.get("sources", []),
+            "documents_retrieved": len(final_state.get("rag_documents", [])),
+            "web_results": len(final_state.get("web_research", [])),
+            "errors": final_state.get("errors", [])
+        }
+    
+    @staticmethod
+    def _failure_result(query: str, error: Exception) -> Dict:
+        """Result returned when the research workflow itself fails"""
+        logger.error(f"Research failed: {error}")
+        return {
+            "query": query,
+            "error": str(error),
+            "background_context": "",
+            "sources": [],
+            "errors": [str(error)]
+        }
     
-    def research(self, query: str) -> Dict:
+    def research(
+        self,
+        query: str,
+        retrieval_keywords: Optional[List[str]] = None,
+        kg_seed_entities: Optional[List[str]] = None
+    ) -> Dict:
         """
         Conduct research for a query
         
         Args:
             query: Research question
+            retrieval_keywords: Search phrases already extracted from the query (optional)
+            kg_seed_entities: Entities named in the query, used to focus the KG lookup (optional)
         
         Returns:
             Research results with background context and sources
         """
-        logger.info(f"🔬 Research Team analyzing: {query[:100]}...")
+        # External search is async, so the workflow always runs on an event loop; the
+        # shared one keeps the async HTTP client's pooled connections valid between calls
+        return run_sync(self.aresearch(query, retrieval_keywords, kg_seed_entities))
+    
+    async def aresearch(
+        self,
+        query: str,
+        retrieval_keywords: Optional[List[str]] = None,
+        kg_seed_entities: Optional[List[str]] = None
+    ) -> Dict:
+        """
+        Conduct research without blocking the event loop
         
-        # Initialize state
-        initial_state = ResearchTeamState(
-            query=query,
-            background_context="",
-            rag_documents=[],
-            web_research=[],
-            key_insights=[],
-            sources=[],
-            errors=[]
+        Same as research(); LangGraph executes the synchronous nodes on worker threads.
+        """
+        # Results are tied to the indexed documents and graph they were computed from,
+        # so a re-index or graph rebuild stops them from being reused
+        data_version = (
+            getattr(self.rag_retriever, "index_version", 0),
+            getattr(self.knowledge_graph, "version", 0)
+        )
+        key = cache_key(
+            normalize_query(query), retrieval_keywords or [], kg_seed_entities or [], data_version
         )
+        # Seed entities decide which segments the insights cover, so a near-duplicate
+        # question is only reused when it names the same ones
+        scope = cache_key(sorted(entity.lower() for entity in kg_seed_entities or []), data_version)
+        result = await self._cache.get_or_compute(
+            key, query, lambda: self._run(query, retrieval_keywords, kg_seed_entities), scope=scope
+        )
+        return {**result, "query": query}
+    
+    async def _run(
+        self,
+        query: str,
+        retrieval_keywords: Optional[List[str]],
+        kg_seed_entities: Optional[List[str]]
+    ) -> Dict:
+        """Run the research workflow"""
+        logger.info(f"🔬 Research Team analyzing: {query[:100]}...")
         
         try:
-            # Run research workflow
-            final_state = self.app.invoke(initial_state)
-            
-            return {
-                "query": query,
-                "background_context": final_state.get("background_context", ""),
-                "key_insights": final_state.get("key_insights", []),
-                "sources": final_state.get("sources", []),
-                "documents_retrieved": len(final_state.get("rag_documents", [])),
-                "web_results": len(final_state.get("web_research", [])),
-                "errors": final_state.get("errors", [])
-            }
+            final_state = await self.app.ainvoke(
+                self._initial_state(query, retrieval_keywords, kg_seed_entities)
+            )
+            return self._format_result(query, final_state)
             
         except Exception as e:
-            logger.error(f"Research failed: {e}")
-            return {
-                "query": query,
-                "error": str(e),
-                "background_context": "",
-                "sources": [],
-                "errors": [str(e)]
-            }
+            return self._failure_result(query, e)
+    
+    async def research_batch(
+        self,
+        queries: List[str],
+        max_concurrency: int = RESEARCH_BATCH_CONCURRENCY
+    ) -> List[Dict]:
+        """
+        Research several queries concurrently
+        
+        At most max_concurrency runs are in flight at once; requests are further
+        paced by the LLM's rate limiter, if one was given. Results are returned in query order.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def research_one(query: str) -> Dict:
+            async with semaphore:
+                return await self.aresearch(query)
+        
+        results = await asyncio.gather(*(research_one(query) for query in queries), return_exceptions=True)
+        return [
+            self._failure_result(query, result) if isinstance(result, Exception) else result
+            for query, result in zip(queries, results)
+        ]
+    
+    def clear_cache(self) -> None:
+        """Forget cached results (entries from before a re-index are already skipped; this frees them)"""
+        self._cache.clear()
 
 
 def create_research_team(
     rag_retriever: Optional[ChurnRAGRetriever] = None,
     knowledge_graph: Optional[ChurnKnowledgeGraph] = None,
-    use_tavily: bool = True
+    use_tavily: bool = True,
+    http_client: Optional[httpx.Client] = None,
+    http_async_client: Optional[httpx.AsyncClient] = None,
+    rate_limiter: Optional[BaseRateLimiter] = None
 ) -> ResearchTeam:
     """
     Factory function to create Research Team
@@ -353,6 +511,9 @@ def create_research_team(
         rag_retriever: RAG retriever instance
         knowledge_graph: Knowledge graph instance
         use_tavily: Enable Tavily search
+        http_client: Pooled HTTP client for OpenAI calls
+        http_async_client: Pooled async HTTP client for OpenAI calls
+        rate_limiter: Token bucket shared with the other LLM clients
     
     Returns:
         Initialized ResearchTeam
@@ -360,6 +521,9 @@ def create_research_team(
     return ResearchTeam(
         rag_retriever=rag_retriever,
         knowledge_graph=knowledge_graph,
-        use_tavily=use_tavily
+        use_tavily=use_tavily,
+        http_client=http_client,
+        http_async_client=http_async_client,
+        rate_limiter=rate_limiter
     )
 
@@ -4,29 +4,110 @@ Responsible for Finding Specific Use Cases and Generating Responses
 with Style Guide, Case Study Expertise, and Multiple Sub-Agents
 """
 
+import asyncio
+import hashlib
 import os
 import logging
+from functools import cached_property
 from typing import TypedDict, List, Dict, Optional, Annotated
 import operator
+import re
+
+import httpx
 
 from langgraph.graph import StateGraph, END
 from langchain_openai import ChatOpenAI
+from langchain_core.rate_limiters import BaseRateLimiter
 from langchain_core.documents import Document
 
+from core.caching import ResultCache, RetrievalCache, cache_key, normalize_query
 from core.rag_retrievers import ChurnRAGRetriever
+from utils.sync_runner import run_sync
 
 logger = logging.getLogger(__name__)
 
+# Context every writing prompt starts with, byte-for-byte, so the provider's prompt
+# cache can reuse the prefill of the first call; only the task-specific suffix differs
+SHARED_PREFIX_TEMPLATE = """You are part of a customer success team answering a question about customer churn.
+
+QUESTION: {query}
+
+BACKGROUND CONTEXT:
+{background}
+
+SPECIFIC USE CASES:
+{use_cases}
+
+"""
+
+
+# Style markers found in one case-insensitive pass; the group name is the marker kind
+_STYLE_RE = re.compile(r"(?P<churn>churn)|(?P<action>recommend|suggest|strategy)|(?P<data>[$%])", re.IGNORECASE)
+_STYLE_KINDS = {"churn", "action", "data"}
+# Words a response needs to count as comprehensive
+MIN_COMPREHENSIVE_WORDS = 200
+
+# Max writing runs write_batch() has in flight at once
+WRITE_BATCH_CONCURRENCY = 8
+# Use cases quoted in the prompts and cited in the response
+MAX_CITED_USE_CASES = 5
+
+
+def use_case_id(doc: Document) -> str:
+    """Stable identifier of a use case document (its source record, else its account)"""
+    metadata = doc.metadata
+    return str(metadata.get("record_id", metadata.get("account_name", doc.page_content[:64])))
+
+
+def use_case_records(use_cases: List[Document]) -> List[Dict]:
+    """Extract and format the fields of the top use cases once, for the prompts and citations"""
+    records = []
+    for doc in use_cases[:MAX_CITED_USE_CASES]:
+        metadata = doc.metadata
+        records.append({
+            "customer": metadata.get("account_name", "Unknown"),
+            "segment": metadata.get("segment", "N/A"),
+            "churn_reason": metadata.get("churn_reason", "N/A"),
+            "arr_lost": f"${metadata.get('arr_lost', 0):,.2f}",
+            "details": doc.page_content[:500]
+        })
+    return records
+
+
+def build_shared_prefix(query: str, background: str, records: List[Dict]) -> str:
+    """Shared prompt prefix with the question, background and top use cases"""
+    use_case_context = "\n\n".join(
+        f"USE CASE {i}: {record['customer']} ({record['segment']})\n"
+        f"Churn Reason: {record['churn_reason']}\n"
+        f"ARR Lost: {record['arr_lost']}\n"
+        f"Details: {record['details']}..."
+        for i, record in enumerate(records, 1)
+    )
+    return SHARED_PREFIX_TEMPLATE.format(
+        query=query,
+        background=background,
+        use_cases=use_case_context
+    )
+
+
+async def stream_text(llm: ChatOpenAI, prompt: str) -> str:
+    """Stream a completion and return its full text (tokens reach stream listeners as they arrive)"""
+    parts = []
+    async for chunk in llm.astream(prompt):
+        parts.append(chunk.content)
+    return "".join(parts)
+
 
 class WritingTeamState(TypedDict):
     """State for Writing Team"""
     query: str
     background_context: str  # From Research Team
     use_cases: List[Document]  # Specific relevant use cases
+    use_case_records: List[Dict]  # Formatted fields of the top use cases
+    shared_prefix: str  # Prompt prefix common to the drafting and editing calls
     draft_response: str  # Initial draft
-    edited_response: str  # Copy edited version
     citations: List[Dict]  # Research citations
-    empathy_enhanced: str  # Final empathy-enhanced version
+    polished_response: str  # Final copy-edited, empathy-enhanced version
     style_notes: List[str]  # Style guide compliance notes
     errors: Annotated[List[str], operator.add]
 
@@ -38,7 +119,7 @@ class DocumentWriterAgent:
         self.llm = llm
         logger.info("  ✓ Document Writer Agent initialized")
     
-    def draft(self, query: str, background: str, use_cases: List[Document]) -> str:
+    async def draft(self, shared_prefix: str) -> str:
         """
         Create initial draft response
         
@@ -49,24 +130,7 @@ class DocumentWriterAgent:
         """
         logger.info("✍️  Document Writer: Creating initial draft...")
         
-        # Prepare use case context
-        use_case_context = "\n\n".join([
-            f"USE CASE {i+1}: {doc.metadata.get('account_name', 'Unknown')} ({doc.metadata.get('segment', 'N/A')})\n"
-            f"Churn Reason: {doc.metadata.get('churn_reason', 'N/A')}\n"
-            f"ARR Lost: ${doc.metadata.get('arr_lost', 0):,.2f}\n"
-            f"Details: {doc.page_content[:500]}..."
-            for i, doc in enumerate(use_cases[:5])
-        ])
-        
-        drafting_prompt = f"""You are a customer success analyst drafting a comprehensive response.
-
-QUESTION: {query}
-
-BACKGROUND CONTEXT:
-{background}
-
-SPECIFIC USE CASES:
-{use_case_context}
+        drafting_prompt = shared_prefix + """As the customer success analyst, draft a comprehensive response.
 
 Write a comprehensive, well-structured response that:
 1. Directly addresses the question
@@ -84,39 +148,35 @@ Structure your response with clear sections:
 Write 4-6 paragraphs."""
         
         try:
-            response = self.llm.invoke(drafting_prompt)
+            draft = await stream_text(self.llm, drafting_prompt)
             logger.info("  ✓ Initial draft created")
-            return response.content
+            return draft
         except Exception as e:
             logger.error(f"Drafting failed: {e}")
             return f"Error creating draft: {str(e)}"
 
 
-class CopyEditorAgent:
-    """Sub-Agent: Copy Editor for editing and refinement"""
+class UnifiedEditorAgent:
+    """Sub-Agent: Editor that copy-edits and adds empathy in a single pass"""
     
     def __init__(self, llm: ChatOpenAI):
         self.llm = llm
-        logger.info("  ✓ Copy Editor Agent initialized")
+        logger.info("  ✓ Editor Agent initialized")
     
-    def edit(self, draft: str) -> str:
+    async def polish(self, shared_prefix: str, draft: str) -> str:
         """
-        Edit and refine the draft
+        Copy-edit the draft and enhance it with empathy in one LLM call
         
         Focuses on:
-        - Clarity and conciseness
-        - Grammar and style
-        - Logical flow
-        - Professional tone
+        - Clarity, grammar, logical flow and professional tone
+        - Customer-centric, empathetic and supportive language
         """
-        logger.info("✂️  Copy Editor: Refining draft...")
+        logger.info("✂️  Editor: Refining draft with empathy and compassion...")
         
-        editing_prompt = f"""You are a professional copy editor reviewing a customer success analysis.
-
-DRAFT RESPONSE:
+        polishing_prompt = shared_prefix + f"""DRAFT RESPONSE:
 {draft}
 
-Edit this response to:
+As the professional copy editor and empathy editor, edit this draft response to:
 1. Improve clarity and conciseness
 2. Fix any grammar or style issues
 3. Ensure logical flow between sections
@@ -125,12 +185,26 @@ Edit this response to:
 6. Remove redundancies
 7. Ensure consistent formatting
 
-Return the edited version with improvements. Maintain the same structure but enhance quality."""
+At the same time, make it more:
+1. Customer-centric and empathetic
+2. Understanding of customer challenges and pain points
+3. Compassionate while maintaining professionalism
+4. Supportive and encouraging
+5. Focused on partnership and mutual success
+
+Add phrases that:
+- Acknowledge customer challenges ("We understand that...")
+- Show empathy ("This is a common concern...")
+- Offer support ("We're here to help you...")
+- Build partnership ("Together, we can...")
+
+Maintain the same structure and all the data and insights.
+Return the edited, empathy-enhanced version."""
         
         try:
-            response = self.llm.invoke(editing_prompt)
-            logger.info("  ✓ Draft edited and refined")
-            return response.content
+            polished = await stream_text(self.llm, polishing_prompt)
+            logger.info("  ✓ Draft edited and enhanced with empathy")
+            return polished
         except Exception as e:
             logger.error(f"Editing failed: {e}")
             return draft  # Return original if editing fails
@@ -143,7 +217,7 @@ class NoteTakerAgent:
         self.llm = llm
         logger.info("  ✓ Note Taker Agent initialized")
     
-    def add_citations(self, response: str, use_cases: List[Document], sources: List[Dict]) -> List[Dict]:
+    def add_citations(self, response: str, use_case_records: List[Dict], sources: List[Dict]) -> List[Dict]:
         """
         Add proper citations and research notes
         
@@ -159,14 +233,14 @@ class NoteTakerAgent:
             citations = []
             
             # Add use case citations
-            for i, doc in enumerate(use_cases[:5], 1):
+            for i, record in enumerate(use_case_records, 1):
                 citations.append({
                     "citation_id": f"UC{i}",
                     "type": "use_case",
-                    "customer": doc.metadata.get("account_name", "Unknown"),
-                    "segment": doc.metadata.get("segment", "N/A"),
-                    "churn_reason": doc.metadata.get("churn_reason", "N/A"),
-                    "arr_lost": f"${doc.metadata.get('arr_lost', 0):,.2f}",
+                    "customer": record["customer"],
+                    "segment": record["segment"],
+                    "churn_reason": record["churn_reason"],
+                    "arr_lost": record["arr_lost"],
                     "relevance": "high"
                 })
             
@@ -189,57 +263,6 @@ class NoteTakerAgent:
             return []
 
 
-class EmpathyEditorAgent:
-    """Sub-Agent: Empathy Editor for compassion and customer understanding"""
-    
-    def __init__(self, llm: ChatOpenAI):
-        self.llm = llm
-        logger.info("  ✓ Empathy Editor Agent initialized")
-    
-    def enhance_empathy(self, response: str, query: str) -> str:
-        """
-        Enhance response with empathy and customer understanding
-        
-        Focuses on:
-        - Customer-centric language
-        - Empathy and compassion
-        - Understanding customer pain points
-        - Supportive recommendations
-        """
-        logger.info("💙 Empathy Editor: Enhancing with empathy and compassion...")
-        
-        empathy_prompt = f"""You are an empathy editor reviewing a customer success response.
-
-ORIGINAL QUERY: {query}
-
-RESPONSE TO ENHANCE:
-{response}
-
-Enhance this response to be more:
-1. Customer-centric and empathetic
-2. Understanding of customer challenges and pain points
-3. Compassionate while maintaining professionalism
-4. Supportive and encouraging
-5. Focused on partnership and mutual success
-
-Add phrases that:
-- Acknowledge customer challenges ("We understand that...")
-- Show empathy ("This is a common concern...")
-- Offer support ("We're here to help you...")
-- Build partnership ("Together, we can...")
-
-Maintain all the data and insights but soften the tone to be more understanding and supportive.
-Return the enhanced version."""
-        
-        try:
-            response = self.llm.invoke(empathy_prompt)
-            logger.info("  ✓ Response enhanced with empathy")
-            return response.content
-        except Exception as e:
-            logger.error(f"Empathy enhancement failed: {e}")
-            return response  # Return original if enhancement fails
-
-
 class StyleGuideAgent:
     """Sub-Agent: Style Guide Checker for brand consistency"""
     
@@ -261,17 +284,24 @@ class StyleGuideAgent:
         
         style_notes = []
         
-        # Check for key style elements
-        if "churn" in response.lower():
+        # Check for key style elements in a single scan, stopping once all are found
+        seen = set()
+        for match in _STYLE_RE.finditer(response):
+            seen.add(match.lastgroup)
+            if seen == _STYLE_KINDS:
+                break
+        
+        if "churn" in seen:
             style_notes.append("✓ Uses appropriate industry terminology")
         
-        if any(word in response.lower() for word in ["recommend", "suggest", "strategy"]):
+        if "action" in seen:
             style_notes.append("✓ Includes actionable recommendations")
         
-        if "$" in response or "%" in response:
+        if "data" in seen:
             style_notes.append("✓ Contains data-driven insights")
         
-        if len(response.split()) > 200:
+        # Split no further than needed to know the length threshold is passed
+        if len(response.split(maxsplit=MIN_COMPREHENSIVE_WORDS)) > MIN_COMPREHENSIVE_WORDS:
             style_notes.append("✓ Meets comprehensive response length requirements")
         
         logger.info(f"  ✓ Style check complete: {len(style_notes)} notes")
@@ -284,21 +314,29 @@ class WritingTeam:
     
     Uses multiple specialized sub-agents:
     1. Document Writer Agent: Initial drafting
-    2. Copy Editor Agent: Editing and refinement
+    2. Editor Agent: Editing, refinement and empathy in one pass
     3. Note Taker Agent: Citations and research notes
-    4. Empathy Editor Agent: Empathy and customer understanding
-    5. Style Guide Agent: Brand consistency
+    4. Style Guide Agent: Brand consistency
     
     Works with specific use cases from RAG to generate high-quality,
     empathetic, well-cited responses.
     """
     
-    def __init__(self, rag_retriever: Optional[ChurnRAGRetriever] = None):
+    def __init__(
+        self,
+        rag_retriever: Optional[ChurnRAGRetriever] = None,
+        http_client: Optional[httpx.Client] = None,
+        http_async_client: Optional[httpx.AsyncClient] = None,
+        rate_limiter: Optional[BaseRateLimiter] = None
+    ):
         """
         Initialize Writing Team
         
         Args:
             rag_retriever: RAG retriever for finding specific use cases
+            http_client: Pooled HTTP client for OpenAI calls (optional)
+            http_async_client: Pooled async HTTP client for OpenAI calls (optional)
+            rate_limiter: Token bucket shared with the other LLM clients (optional)
         """
         logger.info("📝 Initializing Document Writing Team...")
         
@@ -306,25 +344,53 @@ class WritingTeam:
         self.llm = ChatOpenAI(
             model="gpt-4o-mini",
             temperature=0.7,
-            openai_api_key=os.getenv("OPENAI_API_KEY")
+            openai_api_key=os.getenv("OPENAI_API_KEY"),
+            http_client=http_client,
+            http_async_client=http_async_client,
+            rate_limiter=rate_limiter
         )
         
         # Store RAG retriever
         self.rag_retriever = rag_retriever
         
-        # Initialize sub-agents
-        logger.info("  Initializing sub-agents:")
-        self.writer = DocumentWriterAgent(self.llm)
-        self.editor = CopyEditorAgent(self.llm)
-        self.note_taker = NoteTakerAgent(self.llm)
-        self.empathy_editor = EmpathyEditorAgent(self.llm)
-        self.style_guide = StyleGuideAgent(self.llm)
+        # Recent results, reused for repeated and near-duplicate questions on the same background
+        self._cache = ResultCache(embeddings=rag_retriever.embeddings if rag_retriever else None)
+        # Retriever calls, reused when a question comes up again
+        self._retrieval = RetrievalCache(rag_retriever)
         
-        # Build workflow
-        self.graph = self._build_graph()
-        self.app = self.graph.compile()
-        
-        logger.info("✅ Document Writing Team initialized with 5 sub-agents")
+        # Sub-agents and the workflow are built on first use, so a team that only
+        # serves cached results (or a single sub-step) never pays for them
+        logger.info("✅ Document Writing Team initialized with 4 sub-agents")
+    
+    @cached_property
+    def writer(self) -> DocumentWriterAgent:
+        """Document Writer sub-agent"""
+        return DocumentWriterAgent(self.llm)
+    
+    @cached_property
+    def editor(self) -> UnifiedEditorAgent:
+        """Editor sub-agent"""
+        return UnifiedEditorAgent(self.llm)
+    
+    @cached_property
+    def note_taker(self) -> NoteTakerAgent:
+        """Note Taker sub-agent"""
+        return NoteTakerAgent(self.llm)
+    
+    @cached_property
+    def style_guide(self) -> StyleGuideAgent:
+        """Style Guide sub-agent"""
+        return StyleGuideAgent(self.llm)
+    
+    @cached_property
+    def graph(self) -> StateGraph:
+        """Writing Team workflow"""
+        return self._build_graph()
+    
+    @cached_property
+    def app(self):
+        """Compiled Writing Team workflow"""
+        return self.graph.compile()
     
     def _build_graph(self) -> StateGraph:
         """Build Writing Team workflow"""
@@ -335,153 +401,264 @@ class WritingTeam:
         # Add nodes
         workflow.add_node("find_use_cases", self._find_use_cases)
         workflow.add_node("draft_response", self._draft_response)
-        workflow.add_node("edit_response", self._edit_response)
+        workflow.add_node("polish_response", self._polish_response)
         workflow.add_node("add_citations", self._add_citations)
-        workflow.add_node("enhance_empathy", self._enhance_empathy)
         workflow.add_node("check_style", self._check_style)
         
         # Set entry point
         workflow.set_entry_point("find_use_cases")
         
-        # Add edges (sequential workflow)
+        # Add edges: citations only need the use cases, so they are compiled alongside
+        # the draft → polish → style chain (style checks the final text)
         workflow.add_edge("find_use_cases", "draft_response")
-        workflow.add_edge("draft_response", "edit_response")
-        workflow.add_edge("edit_response", "add_citations")
-        workflow.add_edge("add_citations", "enhance_empathy")
-        workflow.add_edge("enhance_empathy", "check_style")
+        workflow.add_edge("find_use_cases", "add_citations")
+        workflow.add_edge("draft_response", "polish_response")
+        workflow.add_edge("polish_response", "check_style")
+        workflow.add_edge("add_citations", END)
         workflow.add_edge("check_style", END)
         
         logger.info("✓ Writing Team workflow built")
         return workflow
     
-    def _find_use_cases(self, state: WritingTeamState) -> WritingTeamState:
+    def find_use_cases(self, query: str) -> List[Document]:
         """Find specific use cases relevant to the query"""
         logger.info("🔍 Finding specific use cases...")
         
         if not self.rag_retriever:
             logger.warning("RAG retriever not initialized")
-            state["use_cases"] = []
-            return state
+            return []
+        
+        # Use reranking for most relevant use cases
+        docs = self._retrieval.retrieve("rerank_retrieval", query, k=8)
+        logger.info(f"✓ Found {len(docs)} relevant use cases")
+        return docs
+    
+    async def afind_use_cases(self, query: str) -> List[Document]:
+        """Find use cases on a worker thread (the retriever client is synchronous)"""
+        return await asyncio.to_thread(self.find_use_cases, query)
+    
+    def _find_use_cases(self, state: WritingTeamState) -> Dict:
+        """Find use cases unless they were already retrieved by the caller"""
+        use_cases = state.get("use_cases")
+        if use_cases is not None:
+            return {"use_case_records": use_case_records(use_cases)}
         
         try:
-            query = state["query"]
-            
-            # Use reranking for most relevant use cases
-            docs = self.rag_retriever.rerank_retrieval(query, k=8)
-            
-            state["use_cases"] = docs
-            logger.info(f"✓ Found {len(docs)} relevant use cases")
+            use_cases = self.find_use_cases(state["query"])
+            return {"use_cases": use_cases, "use_case_records": use_case_records(use_cases)}
             
         except Exception as e:
             logger.error(f"Use case retrieval failed: {e}")
-            state["use_cases"] = []
-            state["errors"] = [f"Use case retrieval error: {str(e)}"]
-        
-        return state
+            return {
+                "use_cases": [],
+                "use_case_records": [],
+                "errors": [f"Use case retrieval error: {str(e)}"]
+            }
     
-    def _draft_response(self, state: WritingTeamState) -> WritingTeamState:
+    # The nodes below return only the fields they set, since citations are
+    # added concurrently with the drafting chain
+    
+    async def _draft_response(self, state: WritingTeamState) -> Dict:
         """Draft initial response using Document Writer Agent"""
-        draft = self.writer.draft(
+        shared_prefix = build_shared_prefix(
             query=state["query"],
             background=state.get("background_context", ""),
-            use_cases=state.get("use_cases", [])
+            records=state.get("use_case_records") or []
         )
-        state["draft_response"] = draft
-        return state
+        draft = await self.writer.draft(shared_prefix)
+        return {"shared_prefix": shared_prefix, "draft_response": draft}
     
-    def _edit_response(self, state: WritingTeamState) -> WritingTeamState:
-        """Edit response using Copy Editor Agent"""
-        edited = self.editor.edit(state.get("draft_response", ""))
-        state["edited_response"] = edited
-        return state
+    async def _polish_response(self, state: WritingTeamState) -> Dict:
+        """Copy-edit and enhance with empathy using the Editor Agent"""
+        polished = await self.editor.polish(
+            shared_prefix=state.get("shared_prefix", ""),
+            draft=state.get("draft_response", "")
+        )
+        return {"polished_response": polished}
     
-    def _add_citations(self, state: WritingTeamState) -> WritingTeamState:
+    def _add_citations(self, state: WritingTeamState) -> Dict:
         """Add citations using Note Taker Agent"""
         citations = self.note_taker.add_citations(
-            response=state.get("edited_response", ""),
-            use_cases=state.get("use_cases", []),
+            response=state.get("draft_response", ""),
+            use_case_records=state.get("use_case_records") or [],
             sources=[]  # Additional sources can be passed from research team
         )
-        state["citations"] = citations
-        return state
-    
-    def _enhance_empathy(self, state: WritingTeamState) -> WritingTeamState:
-        """Enhance with empathy using Empathy Editor Agent"""
-        enhanced = self.empathy_editor.enhance_empathy(
-            response=state.get("edited_response", ""),
-            query=state["query"]
-        )
-        state["empathy_enhanced"] = enhanced
-        return state
+        return {"citations": citations}
     
-    def _check_style(self, state: WritingTeamState) -> WritingTeamState:
+    def _check_style(self, state: WritingTeamState) -> Dict:
         """Check style compliance using Style Guide Agent"""
-        style_notes = self.style_guide.check_style(
-            state.get("empathy_enhanced", "")
+        return {"style_notes": self.style_guide.check_style(state.get("polished_response", ""))}
+    
+    @staticmethod
+    def _initial_state(
+        query: str,
+        background_context: str,
+        use_cases: Optional[List[Document]]
+    ) -> WritingTeamState:
+        """Empty writing state for a query"""
+        return WritingTeamState(
+            query=query,
+            background_context=background_context,
+            use_cases=use_cases,
+            use_case_records=[],
+            shared_prefix="",
+            draft_response="",
+            citations=[],
+            polished_response="",
+            style_notes=[],
+            errors=[]
         )
-        state["style_notes"] = style_notes
-        return state
     
-    def write(self, query: str, background_context: str = "") -> Dict:
+    @staticmethod
+    def _format_result(query: str, final_state: WritingTeamState) -> Dict:
+        """Writing results returned to the caller"""
+        return {
+            "query": query,
+            "final_response": final_state.get("polished_response", ""),
+            "draft_response": final_state.get("draft_response", ""),
+            "citations": final_state.get("citations", []),
+            "style_notes": final_state.get("style_notes", []),
+            "use_cases_found": len(final_state.get("use_cases") or []),
+            "errors": final_state.get("errors", [])
+        }
+    
+    @staticmethod
+    def _failure_result(query: str, error: Exception) -> Dict:
+        """Result returned when the writing workflow itself fails"""
+        logger.error(f"Writing failed: {error}")
+        return {
+            "query": query,
+            "error": str(error),
+            "final_response": "",
+            "citations": [],
+            "errors": [str(error)]
+        }
+    
+    def write(
+        self,
+        query: str,
+        background_context: str = "",
+        use_cases: Optional[List[Document]] = None,
+        entities: Optional[List[str]] = None
+    ) -> Dict:
         """
         Generate a comprehensive response
         
         Args:
             query: User question
             background_context: Context from Research Team
+            use_cases: Use cases retrieved beforehand (retrieved here if None)
+            entities: Customers, segments or competitors named in the query (optional)
         
         Returns:
             Comprehensive response with citations and metadata
         """
-        logger.info(f"📝 Writing Team generating response for: {query[:100]}...")
+        return run_sync(self.awrite(query, background_context, use_cases, entities))
+    
+    async def awrite(
+        self,
+        query: str,
+        background_context: str = "",
+        use_cases: Optional[List[Document]] = None,
+        entities: Optional[List[str]] = None
+    ) -> Dict:
+        """
+        Generate a response without blocking the event loop
         
-        # Initialize state
-        initial_state = WritingTeamState(
-            query=query,
-            background_context=background_context,
-            use_cases=[],
-            draft_response="",
-            edited_response="",
-            citations=[],
-            empathy_enhanced="",
-            style_notes=[],
-            errors=[]
+        Same as write(); LangGraph executes the synchronous nodes on worker threads.
+        """
+        # A result depends on the background, the use cases it cites and the entities the
+        # question names; a near-duplicate question only reuses it when all of them match
+        # (the background is empty on write-only routes, so it can't tell questions apart).
+        # Use cases come from the index, so a re-index stops earlier results from being reused
+        inputs = (
+            hashlib.sha256(background_context.encode("utf-8")).hexdigest(),
+            None if use_cases is None else [use_case_id(doc) for doc in use_cases],
+            sorted(entity.lower() for entity in entities or []),
+            getattr(self.rag_retriever, "index_version", 0)
         )
+        result = await self._cache.get_or_compute(
+            cache_key(normalize_query(query), *inputs),
+            query,
+            lambda: self._run(query, background_context, use_cases),
+            scope=cache_key(*inputs)
+        )
+        return {**result, "query": query}
+    
+    async def _run(
+        self,
+        query: str,
+        background_context: str,
+        use_cases: Optional[List[Document]]
+    ) -> Dict:
+        """Run the writing workflow"""
+        logger.info(f"📝 Writing Team generating response for: {query[:100]}...")
         
         try:
-            # Run writing workflow
-            final_state = self.app.invoke(initial_state)
-            
-            return {
-                "query": query,
-                "final_response": final_state.get("empathy_enhanced", ""),
-                "draft_response": final_state.get("draft_response", ""),
-                "citations": final_state.get("citations", []),
-                "style_notes": final_state.get("style_notes", []),
-                "use_cases_found": len(final_state.get("use_cases", [])),
-                "errors": final_state.get("errors", [])
-            }
+            final_state = await self.app.ainvoke(self._initial_state(query, background_context, use_cases))
+            return self._format_result(query, final_state)
             
         except Exception as e:
-            logger.error(f"Writing failed: {e}")
-            return {
-                "query": query,
-                "error": str(e),
-                "final_response": "",
-                "citations": [],
-                "errors": [str(e)]
-            }
+            return self._failure_result(query, e)
+    
+    async def write_batch(
+        self,
+        queries: List[str],
+        background_contexts: Optional[List[str]] = None,
+        max_concurrency: int = WRITE_BATCH_CONCURRENCY
+    ) -> List[Dict]:
+        """
+        Generate responses for several queries concurrently
+        
+        background_contexts, if given, pairs one background with each query.
+        At most max_concurrency runs are in flight at once; requests are further
+        paced by the LLM's rate limiter, if one was given. Results are returned in query order.
+        """
+        backgrounds = background_contexts if background_contexts is not None else [""] * len(queries)
+        if len(backgrounds) != len(queries):
+            raise ValueError("write_batch needs one background context per query")
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def write_one(query: str, background_context: str) -> Dict:
+            async with semaphore:
+                return await self.awrite(query, background_context)
+        
+        results = await asyncio.gather(
+            *(write_one(query, background) for query, background in zip(queries, backgrounds)),
+            return_exceptions=True
+        )
+        return [
+            self._failure_result(query, result) if isinstance(result, Exception) else result
+            for query, result in zip(queries, results)
+        ]
+    
+    def clear_cache(self) -> None:
+        """Forget cached results (entries from before a re-index are already skipped; this frees them)"""
+        self._cache.clear()
 
 
-def create_writing_team(rag_retriever: Optional[ChurnRAGRetriever] = None) -> WritingTeam:
+def create_writing_team(
+    rag_retriever: Optional[ChurnRAGRetriever] = None,
+    http_client: Optional[httpx.Client] = None,
+    http_async_client: Optional[httpx.AsyncClient] = None,
+    rate_limiter: Optional[BaseRateLimiter] = None
+) -> WritingTeam:
     """
     Factory function to create Writing Team
     
     Args:
         rag_retriever: RAG retriever instance
+        http_client: Pooled HTTP client for OpenAI calls
+        http_async_client: Pooled async HTTP client for OpenAI calls
+        rate_limiter: Token bucket shared with the other LLM clients
     
     Returns:
         Initialized WritingTeam
     """
-    return WritingTeam(rag_retriever=rag_retriever)
+    return WritingTeam(
+        rag_retriever=rag_retriever,
+        http_client=http_client,
+        http_async_client=http_async_client,
+        rate_limiter=rate_limiter
+    )
 
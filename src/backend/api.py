@@ -124,6 +124,13 @@ async def startup_event():
         logger.warning("⚠️  API will run but RAG endpoints will return errors")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close pooled HTTP connections"""
+    if multi_agent_system:
+        await multi_agent_system.aclose()
+
+
 # Request/Response Models
 class ChurnAnalysisRequest(BaseModel):
     """Request model for churn analysis"""
@@ -216,7 +223,7 @@ async def analyze_churn(request: ChurnAnalysisRequest):
     try:
         # Run agent analysis
         logger.info("🤖 Running agent analysis...")
-        result = churn_agent.run(
+        result = await churn_agent.arun(
             query=request.query,
             customer_id=request.customer_id
         )
@@ -407,8 +414,8 @@ async def multi_agent_analyze(request: MultiAgentRequest):
     
     Uses two specialized agent teams:
     - Team 1 (Research Team): Gathers background context using RAG and Tavily search
-    - Team 2 (Writing Team): Generates detailed response with 5 sub-agents
-      (Writer, Editor, Note Taker, Empathy Editor, Style Guide)
+    - Team 2 (Writing Team): Generates detailed response with 4 sub-agents
+      (Writer, Editor with empathy pass, Note Taker, Style Guide)
     
     This endpoint provides the most comprehensive analysis with:
     - High-level background context
@@ -430,7 +437,7 @@ async def multi_agent_analyze(request: MultiAgentRequest):
     try:
         # Run multi-agent analysis
         logger.info("🤖 Running multi-agent analysis...")
-        result = multi_agent_system.analyze(query=request.query)
+        result = await multi_agent_system.aanalyze(query=request.query)
         
         # Calculate metrics
         response_time = int((time.time() - start_time) * 1000)
@@ -0,0 +1,239 @@
+"""
+In-process caching helpers
+TTL-bounded LRU cache and stable cache keys shared by the agents
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Default lifetime of cached entries
+CACHE_TTL_SECONDS = 24 * 60 * 60
+# Near-duplicate queries (cosine similarity of their embeddings) reuse a cached result
+SEMANTIC_CACHE_SIZE = 1024
+SEMANTIC_CACHE_THRESHOLD = 0.92
+# Research and Writing Team results: exact reruns within the TTL, and near-duplicates
+# above a stricter threshold than whole analyses
+RESULT_CACHE_SIZE = 512
+RESULT_CACHE_TTL_SECONDS = 15 * 60
+RESULT_SEMANTIC_THRESHOLD = 0.95
+# Retriever results per (method, query, k), dropped when the retriever re-indexes
+RETRIEVAL_CACHE_SIZE = 512
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query used for exact-match caching"""
+    return " ".join(query.lower().split())
+
+
+def cache_key(*parts) -> str:
+    """Stable hash key for a tuple of cache key parts"""
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after ttl seconds"""
+    
+    def __init__(self, maxsize: int, ttl: float = CACHE_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SemanticResponseCache:
+    """Thread-safe cache of query embeddings -> serialized responses, matched by cosine similarity"""
+    
+    def __init__(
+        self,
+        maxsize: int = SEMANTIC_CACHE_SIZE,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        ttl: float = CACHE_TTL_SECONDS,
+        path: Optional[str] = None
+    ):
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self.ttl = ttl
+        # Unit-length embeddings, one row per entry, oldest first
+        self._vectors = None
+        self._created = []
+        self._responses = []
+        self._lock = threading.Lock()
+        self._db = None
+        
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, embedding BLOB, response TEXT, created_at REAL)"
+            )
+            rows = self._db.execute(
+                "SELECT embedding, response, created_at FROM responses "
+                "WHERE created_at > ? ORDER BY created_at DESC LIMIT ?",
+                (time.time() - ttl, maxsize)
+            ).fetchall()
+            for embedding, response, created_at in reversed(rows):
+                self._append(np.frombuffer(embedding, dtype=np.float32), response, created_at)
+            logger.info("✓ Loaded %d cached results from %s", len(self._responses), path)
+    
+    @staticmethod
+    def _unit(vector: List[float]) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+    
+    def _append(self, vector: np.ndarray, response: str, created_at: float) -> None:
+        if self._vectors is not None and self._vectors.shape[1] != vector.shape[0]:
+            # Embedding model changed; older entries are not comparable
+            self._vectors, self._created, self._responses = None, [], []
+        self._vectors = vector[None, :] if self._vectors is None else np.vstack([self._vectors, vector])
+        self._created.append(created_at)
+        self._responses.append(response)
+        if len(self._responses) > self.maxsize:
+            self._vectors = self._vectors[1:]
+            del self._created[0], self._responses[0]
+    
+    def get(self, vector: List[float], match: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+        """
+        Cached response of the most similar unexpired query, if it clears the threshold
+        
+        With match, the most similar response above the threshold that match() accepts.
+        """
+        vector = self._unit(vector)
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != vector.shape[0]:
+                return None
+            similarities = self._vectors @ vector
+            similarities[np.asarray(self._created) < time.time() - self.ttl] = -1.0
+            if match is None:
+                best = int(np.argmax(similarities))
+                return self._responses[best] if similarities[best] >= self.threshold else None
+            candidates = np.flatnonzero(similarities >= self.threshold)
+            for index in candidates[np.argsort(-similarities[candidates], kind="stable")]:
+                if match(self._responses[index]):
+                    return self._responses[index]
+            return None
+    
+    def set(self, vector: List[float], response: str) -> None:
+        vector = self._unit(vector)
+        created_at = time.time()
+        with self._lock:
+            self._append(vector, response, created_at)
+            if self._db is not None:
+                embedding = vector.tobytes()
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                    (hashlib.sha256(embedding).hexdigest(), embedding, response, created_at)
+                )
+                self._db.commit()
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._vectors, self._created, self._responses = None, [], []
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+
+class RetrievalCache:
+    """Thread-safe TTL LRU of retriever results keyed by method, query, k and the index version"""
+    
+    def __init__(self, retriever, maxsize: int = RETRIEVAL_CACHE_SIZE, ttl: float = CACHE_TTL_SECONDS):
+        self.retriever = retriever
+        self._cache = TTLCache(maxsize, ttl=ttl)
+    
+    def retrieve(self, method: str, query: str, k: int) -> List:
+        """Documents from retriever.<method>(query, k=k), reusing an earlier identical call"""
+        key = cache_key(method, query, k, getattr(self.retriever, "index_version", 0))
+        docs = self._cache.get(key)
+        if docs is None:
+            docs = getattr(self.retriever, method)(query, k=k)
+            self._cache.set(key, docs)
+        # Callers get their own list; the documents themselves are shared
+        return list(docs)
+
+
+class ResultCache:
+    """
+    Two-tier cache for agent results: exact key match, then nearest cached query embedding
+    
+    Results that carry errors are not cached. A semantic hit must also match the
+    caller's scope (e.g. a hash of the inputs besides the query) to be reused.
+    """
+    
+    def __init__(
+        self,
+        embeddings=None,
+        maxsize: int = RESULT_CACHE_SIZE,
+        ttl: float = RESULT_CACHE_TTL_SECONDS,
+        threshold: float = RESULT_SEMANTIC_THRESHOLD
+    ):
+        self.embeddings = embeddings
+        self._exact = TTLCache(maxsize, ttl=ttl)
+        self._semantic = SemanticResponseCache(maxsize=maxsize, threshold=threshold, ttl=ttl)
+    
+    async def _embed(self, text: str) -> Optional[List[float]]:
+        if self.embeddings is None:
+            return None
+        try:
+            return await self.embeddings.aembed_query(text)
+        except Exception as e:
+            logger.warning("Query embedding failed, skipping semantic cache: %s", e)
+            return None
+    
+    async def get_or_compute(self, key: str, text: str, compute, scope: str = "") -> Dict:
+        """Return the cached result for key (or for a query similar to text), else await compute()"""
+        cached = self._exact.get(key)
+        if cached is not None:
+            return cached
+        
+        vector = await self._embed(text)
+        if vector is not None:
+            # Entries are stored as {"scope": ..., "result": ...}; only same-scope ones match
+            prefix = json.dumps({"scope": scope})[:-1] + ", "
+            hit = self._semantic.get(vector, match=lambda entry: entry.startswith(prefix))
+            if hit is not None:
+                return json.loads(hit)["result"]
+        
+        result = await compute()
+        if not result.get("errors"):
+            self._exact.set(key, result)
+            if vector is not None:
+                self._semantic.set(vector, json.dumps({"scope": scope, "result": result}, default=str))
+        return result
+    
+    def clear(self) -> None:
+        """Drop every cached result (e.g. after the knowledge base is re-indexed)"""
+        self._exact.clear()
+        self._semantic.clear()
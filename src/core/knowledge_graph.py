@@ -8,6 +8,9 @@ Extracts entities and relationships from SFDC churned customers data:
 Uses NetworkX for graph structure and enables hybrid retrieval (semantic + graph)
 """
 
+import pickle
+from collections import Counter
+
 import networkx as nx
 import pandas as pd
 from pathlib import Path
@@ -32,6 +35,10 @@ class ChurnKnowledgeGraph:
             'Competitor': set(),
             'Product': set()
         }
+        # Bumped whenever the graph is rebuilt or reloaded, so callers can invalidate caches
+        self.version = 0
+        self._competitor_counts = None
+        self._churn_patterns = {}
         
     def build_from_dataframe(self, df: pd.DataFrame) -> None:
         """
@@ -54,6 +61,13 @@ class ChurnKnowledgeGraph:
         
         # Log statistics
         self._log_statistics()
+        self._mark_changed()
+    
+    def _mark_changed(self) -> None:
+        """Record a graph change and drop derived aggregates"""
+        self.version += 1
+        self._competitor_counts = None
+        self._churn_patterns = {}
         
     def _extract_customers(self, df: pd.DataFrame) -> None:
         """Extract customer entities with attributes"""
@@ -293,6 +307,26 @@ class ChurnKnowledgeGraph:
         """Get all entities of a specific type"""
         return list(self.entity_types.get(entity_type, set()))
     
+    def get_entity_type_counts(self) -> Dict[str, int]:
+        """Number of entities of each type, without copying the entity lists"""
+        return {entity_type: len(entities) for entity_type, entities in self.entity_types.items()}
+    
+    @property
+    def competitor_counts(self) -> Dict[str, int]:
+        """Customers lost to each competitor, most frequent first (computed once per graph version)"""
+        if self._competitor_counts is None:
+            customers_by_competitor = self.query_customers_by_competitors(
+                self.entity_types['Competitor']
+            )
+            counts = {
+                competitor: len(customers)
+                for competitor, customers in customers_by_competitor.items()
+            }
+            self._competitor_counts = dict(
+                sorted(counts.items(), key=lambda item: item[1], reverse=True)
+            )
+        return self._competitor_counts
+    
     def get_neighbors(self, node_id: str, relationship_type: Optional[str] = None) -> List[Tuple[str, Dict]]:
         """
         Get neighbors of a node, optionally filtered by relationship type
@@ -345,6 +379,13 @@ class ChurnKnowledgeGraph:
         
         return customers
     
+    def query_customers_by_competitors(self, competitors) -> Dict[str, List[str]]:
+        """Find the customers who switched to each of several competitors in one call"""
+        return {
+            competitor: self.query_customers_by_competitor(competitor)
+            for competitor in competitors
+        }
+    
     def query_customers_by_segment(self, segment: str) -> List[str]:
         """Find all customers in a specific segment"""
         segment_node = f"SEGMENT:{segment}"
@@ -394,8 +435,6 @@ class ChurnKnowledgeGraph:
                     competitors.append(neighbor.replace('COMPETITOR:', ''))
         
         # Aggregate statistics
-        from collections import Counter
-        
         return {
             'segment': segment,
             'customer_count': len(customers),
@@ -406,16 +445,25 @@ class ChurnKnowledgeGraph:
             'total_arr_lost': sum(arr_values)
         }
     
+    def get_churn_patterns_bulk(self, segments) -> Dict[str, Dict]:
+        """
+        Churn patterns for several segments in one call
+        
+        Each segment is aggregated once per graph version; later calls reuse the result.
+        """
+        missing = [segment for segment in segments if segment not in self._churn_patterns]
+        for segment in missing:
+            self._churn_patterns[segment] = self.get_churn_patterns(segment)
+        return {segment: self._churn_patterns[segment] for segment in segments}
+    
     def save_graph(self, filepath: str) -> None:
         """Save knowledge graph to file"""
-        import pickle
         with open(filepath, 'wb') as f:
             pickle.dump(self.graph, f)
         logger.info(f"✅ Knowledge graph saved to {filepath}")
     
     def load_graph(self, filepath: str) -> None:
         """Load knowledge graph from file"""
-        import pickle
         with open(filepath, 'rb') as f:
             self.graph = pickle.load(f)
         
@@ -427,6 +475,7 @@ class ChurnKnowledgeGraph:
                     self.entity_types[entity_type].add(node)
                 else:
                     self.entity_types[entity_type].add(data.get('name', node))
+        self._mark_changed()
         
         logger.info(f"✅ Knowledge graph loaded from {filepath}")
 
@@ -9,10 +9,20 @@ from dotenv import load_dotenv
 from langchain_openai import OpenAIEmbeddings
 from langchain_community.vectorstores import Qdrant
 from qdrant_client import QdrantClient
+from qdrant_client.models import QuantizationSearchParams, SearchParams
 
 # Load environment variables
 load_dotenv()
 
+# Must match the model and dimensions used to build the collection (ingest_to_qdrant.py)
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIMENSIONS = 512
+
+# The collection stores int8-quantized vectors; oversample and rescore with the originals
+QUANTIZED_SEARCH_PARAMS = SearchParams(
+    quantization=QuantizationSearchParams(rescore=True, oversampling=2.0)
+)
+
 class RAGRetriever:
     """Handles RAG retrieval from Qdrant vector database"""
 
@@ -34,7 +44,11 @@ class RAGRetriever:
                 return
 
             # Initialize embeddings and client (connect to Qdrant server)
-            embeddings = OpenAIEmbeddings(openai_api_key=api_key)
+            embeddings = OpenAIEmbeddings(
+                model=EMBEDDING_MODEL,
+                dimensions=EMBEDDING_DIMENSIONS,
+                openai_api_key=api_key
+            )
             client = QdrantClient(url=self.qdrant_url)
 
             # Check if collection exists
@@ -85,7 +99,9 @@ class RAGRetriever:
 
         try:
             # Perform similarity search
-            results = self.vectorstore.similarity_search(query, k=k)
+            results = self.vectorstore.similarity_search(
+                query, k=k, search_params=QUANTIZED_SEARCH_PARAMS
+            )
 
             # Format results
             context_docs = []
@@ -118,7 +134,9 @@ class RAGRetriever:
 
         try:
             # Perform similarity search with scores
-            results = self.vectorstore.similarity_search_with_score(query, k=k)
+            results = self.vectorstore.similarity_search_with_score(
+                query, k=k, search_params=QUANTIZED_SEARCH_PARAMS
+            )
 
             # Format results
             context_docs = []
@@ -3,12 +3,17 @@ RAG Retrieval Implementations
 Multiple retrieval strategies for customer churn analysis
 """
 
+import hashlib
 import os
 import sys
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
 from typing import List, Optional, Dict
 import logging
 
+import numpy as np
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 from langchain_qdrant import QdrantVectorStore
 from langchain.retrievers import ContextualCompressionRetriever, ParentDocumentRetriever, MultiQueryRetriever
@@ -16,6 +21,7 @@ from langchain.retrievers.document_compressors import LLMChainExtractor
 from langchain.storage import InMemoryStore
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from qdrant_client import QdrantClient
 from qdrant_client.models import Distance, VectorParams
 
@@ -34,6 +40,90 @@ except ImportError:
 sys.path.append(str(Path(__file__).parent.parent))
 from utils.data_loader import ChurnDataLoader
 
+# Query embeddings kept process-wide so retrievers and agents share them
+QUERY_EMBEDDING_CACHE_SIZE = 4096
+QUERY_EMBEDDING_TTL_SECONDS = 24 * 60 * 60
+
+
+class SharedEmbeddingCache:
+    """Thread-safe LRU of sha256(model, text) -> float16 embedding, with a TTL"""
+    
+    def __init__(self, maxsize: int = QUERY_EMBEDDING_CACHE_SIZE, ttl: float = QUERY_EMBEDDING_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+    
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        key = self._key(model, text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, vector = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return vector.astype(np.float32).tolist()
+    
+    def set(self, model: str, text: str, vector: List[float]) -> List[float]:
+        """Store a vector and return it as cached, so hits and misses yield the same values"""
+        # Half precision halves the cache's memory footprint
+        stored = np.asarray(vector, dtype=np.float16)
+        key = self._key(model, text)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, stored)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return stored.astype(np.float32).tolist()
+
+
+SHARED_EMBEDDING_CACHE = SharedEmbeddingCache()
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """Embeddings wrapper that serves repeated query embeddings from a shared cache"""
+    
+    def __init__(self, embeddings: OpenAIEmbeddings, cache: SharedEmbeddingCache = SHARED_EMBEDDING_CACHE):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model = f"{embeddings.model}-{embeddings.dimensions}"
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+    
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.embeddings.aembed_documents(texts)
+    
+    def embed_query(self, text: str) -> List[float]:
+        vector = self.cache.get(self.model, text)
+        if vector is None:
+            vector = self.cache.set(self.model, text, self.embeddings.embed_query(text))
+        return vector
+    
+    async def aembed_query(self, text: str) -> List[float]:
+        vector = self.cache.get(self.model, text)
+        if vector is None:
+            vector = self.cache.set(self.model, text, await self.embeddings.aembed_query(text))
+        return vector
+    
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed several queries, fetching all uncached ones in a single request"""
+        vectors = [self.cache.get(self.model, text) for text in texts]
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+        if missing:
+            fetched = dict(zip(missing, self.embeddings.embed_documents(missing)))
+            for text in missing:
+                fetched[text] = self.cache.set(self.model, text, fetched[text])
+            vectors = [fetched[text] if vector is None else vector for text, vector in zip(texts, vectors)]
+        return vectors
+
 
 class ChurnRAGRetriever:
     """
@@ -58,11 +148,11 @@ class ChurnRAGRetriever:
         
         logger.info(f"Initializing Churn RAG Retriever with Qdrant at {self.qdrant_url}")
         
-        # Initialize embeddings
-        self.embeddings = OpenAIEmbeddings(
+        # Initialize embeddings (query embeddings shared process-wide)
+        self.embeddings = CachedQueryEmbeddings(OpenAIEmbeddings(
             model="text-embedding-3-small",
             openai_api_key=os.getenv("OPENAI_API_KEY")
-        )
+        ))
         
         # Initialize LLM for query generation and compression
         self.llm = ChatOpenAI(
@@ -84,6 +174,9 @@ class ChurnRAGRetriever:
         self.child_splitter = RecursiveCharacterTextSplitter(chunk_size=400, chunk_overlap=50)
         self.parent_retriever = None  # Will be initialized after loading documents
         
+        # Bumped on every (re-)index so cached retrieval results are not reused across indexes
+        self.index_version = 0
+        
     def load_and_process_documents(self, data_folder: str = "data/"):
         """
         Load documents from data folder and create vector embeddings
@@ -117,6 +210,7 @@ class ChurnRAGRetriever:
         logger.info(f"✓ Parent document retriever initialized with {len(self.documents)} documents")
         
         logger.info("✅ Vector store created and documents indexed")
+        self.index_version += 1
         
         return len(self.documents)
     
@@ -0,0 +1,57 @@
+"""
+Blocking wrappers for the async agents
+Runs coroutines on one persistent background event loop
+"""
+
+import asyncio
+import threading
+from typing import Any, Coroutine, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Loop shared by every blocking call, started on first use
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    """Start the shared loop on a daemon thread the first time it is needed"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="sync-runner", daemon=True).start()
+            _loop = loop
+    return _loop
+
+
+def run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    Run a coroutine to completion from synchronous code
+
+    Every call runs on the same long-lived loop, so pooled async HTTP clients (whose
+    keep-alive connections are bound to the loop that opened them) stay usable across
+    calls. Also works when the caller is already inside a running loop, e.g. a notebook.
+    """
+    loop = _background_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_sync() called from the shared loop; await the coroutine instead")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+async def run_on_shared_loop(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    Await a coroutine on the shared loop from any event loop
+
+    For async entry points whose clients are also driven by run_sync() (e.g. from a web
+    server's loop), so pooled connections are only ever used from the loop that opened them.
+    """
+    loop = _background_loop()
+    if asyncio.get_running_loop() is loop:
+        return await coro
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
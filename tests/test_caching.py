@@ -0,0 +1,222 @@
+"""
+Test Caching Helpers
+Unit tests for the exact/semantic result cache and the retrieval cache
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from core.caching import ResultCache, RetrievalCache
+
+
+class FakeEmbeddings:
+    """Maps known texts to fixed vectors; near-duplicates share a direction"""
+    
+    VECTORS = {
+        "why do customers churn": [1.0, 0.0, 0.0],
+        "why do our customers churn": [0.99, 0.01, 0.0],
+        "what is our pricing": [0.0, 1.0, 0.0],
+    }
+    
+    async def aembed_query(self, text):
+        return self.VECTORS[text]
+
+
+class Counter:
+    """compute() stand-in that counts how often it is awaited"""
+    
+    def __init__(self, result=None):
+        self.calls = 0
+        self.result = result or {"answer": "computed"}
+    
+    async def __call__(self):
+        self.calls += 1
+        return dict(self.result, call=self.calls)
+
+
+def _get(cache, key, text, compute, scope=""):
+    return asyncio.run(cache.get_or_compute(key, text, compute, scope=scope))
+
+
+def test_exact_hit_skips_compute():
+    cache, compute = ResultCache(), Counter()
+    
+    first = _get(cache, "k", "why do customers churn", compute)
+    second = _get(cache, "k", "why do customers churn", compute)
+    
+    assert compute.calls == 1
+    assert second == first
+
+
+def test_semantic_hit_for_near_duplicate_query():
+    cache, compute = ResultCache(embeddings=FakeEmbeddings()), Counter()
+    
+    _get(cache, "k1", "why do customers churn", compute)
+    hit = _get(cache, "k2", "why do our customers churn", compute)
+    
+    assert compute.calls == 1
+    assert hit["call"] == 1
+
+
+def test_semantic_miss_for_unrelated_query():
+    cache, compute = ResultCache(embeddings=FakeEmbeddings()), Counter()
+    
+    _get(cache, "k1", "why do customers churn", compute)
+    _get(cache, "k2", "what is our pricing", compute)
+    
+    assert compute.calls == 2
+
+
+def test_semantic_hit_requires_same_scope():
+    cache, compute = ResultCache(embeddings=FakeEmbeddings()), Counter()
+    
+    _get(cache, "k1", "why do customers churn", compute, scope="index-v1")
+    _get(cache, "k2", "why do our customers churn", compute, scope="index-v2")
+    
+    assert compute.calls == 2
+
+
+def test_results_with_errors_are_not_cached():
+    cache, compute = ResultCache(), Counter({"errors": ["boom"]})
+    
+    _get(cache, "k", "why do customers churn", compute)
+    _get(cache, "k", "why do customers churn", compute)
+    
+    assert compute.calls == 2
+
+
+def test_semantic_hit_skips_nearer_entries_from_other_scopes():
+    """The nearest entry belongs to another scope; a slightly farther same-scope one is used"""
+    cache, compute = ResultCache(embeddings=FakeEmbeddings()), Counter()
+    
+    _get(cache, "k1", "why do customers churn", compute, scope="a")
+    _get(cache, "k2", "why do our customers churn", compute, scope="b")
+    hit = _get(cache, "k3", "why do our customers churn", compute, scope="a")
+    
+    assert compute.calls == 2
+    assert hit["call"] == 1
+
+
+def test_clear_drops_both_tiers():
+    cache, compute = ResultCache(embeddings=FakeEmbeddings()), Counter()
+    
+    _get(cache, "k1", "why do customers churn", compute)
+    cache.clear()
+    _get(cache, "k2", "why do our customers churn", compute)
+    
+    assert compute.calls == 2
+
+
+class FakeRetriever:
+    def __init__(self):
+        self.index_version = 0
+        self.calls = 0
+    
+    def naive_retrieval(self, query, k=5):
+        self.calls += 1
+        return [f"{query}-{i}" for i in range(k)]
+
+
+def test_retrieval_cache_reuses_identical_calls():
+    retriever = FakeRetriever()
+    cache = RetrievalCache(retriever)
+    
+    first = cache.retrieve("naive_retrieval", "churn", 3)
+    first.append("mutated by caller")
+    second = cache.retrieve("naive_retrieval", "churn", 3)
+    
+    assert retriever.calls == 1
+    assert second == ["churn-0", "churn-1", "churn-2"]
+
+
+def test_retrieval_cache_misses_after_reindex():
+    retriever = FakeRetriever()
+    cache = RetrievalCache(retriever)
+    
+    cache.retrieve("naive_retrieval", "churn", 3)
+    retriever.index_version += 1
+    cache.retrieve("naive_retrieval", "churn", 3)
+    
+    assert retriever.calls == 2
+
+
+class IndexedRetriever(FakeRetriever):
+    embeddings = FakeEmbeddings()
+
+
+class FakeGraph:
+    version = 0
+
+
+def _count_runs(team):
+    """Replace the team's workflow with a counter; returns the run list"""
+    runs = []
+    
+    async def run(query, *args):
+        runs.append(query)
+        return {"query": query, "errors": []}
+    
+    team._run = run
+    return runs
+
+
+def test_writing_results_are_recomputed_after_reindex(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    from agents.writing_team import WritingTeam
+    
+    retriever = IndexedRetriever()
+    team = WritingTeam(rag_retriever=retriever)
+    runs = _count_runs(team)
+    
+    asyncio.run(team.awrite("why do customers churn", "background"))
+    asyncio.run(team.awrite("why do customers churn", "background"))
+    retriever.index_version += 1
+    # The pre-index entry is not reused for a near-duplicate...
+    asyncio.run(team.awrite("why do our customers churn", "background"))
+    # ...nor for the original question, which now matches the post-index entry instead
+    asyncio.run(team.awrite("why do customers churn", "background"))
+    
+    assert runs == ["why do customers churn", "why do our customers churn"]
+
+
+def test_research_results_are_recomputed_after_graph_rebuild(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    from agents.research_team import ResearchTeam
+    
+    graph = FakeGraph()
+    team = ResearchTeam(rag_retriever=IndexedRetriever(), knowledge_graph=graph, use_tavily=False)
+    runs = _count_runs(team)
+    
+    asyncio.run(team.aresearch("why do customers churn"))
+    asyncio.run(team.aresearch("why do our customers churn"))
+    graph.version += 1
+    asyncio.run(team.aresearch("why do our customers churn"))
+    
+    assert len(runs) == 2
+
+
+def _use_case(record_id):
+    from langchain_core.documents import Document
+    return Document(page_content=f"case {record_id}", metadata={"record_id": record_id})
+
+
+def test_writing_results_are_scoped_by_use_cases_and_entities(monkeypatch):
+    """Write-only routes have no background, so use cases and entities must tell questions apart"""
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    from agents.writing_team import WritingTeam
+    
+    team = WritingTeam(rag_retriever=IndexedRetriever())
+    runs = _count_runs(team)
+    
+    asyncio.run(team.awrite("why do customers churn", "", [_use_case(1)], ["Commercial"]))
+    # Near-duplicate with other use cases, then with other entities: both recomputed
+    asyncio.run(team.awrite("why do our customers churn", "", [_use_case(2)], ["Commercial"]))
+    asyncio.run(team.awrite("why do our customers churn", "", [_use_case(1)], ["SMB"]))
+    # Near-duplicate with the same inputs: reused
+    asyncio.run(team.awrite("why do our customers churn", "", [_use_case(1)], ["commercial"]))
+    
+    assert len(runs) == 3
@@ -0,0 +1,62 @@
+"""
+Test Confidence Scoring
+Every query route must be able to reach full confidence from the signals it produces
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+import pytest
+
+from agents.multi_agent_system import (
+    CONFIDENCE_SIGNAL_BRANCHES,
+    ROUTE_BRANCHES,
+    build_confidence_scorer,
+)
+
+
+def _scorer(route):
+    branches = ROUTE_BRANCHES[route]
+    return build_confidence_scorer(active=tuple(
+        branch is None or branch in branches for branch in CONFIDENCE_SIGNAL_BRANCHES
+    ))
+
+
+def test_full_route_keeps_original_weights():
+    score = build_confidence_scorer()
+    
+    assert score(True, 5, True, 5, 4) == pytest.approx(1.0)
+    assert score(True, 0, False, 0, 0) == pytest.approx(0.2 + 0.3 * 0.5)
+    assert _scorer("full")(True, 2, True, 1, 2) == pytest.approx(score(True, 2, True, 1, 2))
+
+
+def test_write_only_route_reaches_full_confidence_without_research():
+    """Strategy and general questions skip research, so background and insights don't count"""
+    score = _scorer("write_only")
+    
+    assert score(False, 0, True, 5, 4) == pytest.approx(1.0)
+    # Response length carries 0.3 of the 0.65 the route's signals are worth
+    assert score(False, 0, True, 0, 0) == pytest.approx(0.3 / 0.65)
+
+
+def test_research_only_route_reaches_full_confidence_without_citations():
+    """Competitor questions skip use-case retrieval, so citations don't count"""
+    score = _scorer("research_only")
+    
+    assert score(True, 5, True, 0, 4) == pytest.approx(1.0)
+    assert score(True, 0, False, 0, 0) == pytest.approx((0.2 + 0.3 * 0.5) / 0.8)
+
+
+def test_signals_saturate_at_their_caps():
+    score = build_confidence_scorer()
+    
+    assert score(True, 50, True, 50, 40) == pytest.approx(1.0)
+
+
+def test_no_active_signals_scores_zero():
+    score = build_confidence_scorer(active=(False,) * len(CONFIDENCE_SIGNAL_BRANCHES))
+    
+    assert score(True, 5, True, 5, 4) == 0.0
@@ -0,0 +1,62 @@
+"""
+Test Ingestion Helpers
+Unit tests for chunk post-processing in ingest_to_qdrant.py
+"""
+
+import sys
+from pathlib import Path
+
+# Add repo root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from langchain_core.documents import Document
+
+from ingest_to_qdrant import CHUNK_SIZE, MIN_CHUNK_SIZE, merge_small_chunks, point_id
+
+
+def _chunk(text, start_index, source="a.txt"):
+    return Document(
+        page_content=text,
+        metadata={"source": source, "doc_type": "churn_analysis", "start_index": start_index}
+    )
+
+
+def test_small_chunks_from_same_file_are_merged():
+    """Chunks with different start_index values still merge within one file"""
+    first = _chunk("a" * 50, 0)
+    second = _chunk("b" * 50, 51)
+    
+    merged = merge_small_chunks([first, second])
+    
+    assert len(merged) == 1
+    assert merged[0].page_content == "a" * 50 + "\n" + "b" * 50
+    # The merged chunk keeps the first chunk's offset
+    assert merged[0].metadata["start_index"] == 0
+
+
+def test_chunks_from_different_files_are_not_merged():
+    merged = merge_small_chunks([_chunk("a" * 50, 0), _chunk("b" * 50, 0, source="b.txt")])
+    
+    assert len(merged) == 2
+
+
+def test_large_chunks_are_not_merged():
+    big = "x" * (MIN_CHUNK_SIZE + 10)
+    
+    merged = merge_small_chunks([_chunk(big, 0), _chunk(big, len(big) + 1)])
+    
+    assert len(merged) == 2
+
+
+def test_merge_respects_chunk_size():
+    """A small chunk is not merged into a neighbour that would overflow CHUNK_SIZE"""
+    full = "x" * (CHUNK_SIZE - 10)
+    
+    merged = merge_small_chunks([_chunk(full, 0), _chunk("y" * 20, CHUNK_SIZE)])
+    
+    assert len(merged) == 2
+
+
+def test_point_id_is_deterministic():
+    assert point_id(_chunk("text", 0)) == point_id(_chunk("text", 0))
+    assert point_id(_chunk("text", 0)) != point_id(_chunk("text", 10))
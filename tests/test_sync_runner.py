@@ -0,0 +1,68 @@
+"""
+Test Sync Runner
+Blocking wrappers must reuse one event loop, so pooled async clients survive between calls
+"""
+
+import asyncio
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+import httpx
+
+from utils.sync_runner import run_on_shared_loop, run_sync
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+    
+    def log_message(self, *args):
+        pass
+
+
+async def _current_loop():
+    return asyncio.get_running_loop()
+
+
+def test_calls_share_one_loop():
+    assert run_sync(_current_loop()) is run_sync(_current_loop())
+
+
+def test_pooled_async_client_survives_repeated_calls():
+    """Keep-alive connections opened by the first call are reused by the second"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    client = httpx.AsyncClient()
+    try:
+        assert run_sync(client.get(url)).text == "ok"
+        assert run_sync(client.get(url)).text == "ok"
+    finally:
+        run_sync(client.aclose())
+        server.shutdown()
+
+
+def test_async_callers_share_the_blocking_loop():
+    """Coroutines awaited from another loop (e.g. a web server's) run where run_sync() does"""
+    async def caller():
+        return await run_on_shared_loop(_current_loop())
+    
+    assert asyncio.run(caller()) is run_sync(_current_loop())
+
+
+def test_works_inside_running_loop():
+    """Blocking wrappers can be called from code already on an event loop (e.g. notebooks)"""
+    async def caller():
+        return run_sync(asyncio.sleep(0, result="done"))
+    
+    assert asyncio.run(caller()) == "done"